@@ -8,6 +8,7 @@
 
 import os
 import secrets
+from pathlib import Path
 
 from pydantic_settings import BaseSettings
 
@@ -37,6 +38,14 @@ class Settings(BaseSettings):
         "COMFYUI_API_URL", "http://host.docker.internal:8188"
     )
 
+    # ComfyUI图片本地存储目录(首次代理后落盘,后续请求不再回源ComfyUI)
+    # 默认位于 backend 目录下,与启动时的工作目录无关
+    image_store_dir: str = os.getenv(
+        "IMAGE_STORE_DIR", str(Path(__file__).resolve().parent.parent / "image_store")
+    )
+    # 图片本地存储总大小上限(MB),超出后淘汰最久未使用的图片,0 表示不限制
+    image_store_max_mb: int = int(os.getenv("IMAGE_STORE_MAX_MB", "1024"))
+
     # 图生视频相关配置
     video_generation_timeout: int = int(
         os.getenv("VIDEO_GENERATION_TIMEOUT", "600")
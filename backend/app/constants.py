@@ -17,5 +17,8 @@
 CACHE_ONE_HOUR = 3600  # 1小时
 CACHE_ONE_DAY = 86400  # 1天
 
+# 流式下载分块大小（字节）
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # 64KB
+
 # 数据库字段长度限制
 MAX_IMAGES_JSON_LENGTH = 5000  # 图片列表JSON字符串的最大长度
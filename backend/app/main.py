@@ -6,9 +6,11 @@
 for novel searching, chapter management, and caching functionality.
 """
 
+import asyncio
 import logging
 import secrets
 from datetime import datetime
+from pathlib import Path
 from typing import Any
 
 from fastapi import (
@@ -19,11 +21,17 @@
     Request,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import FileResponse, JSONResponse, Response
 from sqlalchemy.orm import Session
 
 from .config import settings
-from .constants import CACHE_ONE_DAY, CACHE_ONE_HOUR, TIMEOUT_FAST
+from .constants import (
+    CACHE_ONE_DAY,
+    CACHE_ONE_HOUR,
+    DOWNLOAD_CHUNK_SIZE,
+    TIMEOUT_FAST,
+    TIMEOUT_SLOW,
+)
 from .database import get_db, init_db
 from .deps.auth import verify_token
 from .exceptions import (
@@ -52,13 +60,17 @@
     VideoStatusResponse,
     WorkflowInfo,
 )
+from .services.comfyui_client import get_comfyui_session
+from .services.comfyui_events import close_listeners
 from .services.crawler_factory import (
     get_crawler_for_url,
     get_enabled_crawlers,
     get_source_sites_info,
 )
 from .services.dify_client import create_dify_client
+from .services.image_store import image_store
 from .services.image_to_video_service import create_image_to_video_service
+from .services.parse_pool import get_parse_pool, shutdown_parse_pool
 from .services.role_card_async_service import role_card_async_service
 from .services.role_card_service import role_card_service
 from .services.scene_illustration_service import create_scene_illustration_service
@@ -103,6 +115,9 @@ async def startup_event() -> None:
     # 初始化数据库
     init_db()
 
+    # 在处理请求之前创建解析进程池
+    get_parse_pool()
+
     logger.info("Novel Builder Backend 启动完成")
     logger.info(f"启用的爬虫站点: {settings.enabled_sites}")
 
@@ -113,6 +128,13 @@ async def startup_event() -> None:
         logger.warning("当前配置不安全，请检查环境变量设置")
 
 
+# 应用关闭事件
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    await close_listeners()
+    shutdown_parse_pool()
+
+
 # 全局异常处理器
 @app.exception_handler(NovelBuilderException)
 async def novel_builder_exception_handler(request: Request, exc: NovelBuilderException):
@@ -307,22 +329,34 @@ async def get_image_proxy(filename: str):
         if ".." in filename or "/" in filename or "\\" in filename:
             raise HTTPException(status_code=400, detail="文件名包含非法字符")
 
-        # 直接从ComfyUI获取图片
-        comfyui_url = settings.comfyui_api_url
-        image_url = f"{comfyui_url}/view?filename={filename}"
+        headers = {
+            "Cache-Control": f"public, max-age={CACHE_ONE_DAY}",  # 缓存1天
+            "X-Content-Type-Options": "nosniff",
+        }
 
-        response = requests.get(image_url, timeout=None)
-        if response.status_code == 200:
-            return Response(
-                content=response.content,
-                media_type="image/png",
-                headers={
-                    "Cache-Control": f"public, max-age={CACHE_ONE_DAY}",  # 缓存1天
-                    "X-Content-Type-Options": "nosniff",
-                },
+        # 磁盘读写和 ComfyUI 下载都是阻塞调用,放到线程池中执行
+        loop = asyncio.get_running_loop()
+
+        # 优先读取本地存储,避免重复从ComfyUI拉取
+        image_path = await loop.run_in_executor(None, image_store.path, filename)
+
+        if image_path is None:
+            # 本地未命中时从ComfyUI获取,并落盘供后续请求使用
+            comfyui_url = settings.comfyui_api_url
+            image_url = f"{comfyui_url}/view?filename={filename}"
+
+            image = await loop.run_in_executor(
+                None, _fetch_image_to_store_sync, image_url, filename
             )
-        else:
-            raise HTTPException(status_code=404, detail="图片不存在")
+            if image is None:
+                raise HTTPException(status_code=404, detail="图片不存在")
+            if isinstance(image, bytes):
+                # 落盘失败,直接返回内存中的图片
+                return Response(content=image, media_type="image/png", headers=headers)
+            image_path = image
+
+        # 从本地存储分块发送,不把整张图片读入内存
+        return FileResponse(image_path, media_type="image/png", headers=headers)
     except requests.RequestException:
         raise HTTPException(status_code=503, detail="无法连接到ComfyUI服务")
 
@@ -754,6 +788,40 @@ async def get_video_file(img_name: str, db: Session = Depends(get_db)):
 # ================= 辅助函数 =================
 
 
+def _fetch_image_to_store_sync(image_url: str, filename: str) -> Path | bytes | None:
+    """
+    从ComfyUI流式下载图片并写入本地存储（在线程池中运行）
+
+    下载内容直接写入存储，不在内存中保留完整图片。落盘失败时已读取的数据
+    无法找回，此时重新下载到内存中返回。
+
+    Args:
+        image_url: ComfyUI 图片地址
+        filename: ComfyUI 文件名
+
+    Returns:
+        本地存储中的图片路径；落盘失败时返回图片二进制数据；
+        ComfyUI 未找到图片时返回 None
+    """
+    session = get_comfyui_session()
+    with session.get(image_url, stream=True, timeout=TIMEOUT_SLOW) as response:
+        if response.status_code != 200:
+            return None
+        try:
+            image_store.put_stream(
+                filename, response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+            )
+        except OSError as e:
+            logger.warning(f"图片落盘失败 {filename}: {e}")
+        else:
+            return image_store.path(filename)
+
+    response = session.get(image_url, timeout=TIMEOUT_SLOW)
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
 def _save_chapter_to_cache_sync(chapter_url: str, title: str, content: str):
     """
     同步保存章节到缓存（在后台线程中运行）
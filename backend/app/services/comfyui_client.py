@@ -7,6 +7,7 @@
 
 import asyncio
 import base64
+import functools
 import json
 import logging
 import random
@@ -14,13 +15,71 @@
 from pathlib import Path
 from typing import Any
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
-
-from ..workflow_config.workflow_config import workflow_config_manager
+from urllib3.util.retry import Retry
+
+from ..workflow_config.workflow_config import (
+    load_workflow_json,
+    workflow_config_manager,
+)
+from .comfyui_events import (
+    WEBSOCKET_ERRORS,
+    poll_delays,
+    prompt_listener,
+    wait_for_prompt,
+)
 
 logger = logging.getLogger(__name__)
 
+# ComfyUI 连接池大小:轮询、下载和提交并发时复用 keep-alive 连接
+_POOL_CONNECTIONS = 4
+_POOL_MAXSIZE = 8
+
+# 工作流请求体已由 orjson 序列化为字节,直接作为 data 发送
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 所有 ComfyUI 客户端(含 V2、标题匹配、视频客户端)共享的 HTTP 会话,
+# 延迟到首次请求时创建
+_session: requests.Session | None = None
+
+
+def get_comfyui_session() -> requests.Session:
+    """获取所有ComfyUI客户端共享的HTTP会话(首次使用时创建)"""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        # 只对连接失败立即重试一次,请求已发出后不重试,避免重复提交任务
+        adapter = HTTPAdapter(
+            pool_connections=_POOL_CONNECTIONS,
+            pool_maxsize=_POOL_MAXSIZE,
+            max_retries=Retry(total=1, connect=1, read=0, status=0),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _session = session
+    return _session
+
+
+async def comfyui_request(method: str, url: str, **kwargs) -> requests.Response:
+    """通过共享会话在线程池中执行阻塞的HTTP请求,避免卡住事件循环.
+
+    Args:
+        method: HTTP方法
+        url: 请求URL
+        **kwargs: 透传给 Session.request 的参数
+
+    Returns:
+        HTTP响应
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(get_comfyui_session().request, method, url, **kwargs),
+    )
+
 
 class WorkflowType(str, Enum):
     """工作流类型枚举"""
@@ -60,6 +119,8 @@ def __init__(self, base_url: str, workflow_path: str):
         self.base_url = base_url.rstrip("/")
         self.workflow_path = workflow_path
         self.workflow_json = None
+        # 本客户端提交的任务ID,这些任务的执行事件推送到共享的 WebSocket 连接
+        self._submitted_tasks: set[str] = set()
         self._load_workflow()
         logger.info("ComfyUI客户端初始化完成")
 
@@ -75,8 +136,7 @@ def _load_workflow(self) -> None:
             if not workflow_file.exists():
                 raise FileNotFoundError(f"工作流文件不存在: {full_path}")
 
-            with open(workflow_file, encoding="utf-8") as f:
-                self.workflow_json = json.load(f)
+            self.workflow_json = load_workflow_json(workflow_file)
 
             logger.info(f"成功加载ComfyUI工作流: {full_path}")
 
@@ -84,6 +144,10 @@ def _load_workflow(self) -> None:
             logger.error(f"加载ComfyUI工作流失败: {e}")
             raise
 
+    async def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """在线程池中执行HTTP请求,参见 comfyui_request."""
+        return await comfyui_request(method, url, **kwargs)
+
     async def generate_image(self, prompt: str) -> str | None:
         """生成图片.
 
@@ -102,9 +166,12 @@ async def generate_image(self, prompt: str) -> str | None:
             workflow_json_str = self._prepare_workflow(prompt)
 
             # 调用ComfyUI API
-            response = requests.post(
+            client_id = prompt_listener(self.base_url).client_id
+            response = await self._request(
+                "POST",
                 f"{self.base_url}/prompt",
-                json={"prompt": json.loads(workflow_json_str)},
+                data=self._prompt_body(workflow_json_str, client_id),
+                headers=_JSON_HEADERS,
                 timeout=None,  # 移除超时限制
             )
 
@@ -112,6 +179,7 @@ async def generate_image(self, prompt: str) -> str | None:
                 result = response.json()
                 task_id = result.get("prompt_id")
                 if task_id:
+                    self._submitted_tasks.add(task_id)
                     logger.info(f"ComfyUI图片生成任务已提交: {task_id}")
                     return task_id
                 else:
@@ -143,28 +211,19 @@ async def generate_images_batch(self, prompts: list[str]) -> list[str] | None:
             logger.error("提示词列表为空")
             return None
 
-        image_filenames = []
-        for i, prompt in enumerate(prompts):
-            logger.info(f"生成第 {i + 1}/{len(prompts)} 张图片")
-            try:
-                # 提交生成任务，获取ComfyUI任务ID
-                task_id = await self.generate_image(prompt)
-                if task_id:
-                    logger.info(f"ComfyUI任务ID: {task_id}")
-                    # 等待任务完成并获取实际图片文件名
-                    completed_files = await self.wait_for_completion(task_id)
-                    if completed_files and len(completed_files) > 0:
-                        media_file = completed_files[0]  # 使用第一个生成的媒体文件
-                        filename = media_file.filename  # 获取文件名
-                        image_filenames.append(filename)
-                        logger.info(f"第 {i + 1} 张图片生成成功，文件名: {filename}")
-                    else:
-                        logger.warning(f"第 {i + 1} 张图片生成失败（未获取到文件名）")
-                else:
-                    logger.warning(f"第 {i + 1} 张图片生成失败（提交任务失败）")
-            except (OSError, requests.RequestException, ValueError, json.JSONDecodeError) as e:
-                logger.error(f"生成第 {i + 1} 张图片时发生异常: {e}")
-                continue
+        # 先并发提交全部任务,再按完成顺序收集结果,提交/等待/取结果相互重叠
+        tasks = [
+            asyncio.create_task(self.generate_one(i, len(prompts), prompt))
+            for i, prompt in enumerate(prompts)
+        ]
+        results: list[str | None] = [None] * len(prompts)
+        for finished, future in enumerate(asyncio.as_completed(tasks), 1):
+            i, filename = await future
+            results[i] = filename
+            logger.info(f"批量图片生成进度: {finished}/{len(prompts)}")
+
+        # 保持与提示词相同的顺序
+        image_filenames = [filename for filename in results if filename]
 
         if not image_filenames:
             logger.error("所有图片生成都失败了")
@@ -173,6 +232,43 @@ async def generate_images_batch(self, prompts: list[str]) -> list[str] | None:
         logger.info(f"批量图片生成完成，共生成 {len(image_filenames)} 张图片")
         return image_filenames
 
+    async def generate_one(
+        self, i: int, total: int, prompt: str
+    ) -> tuple[int, str | None]:
+        """提交单张图片任务并等待完成.
+
+        返回值带有序号，便于并发调用方将结果对应回提示词。
+
+        Args:
+            i: 提示词序号(从0开始)
+            total: 本批提示词总数
+            prompt: 图片生成提示词
+
+        Returns:
+            (序号, 图片文件名),失败时文件名为None
+        """
+        logger.info(f"生成第 {i + 1}/{total} 张图片")
+        try:
+            # 提交生成任务，获取ComfyUI任务ID
+            task_id = await self.generate_image(prompt)
+            if not task_id:
+                logger.warning(f"第 {i + 1} 张图片生成失败（提交任务失败）")
+                return i, None
+
+            logger.info(f"ComfyUI任务ID: {task_id}")
+            # 等待任务完成并获取实际图片文件名
+            completed_files = await self.wait_for_completion(task_id)
+            if not completed_files:
+                logger.warning(f"第 {i + 1} 张图片生成失败（未获取到文件名）")
+                return i, None
+
+            filename = completed_files[0].filename  # 使用第一个生成的媒体文件
+            logger.info(f"第 {i + 1} 张图片生成成功，文件名: {filename}")
+            return i, filename
+        except (OSError, requests.RequestException, ValueError, json.JSONDecodeError) as e:
+            logger.error(f"生成第 {i + 1} 张图片时发生异常: {e}")
+            return i, None
+
     async def check_task_status(self, task_id: str) -> dict[str, Any]:
         """检查任务状态.
 
@@ -183,10 +279,12 @@ async def check_task_status(self, task_id: str) -> dict[str, Any]:
             任务状态信息
         """
         try:
-            response = requests.get(f"{self.base_url}/history/{task_id}", timeout=10)
+            response = await self._request(
+                "GET", f"{self.base_url}/history/{task_id}", timeout=10
+            )
 
             if response.status_code == 200:
-                history = response.json()
+                history = orjson.loads(response.content)
                 return history.get(task_id, {})
             else:
                 logger.error(f"查询任务状态失败: {response.status_code}")
@@ -205,12 +303,45 @@ async def wait_for_completion(self, task_id: str) -> list[MediaFileResult] | Non
         Returns:
             生成的媒体文件信息列表，失败则返回None
         """
+        try:
+            await self._wait_via_websocket(task_id)
+        except WEBSOCKET_ERRORS as e:
+            logger.warning(f"WebSocket等待任务失败,改为轮询: {e}")
+
+        # 任务结束后首次查询即可拿到结果;WebSocket 不可用时退化为轮询
+        return await self._poll_for_completion(task_id)
+
+    async def _wait_via_websocket(self, task_id: str) -> None:
+        """订阅ComfyUI的WebSocket事件,阻塞到任务执行结束.
+
+        Args:
+            task_id: 任务ID
+        """
+        if task_id not in self._submitted_tasks:
+            # 不是本客户端提交的任务,收不到它的事件,直接轮询
+            return
+        self._submitted_tasks.discard(task_id)
+
+        await wait_for_prompt(
+            self.base_url, task_id, lambda: self.check_task_status(task_id)
+        )
+
+    async def _poll_for_completion(self, task_id: str) -> list[MediaFileResult] | None:
+        """轮询任务历史直到任务完成，并解析生成的媒体文件.
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            生成的媒体文件信息列表，失败则返回None
+        """
+        delays = poll_delays()
         while True:
             # 查询任务状态
             task_info = await self.check_task_status(task_id)
 
             if not task_info:
-                await asyncio.sleep(2)
+                await asyncio.sleep(next(delays))
                 continue
 
             # 检查任务状态
@@ -262,7 +393,7 @@ async def wait_for_completion(self, task_id: str) -> list[MediaFileResult] | Non
                 return None
 
             # 继续等待
-            await asyncio.sleep(3)
+            await asyncio.sleep(next(delays))
 
     def get_media_url(self, filename: str) -> str:
         """获取媒体文件访问URL（支持图片和视频）.
@@ -296,7 +427,8 @@ async def get_media_data(self, filename: str) -> bytes | None:
             媒体文件二进制数据，失败则返回None
         """
         try:
-            response = requests.get(
+            response = await self._request(
+                "GET",
                 self.get_media_url(filename),
                 timeout=None,  # 移除超时限制
             )
@@ -342,8 +474,8 @@ async def generate_video(
         try:
             # 第一步：上传图片到ComfyUI
             files = {"image": (image_filename, image_data, "image/png")}
-            upload_response = requests.post(
-                f"{self.base_url}/upload/image", files=files, timeout=None
+            upload_response = await self._request(
+                "POST", f"{self.base_url}/upload/image", files=files, timeout=None
             )
 
             if upload_response.status_code != 200:
@@ -367,9 +499,12 @@ async def generate_video(
             )
 
             # 调用ComfyUI API
-            response = requests.post(
+            client_id = prompt_listener(self.base_url).client_id
+            response = await self._request(
+                "POST",
                 f"{self.base_url}/prompt",
-                json={"prompt": json.loads(workflow_json_str)},
+                data=self._prompt_body(workflow_json_str, client_id),
+                headers=_JSON_HEADERS,
                 timeout=None,  # 移除超时限制
             )
 
@@ -377,6 +512,7 @@ async def generate_video(
                 result = response.json()
                 task_id = result.get("prompt_id")
                 if task_id:
+                    self._submitted_tasks.add(task_id)
                     logger.info(f"ComfyUI视频生成任务已提交: {task_id}")
                     return task_id
                 else:
@@ -413,7 +549,7 @@ def _prepare_workflow(self, prompt: str, image_base64: str | None = None) -> str
             raise ValueError("图片base64数据不能为空字符串")
 
         # 将工作流JSON序列化为字符串
-        workflow_content = json.dumps(self.workflow_json, ensure_ascii=False)
+        workflow_content = orjson.dumps(self.workflow_json).decode()
 
         # 执行固定替换
         workflow_content = workflow_content.replace("提示词在这里替换", prompt)
@@ -431,6 +567,20 @@ def _prepare_workflow(self, prompt: str, image_base64: str | None = None) -> str
         logger.info(f"工作流准备完成，提示词长度: {len(prompt)}")
         return workflow_content
 
+    def _prompt_body(self, workflow_json_str: str, client_id: str) -> bytes:
+        """构造 /prompt 请求体,同时校验替换后的工作流仍是合法JSON.
+
+        Args:
+            workflow_json_str: 准备好的工作流JSON字符串
+            client_id: 接收该任务执行事件的 WebSocket clientId
+
+        Returns:
+            序列化后的请求体
+        """
+        return orjson.dumps(
+            {"prompt": orjson.loads(workflow_json_str), "client_id": client_id}
+        )
+
     def _encode_image_to_base64(self, image_data: bytes) -> str:
         """将图片数据编码为base64字符串.
 
@@ -463,7 +613,7 @@ def _prepare_workflow_with_filename(self, prompt: str, image_filename: str) -> s
             raise ValueError("图片文件名不能为空")
 
         # 将工作流JSON序列化为字符串
-        workflow_content = json.dumps(self.workflow_json, ensure_ascii=False)
+        workflow_content = orjson.dumps(self.workflow_json).decode()
 
         # 执行固定替换
         workflow_content = workflow_content.replace("提示词在这里替换", prompt)
@@ -486,7 +636,9 @@ async def health_check(self) -> bool:
             服务是否可用
         """
         try:
-            response = requests.get(f"{self.base_url}/system_stats", timeout=5)
+            response = await self._request(
+                "GET", f"{self.base_url}/system_stats", timeout=5
+            )
             return response.status_code == 200
         except (OSError, requests.RequestException, ValueError, json.JSONDecodeError) as e:
             logger.error(f"ComfyUI健康检查失败: {e}")
@@ -6,14 +6,47 @@
 import json
 import logging
 import os
+from collections.abc import Sequence
 from pathlib import Path
 from typing import Any
 
+import orjson
 import requests
 from requests.exceptions import RequestException, Timeout
 
+from ..workflow_config.workflow_config import load_workflow_json
+from .comfyui_client import comfyui_request
+from .comfyui_events import (
+    WEBSOCKET_ERRORS,
+    poll_delays,
+    prompt_listener,
+    wait_for_prompt,
+)
+from .comfyui_history import parse_history
+
 logger = logging.getLogger(__name__)
 
+# prepare_workflow_by_title 默认匹配的提示词节点标题
+_DEFAULT_TARGET_TITLES = (
+    "prompts",
+    "提示词",
+    "CLIP Text Encode",
+    "prompt",
+    "positive",
+    "text",
+    "文本编码",
+    "CLIP文本编码",
+)
+
+# analyze_workflow 判定提示词节点的标题关键词(已小写)
+_TARGET_KEYWORDS = ("prompts", "提示词", "text", "prompt")
+
+# 负面提示词节点的标题关键词(已小写),这类节点不应写入正面提示词
+_NEGATIVE_TITLE_KEYWORDS = ("negative", "反向", "负面")
+
+# 工作流请求体已由 orjson 序列化为字节,直接作为 data 发送
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class ComfyUIClientTitleBased:
     """基于节点标题的通用ComfyUI客户端"""
@@ -28,6 +61,13 @@ def __init__(self, base_url: str, workflow_path: str):
         self.base_url = base_url.rstrip("/")
         self.workflow_path = workflow_path
         self.workflow_json = None
+        self._analysis: dict[str, Any] | None = None
+        # (节点ID, 原标题, 小写标题),加载工作流时构建一次
+        self._node_titles: list[tuple[str, str, str]] = []
+        # 标题表明是负面提示词的节点ID
+        self._negative_nodes: frozenset[str] = frozenset()
+        # 本客户端提交的任务ID,这些任务的执行事件推送到共享的 WebSocket 连接
+        self._submitted_tasks: set[str] = set()
         self._load_workflow()
 
     def _load_workflow(self) -> None:
@@ -37,8 +77,19 @@ def _load_workflow(self) -> None:
             if not workflow_file.exists():
                 raise FileNotFoundError(f"工作流文件不存在: {self.workflow_path}")
 
-            with open(workflow_file, encoding="utf-8") as f:
-                self.workflow_json = json.load(f)
+            self.workflow_json = load_workflow_json(workflow_file)
+            self._analysis = None
+            self._node_titles = []
+            for node_id, node_data in self.workflow_json.items():
+                if node_id == "config":
+                    continue
+                title = node_data.get("_meta", {}).get("title", "")
+                self._node_titles.append((node_id, title, title.lower()))
+            self._negative_nodes = frozenset(
+                node_id
+                for node_id, _, title_lc in self._node_titles
+                if any(keyword in title_lc for keyword in _NEGATIVE_TITLE_KEYWORDS)
+            )
 
             logger.info(f"成功加载ComfyUI工作流: {self.workflow_path}")
 
@@ -47,34 +98,34 @@ def _load_workflow(self) -> None:
             raise
 
     def find_nodes_by_title(
-        self, target_titles: list[str]
+        self, target_titles: Sequence[str], exclude_negative: bool = False
     ) -> dict[str, dict[str, Any]]:
         """根据节点标题查找节点.
 
         Args:
             target_titles: 目标标题列表
+            exclude_negative: 是否跳过标题表明是负面提示词的节点
 
         Returns:
             匹配的节点字典
         """
         matching_nodes = {}
+        # 目标标题只小写一次,节点标题在加载工作流时已小写
+        targets_lc = [target_title.lower() for target_title in target_titles]
 
-        for node_id, node_data in self.workflow_json.items():
-            if node_id == "config":
-                continue
-
-            meta = node_data.get("_meta", {})
-            title = meta.get("title", "")
+        excluded = self._negative_nodes if exclude_negative else frozenset()
 
+        for node_id, title, title_lc in self._node_titles:
+            if node_id in excluded:
+                continue
             # 检查标题是否匹配任何目标标题
-            for target_title in target_titles:
-                if target_title.lower() in title.lower():
-                    matching_nodes[node_id] = {
-                        "title": title,
-                        "class_type": node_data.get("class_type"),
-                        "inputs": node_data.get("inputs", {}),
-                    }
-                    break
+            if any(target in title_lc for target in targets_lc):
+                node_data = self.workflow_json[node_id]
+                matching_nodes[node_id] = {
+                    "title": title,
+                    "class_type": node_data.get("class_type"),
+                    "inputs": node_data.get("inputs", {}),
+                }
 
         return matching_nodes
 
@@ -91,21 +142,12 @@ def prepare_workflow_by_title(
             准备好的工作流数据
         """
         if target_titles is None:
-            target_titles = [
-                "prompts",
-                "提示词",
-                "CLIP Text Encode",
-                "prompt",
-                "positive",
-                "text",
-                "文本编码",
-                "CLIP文本编码",
-            ]
-
-        workflow_data = json.loads(json.dumps(self.workflow_json))
-
-        # 查找匹配的节点
-        matching_nodes = self.find_nodes_by_title(target_titles)
+            target_titles = _DEFAULT_TARGET_TITLES
+
+        workflow_data = orjson.loads(orjson.dumps(self.workflow_json))
+
+        # 查找匹配的节点,负面提示词节点保持原样
+        matching_nodes = self.find_nodes_by_title(target_titles, exclude_negative=True)
         logger.info(f"找到 {len(matching_nodes)} 个匹配标题的节点")
 
         # 执行替换
@@ -141,14 +183,20 @@ async def generate_image_by_title(
             workflow_data = self.prepare_workflow_by_title(prompt, target_titles)
 
             # 调用ComfyUI API
-            response = requests.post(
-                f"{self.base_url}/prompt", json={"prompt": workflow_data}, timeout=30
+            client_id = prompt_listener(self.base_url).client_id
+            response = await comfyui_request(
+                "POST",
+                f"{self.base_url}/prompt",
+                data=orjson.dumps({"prompt": workflow_data, "client_id": client_id}),
+                headers=_JSON_HEADERS,
+                timeout=30,
             )
 
             if response.status_code == 200:
                 result = response.json()
                 task_id = result.get("prompt_id")
                 if task_id:
+                    self._submitted_tasks.add(task_id)
                     logger.info(f"ComfyUI图片生成任务已提交: {task_id}")
                     return task_id
                 else:
@@ -174,9 +222,11 @@ async def generate_image_by_title(
     async def check_task_status(self, task_id: str) -> dict[str, Any]:
         """检查任务状态."""
         try:
-            response = requests.get(f"{self.base_url}/history/{task_id}", timeout=10)
+            response = await comfyui_request(
+                "GET", f"{self.base_url}/history/{task_id}", timeout=10
+            )
             if response.status_code == 200:
-                return response.json().get(task_id, {})
+                return orjson.loads(response.content).get(task_id, {})
             else:
                 logger.error(f"查询任务状态失败: {response.status_code}")
                 return {}
@@ -190,6 +240,22 @@ async def wait_for_completion(
         """等待任务完成并获取生成的图片文件名."""
         start_time = asyncio.get_event_loop().time()
 
+        # 优先订阅执行事件,任务结束后下面的首次查询即可拿到结果
+        if task_id in self._submitted_tasks:
+            self._submitted_tasks.discard(task_id)
+            try:
+                await asyncio.wait_for(
+                    wait_for_prompt(
+                        self.base_url,
+                        task_id,
+                        lambda: self.check_task_status(task_id),
+                    ),
+                    timeout,
+                )
+            except WEBSOCKET_ERRORS as e:
+                logger.warning(f"WebSocket等待任务失败,改为轮询: {e}")
+
+        delays = poll_delays()
         while True:
             if asyncio.get_event_loop().time() - start_time > timeout:
                 logger.error(f"任务 {task_id} 超时")
@@ -197,26 +263,20 @@ async def wait_for_completion(
 
             task_info = await self.check_task_status(task_id)
             if not task_info:
-                await asyncio.sleep(2)
+                await asyncio.sleep(next(delays))
                 continue
 
-            status = task_info.get("status", {})
-            if status.get("status_str") == "completed":
-                outputs = task_info.get("outputs", {})
-                images = []
-                for node_output in outputs.values():
-                    if "images" in node_output:
-                        for image in node_output["images"]:
-                            filename = image.get("filename")
-                            if filename:
-                                images.append(filename)
-                                logger.info(f"找到生成的图片: {filename}")
-                return images if images else None
-            elif status.get("status_str") in ["error", "failed"]:
-                logger.error(f"任务失败: {status.get('messages', [])}")
+            result = parse_history(task_info)
+            if result.finished:
+                if result.images:
+                    logger.info(f"找到生成的图片: {result.images}")
+                return list(result.images) or None
+            elif result.failed:
+                messages = task_info.get("status", {}).get("messages", [])
+                logger.error(f"任务失败: {messages}")
                 return None
 
-            await asyncio.sleep(3)
+            await asyncio.sleep(next(delays))
 
     def get_image_url(self, filename: str) -> str:
         """获取图片访问URL."""
@@ -225,7 +285,9 @@ def get_image_url(self, filename: str) -> str:
     async def get_image_data(self, filename: str) -> bytes | None:
         """获取图片二进制数据."""
         try:
-            response = requests.get(self.get_image_url(filename), timeout=30)
+            response = await comfyui_request(
+                "GET", self.get_image_url(filename), timeout=30
+            )
             if response.status_code == 200:
                 return response.content
             else:
@@ -238,16 +300,24 @@ async def get_image_data(self, filename: str) -> bytes | None:
     async def health_check(self) -> bool:
         """检查ComfyUI服务健康状态."""
         try:
-            response = requests.get(f"{self.base_url}/system_stats", timeout=5)
+            response = await comfyui_request(
+                "GET", f"{self.base_url}/system_stats", timeout=5
+            )
             return response.status_code == 200
         except (OSError, requests.RequestException, ValueError, json.JSONDecodeError) as e:
             logger.error(f"ComfyUI健康检查失败: {e}")
             return False
 
     def analyze_workflow(self) -> dict[str, Any]:
-        """分析工作流结构."""
+        """分析工作流结构.
+
+        结果只依赖已加载的工作流,首次分析后缓存,重新加载工作流时失效.
+        返回的字典为共享缓存,调用方不应修改.
+        """
         if not self.workflow_json:
             return {"error": "工作流未加载"}
+        if self._analysis is not None:
+            return self._analysis
 
         analysis = {
             "total_nodes": 0,
@@ -264,6 +334,7 @@ def analyze_workflow(self) -> dict[str, Any]:
 
             meta = node_data.get("_meta", {})
             title = meta.get("title", "")
+            title_lc = title.lower()
             class_type = node_data.get("class_type", "")
 
             if title:
@@ -276,12 +347,11 @@ def analyze_workflow(self) -> dict[str, Any]:
                 "class_type": class_type,
                 "title": title,
                 "has_text_input": "text" in node_data.get("inputs", {}),
-                "is_target": any(
-                    keyword.lower() in title.lower()
-                    for keyword in ["prompts", "提示词", "text", "prompt"]
-                ),
+                "is_target": node_id not in self._negative_nodes
+                and any(keyword in title_lc for keyword in _TARGET_KEYWORDS),
             }
 
+        self._analysis = analysis
         return analysis
 
 
@@ -7,14 +7,63 @@
 import logging
 import os
 import random
+import re
 from pathlib import Path
 from typing import Any
 
+import orjson
 import requests
 from requests.exceptions import RequestException, Timeout
 
+from ..workflow_config.workflow_config import load_workflow_json
+from .comfyui_client import comfyui_request
+from .comfyui_history import parse_history
+
 logger = logging.getLogger(__name__)
 
+# 工作流请求体已由 orjson 序列化为字节,直接作为 data 发送
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 批量生成时每张图片的等待时间(秒):按队列位置递增,但不超过上限
+_BATCH_WAIT_PER_IMAGE = 120
+_BATCH_MAX_WAIT = 600
+
+# 工作流中支持的占位符
+_PLACEHOLDERS = (
+    "{{PROMPT}}",
+    "{{USER_PROMPT}}",
+    "{{NEGATIVE_PROMPT}}",
+    "{{STYLE_PREFIX}}",
+    "{{STYLE_SUFFIX}}",
+    "{{STEPS}}",
+    "{{CFG}}",
+)
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{([^}]+)\}\}")
+
+# 按节点ID判断提示词节点的关键词
+_PROMPT_NODE_KEYWORDS = ("prompt", "text", "input", "description")
+_NEGATIVE_NODE_KEYWORDS = ("negative", "bad", "worst")
+
+# 按内容判断提示词类型的关键词
+_NEGATIVE_PROMPT_KEYWORDS = (
+    "blurry",
+    "worst quality",
+    "low quality",
+    "jpeg artifacts",
+    "nsfw",
+    "bad",
+    "ugly",
+    "deformed",
+)
+_POSITIVE_PROMPT_KEYWORDS = (
+    "high quality",
+    "masterpiece",
+    "best quality",
+    "beautiful",
+    "anime style",
+    "detailed",
+)
+
 
 class ComfyUIClientV2:
     """增强版ComfyUI客户端，支持标准化工作流替换"""
@@ -30,6 +79,8 @@ def __init__(self, base_url: str, workflow_path: str):
         self.workflow_path = workflow_path
         self.workflow_json = None
         self.replace_config = None
+        # KSampler 节点ID,加载工作流时记录,设置种子和采样参数时直接按ID取节点
+        self._ksampler_node_ids: tuple[str, ...] = ()
         self._load_workflow()
 
     def _load_workflow(self) -> None:
@@ -39,13 +90,17 @@ def _load_workflow(self) -> None:
             if not workflow_file.exists():
                 raise FileNotFoundError(f"工作流文件不存在: {self.workflow_path}")
 
-            with open(workflow_file, encoding="utf-8") as f:
-                self.workflow_json = json.load(f)
+            self.workflow_json = load_workflow_json(workflow_file)
 
             # 提取替换配置
             self.replace_config = self.workflow_json.get("config", {}).get(
                 "replace_targets", {}
             )
+            self._ksampler_node_ids = tuple(
+                node_id
+                for node_id, node_data in self.workflow_json.items()
+                if node_id != "config" and node_data.get("class_type") == "KSampler"
+            )
 
             logger.info(f"成功加载ComfyUI工作流: {self.workflow_path}")
             logger.info(f"替换配置: {self.replace_config}")
@@ -89,69 +144,69 @@ def _find_replaceable_nodes(self) -> dict[str, dict[str, Any]]:
                             self._extract_placeholders(value)
                         )
 
-            # 方法3: 基于节点类型和内容的启发式检测
-            class_type = node_data.get("class_type")
-
-            # 支持 CLIPTextEncode 类型（ComfyUI 的标准文本编码节点）
-            if class_type == "CLIPTextEncode":
-                node_data.get("inputs", {}).get("text", "")
-                meta_title = node_data.get("_meta", {}).get("title", "")
-
-                # 只替换标题为 "prompts" 的节点（正向提示词）
-                if meta_title == "prompts":
-                    replaceable_nodes[node_id] = {
-                        "class_type": class_type,
-                        "method": "heuristic",
-                        "target": "text",
-                        "prompt_type": "positive",
-                    }
-
-            # 支持 PrimitiveStringMultiline 类型
-            elif class_type == "PrimitiveStringMultiline":
-                value = node_data.get("inputs", {}).get("value", "")
-                if self._is_likely_prompt_node(node_id, value):
-                    replaceable_nodes[node_id] = {
-                        "class_type": class_type,
-                        "method": "heuristic",
-                        "target": "value",
-                        "prompt_type": self._detect_prompt_type(value),
-                    }
+            # 方法3: 按节点类型分派到对应的启发式检测
+            detector = self._HEURISTIC_DETECTORS.get(node_data.get("class_type"))
+            if detector is not None:
+                node_info = detector(self, node_id, node_data)
+                if node_info is not None:
+                    replaceable_nodes[node_id] = node_info
 
         return replaceable_nodes
 
+    def _detect_clip_text_node(
+        self,
+        node_id: str,  # noqa: ARG002 - 与其他检测方法保持相同签名
+        node_data: dict[str, Any],
+    ) -> dict[str, Any] | None:
+        """CLIPTextEncode（ComfyUI 的标准文本编码节点）."""
+        # 只替换标题为 "prompts" 的节点（正向提示词）
+        if node_data.get("_meta", {}).get("title", "") != "prompts":
+            return None
+        return {
+            "class_type": "CLIPTextEncode",
+            "method": "heuristic",
+            "target": "text",
+            "prompt_type": "positive",
+        }
+
+    def _detect_primitive_string_node(
+        self, node_id: str, node_data: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """PrimitiveStringMultiline 多行文本节点."""
+        value = node_data.get("inputs", {}).get("value", "")
+        if not self._is_likely_prompt_node(node_id, value):
+            return None
+        return {
+            "class_type": "PrimitiveStringMultiline",
+            "method": "heuristic",
+            "target": "value",
+            "prompt_type": self._detect_prompt_type(value),
+        }
+
+    # class_type -> 启发式检测方法,每个节点只做一次字典查找
+    _HEURISTIC_DETECTORS = {
+        "CLIPTextEncode": _detect_clip_text_node,
+        "PrimitiveStringMultiline": _detect_primitive_string_node,
+    }
+
     def _has_placeholders(self, text: str) -> bool:
         """检查文本是否包含占位符."""
-        placeholders = [
-            "{{PROMPT}}",
-            "{{USER_PROMPT}}",
-            "{{NEGATIVE_PROMPT}}",
-            "{{STYLE_PREFIX}}",
-            "{{STYLE_SUFFIX}}",
-            "{{STEPS}}",
-            "{{CFG}}",
-        ]
-        return any(placeholder in text for placeholder in placeholders)
+        return any(placeholder in text for placeholder in _PLACEHOLDERS)
 
     def _extract_placeholders(self, text: str) -> list[str]:
         """提取文本中的占位符."""
-        import re
-
-        pattern = r"\{\{([^}]+)\}\}"
-        return re.findall(pattern, text)
+        return _PLACEHOLDER_PATTERN.findall(text)
 
     def _is_likely_prompt_node(self, node_id: str, value: str) -> bool:
         """启发式判断是否为提示词节点."""
         # 基于节点ID的启发式规则
-        prompt_keywords = ["prompt", "text", "input", "description"]
-        negative_keywords = ["negative", "bad", "worst"]
-
         node_id_lower = node_id.lower()
 
         # 检查是否包含提示词关键词
-        if any(keyword in node_id_lower for keyword in prompt_keywords):
+        if any(keyword in node_id_lower for keyword in _PROMPT_NODE_KEYWORDS):
             # 进一步检查是否不是负面提示词
             if not any(
-                neg_keyword in node_id_lower for neg_keyword in negative_keywords
+                neg_keyword in node_id_lower for neg_keyword in _NEGATIVE_NODE_KEYWORDS
             ):
                 return True
 
@@ -163,29 +218,11 @@ def _detect_prompt_type(self, value: str) -> str:
         value_lower = value.lower()
 
         # 检查负面提示词关键词
-        negative_keywords = [
-            "blurry",
-            "worst quality",
-            "low quality",
-            "jpeg artifacts",
-            "nsfw",
-            "bad",
-            "ugly",
-            "deformed",
-        ]
-        if any(neg_word in value_lower for neg_word in negative_keywords):
+        if any(neg_word in value_lower for neg_word in _NEGATIVE_PROMPT_KEYWORDS):
             return "negative"
 
         # 检查正面提示词关键词
-        positive_keywords = [
-            "high quality",
-            "masterpiece",
-            "best quality",
-            "beautiful",
-            "anime style",
-            "detailed",
-        ]
-        if any(pos_word in value_lower for pos_word in positive_keywords):
+        if any(pos_word in value_lower for pos_word in _POSITIVE_PROMPT_KEYWORDS):
             return "positive"
 
         # 根据节点元数据标题判断
@@ -214,7 +251,7 @@ def _prepare_workflow_v2(
         Returns:
             准备好的工作流数据
         """
-        workflow_data = json.loads(json.dumps(self.workflow_json))
+        workflow_data = orjson.loads(orjson.dumps(self.workflow_json))
         replaceable_nodes = self._find_replaceable_nodes()
 
         logger.info(f"找到 {len(replaceable_nodes)} 个可替换节点")
@@ -272,11 +309,11 @@ def _prepare_workflow_v2(
                     elif prompt_type == "user":
                         inputs[target_field] = user_prompt
 
-            # 处理特殊参数
-            if steps is not None:
-                self._set_parameter(workflow_data, steps, "steps")
-            if cfg is not None:
-                self._set_parameter(workflow_data, cfg, "cfg")
+        # 处理特殊参数
+        if steps is not None:
+            self._set_parameter(workflow_data, steps, "steps")
+        if cfg is not None:
+            self._set_parameter(workflow_data, cfg, "cfg")
 
         return workflow_data
 
@@ -289,33 +326,23 @@ def _set_random_seed(self, workflow_data: dict[str, Any], seed: int | None = Non
         else:
             logger.info(f"使用指定种子: {seed}")
 
-        for node_id, node_data in workflow_data.items():
-            if node_id == "config":
-                continue
-
-            class_type = node_data.get("class_type")
-            if class_type == "KSampler":
-                inputs = node_data.get("inputs", {})
-                if "seed" in inputs:
-                    inputs["seed"] = seed
-                    logger.info(f"设置种子 = {seed} 在KSampler节点 {node_id}")
-                    break
+        for node_id in self._ksampler_node_ids:
+            inputs = workflow_data[node_id].get("inputs", {})
+            if "seed" in inputs:
+                inputs["seed"] = seed
+                logger.info(f"设置种子 = {seed} 在KSampler节点 {node_id}")
+                break
 
     def _set_parameter(
         self, workflow_data: dict[str, Any], value: Any, param_name: str
     ):
         """设置工作流参数."""
-        for node_id, node_data in workflow_data.items():
-            if node_id == "config":
-                continue
-
-            class_type = node_data.get("class_type")
-            if class_type == "KSampler":
-                inputs = node_data.get("inputs", {})
-                if param_name in inputs:
-                    inputs[param_name] = value
-                    logger.info(f"设置 {param_name} = {value} 在节点 {node_id}")
-                    break
+        for node_id in self._ksampler_node_ids:
+            inputs = workflow_data[node_id].get("inputs", {})
+            if param_name in inputs:
+                inputs[param_name] = value
+                logger.info(f"设置 {param_name} = {value} 在节点 {node_id}")
+                break
 
     async def generate_image_v2(
         self,
@@ -358,8 +385,12 @@ async def generate_image_v2(
             self._set_random_seed(workflow_data)
 
             # 调用ComfyUI API
-            response = requests.post(
-                f"{self.base_url}/prompt", json={"prompt": workflow_data}, timeout=30
+            response = await comfyui_request(
+                "POST",
+                f"{self.base_url}/prompt",
+                data=orjson.dumps({"prompt": workflow_data}),
+                headers=_JSON_HEADERS,
+                timeout=30,
             )
 
             if response.status_code == 200:
@@ -391,9 +422,11 @@ async def generate_image_v2(
     async def check_task_status(self, task_id: str) -> dict[str, Any]:
         """检查任务状态."""
         try:
-            response = requests.get(f"{self.base_url}/history/{task_id}", timeout=10)
+            response = await comfyui_request(
+                "GET", f"{self.base_url}/history/{task_id}", timeout=10
+            )
             if response.status_code == 200:
-                return response.json().get(task_id, {})
+                return orjson.loads(response.content).get(task_id, {})
             else:
                 logger.error(f"查询任务状态失败: {response.status_code}")
                 return {}
@@ -417,20 +450,14 @@ async def wait_for_completion(
                 await asyncio.sleep(2)
                 continue
 
-            status = task_info.get("status", {})
-            if status.get("status_str") == "completed":
-                outputs = task_info.get("outputs", {})
-                images = []
-                for node_output in outputs.values():
-                    if "images" in node_output:
-                        for image in node_output["images"]:
-                            filename = image.get("filename")
-                            if filename:
-                                images.append(filename)
-                                logger.info(f"找到生成的图片: {filename}")
-                return images if images else None
-            elif status.get("status_str") in ["error", "failed"]:
-                logger.error(f"任务失败: {status.get('messages', [])}")
+            result = parse_history(task_info)
+            if result.finished:
+                if result.images:
+                    logger.info(f"找到生成的图片: {result.images}")
+                return list(result.images) or None
+            elif result.failed:
+                messages = task_info.get("status", {}).get("messages", [])
+                logger.error(f"任务失败: {messages}")
                 return None
 
             await asyncio.sleep(3)
@@ -442,7 +469,9 @@ def get_image_url(self, filename: str) -> str:
     async def get_image_data(self, filename: str) -> bytes | None:
         """获取图片二进制数据."""
         try:
-            response = requests.get(self.get_image_url(filename), timeout=30)
+            response = await comfyui_request(
+                "GET", self.get_image_url(filename), timeout=30
+            )
             if response.status_code == 200:
                 return response.content
             else:
@@ -486,15 +515,16 @@ async def generate_images_batch(
 
         generated_images = []
 
-        # 并发生成图片（限制并发数以避免过载）
-        semaphore = asyncio.Semaphore(3)  # 最多同时3个生成任务
+        # 并发生成图片：只限制同时提交的请求数以避免过载，
+        # 提交后的等待不占用名额，所有提示词尽早进入ComfyUI队列
+        semaphore = asyncio.Semaphore(3)  # 最多同时3个提交请求
 
         async def generate_single_image(prompt: str, index: int) -> str | None:
             """生成单张图片."""
-            async with semaphore:
-                try:
-                    logger.info(f"生成第 {index + 1} 张图片: {prompt[:50]}...")
+            try:
+                logger.info(f"生成第 {index + 1} 张图片: {prompt[:50]}...")
 
+                async with semaphore:
                     task_id = await self.generate_image_v2(
                         user_prompt=prompt,
                         negative_prompt=negative_prompt,
@@ -504,63 +534,63 @@ async def generate_single_image(prompt: str, index: int) -> str | None:
                         cfg=cfg,
                     )
 
-                    if task_id:
-                        # 等待生成完成并获取结果
-                        await asyncio.sleep(1)  # 等待任务开始
-
-                        # 轮询任务状态
-                        max_wait_time = 120  # 最大等待2分钟
-                        wait_interval = 2
-                        waited_time = 0
-
-                        while waited_time < max_wait_time:
-                            history = await self.get_history(task_id)
-
-                            if history and task_id in history:
-                                task_data = history[task_id]
-
-                                if task_data.get("status", {}).get("completed", False):
-                                    # 获取输出图片 - 优先查找最终输出文件(type="output")，而不是临时文件
-                                    outputs = task_data.get("outputs", {})
-                                    output_filename = None
-                                    temp_filename = None
-
-                                    for node_output in outputs.values():
-                                        if "images" in node_output:
-                                            for image_info in node_output["images"]:
-                                                filename = image_info.get("filename")
-                                                image_type = image_info.get("type", "")
-                                                if filename:
-                                                    if image_type == "output":
-                                                        output_filename = filename
-                                                    elif image_type == "temp":
-                                                        temp_filename = filename
-
-                                    # 优先返回最终输出文件，如果没有则返回临时文件
-                                    final_filename = output_filename or temp_filename
-                                    if final_filename:
-                                        logger.info(
-                                            f"第 {index + 1} 张图片生成完成: {final_filename} (类型: {'output' if output_filename else 'temp'})"
-                                        )
-                                        return final_filename
-
-                                # 如果任务失败，跳出循环
-                                if (
-                                    task_data.get("status", {}).get("status_str")
-                                    == "error"
-                                ):
-                                    logger.error(f"第 {index + 1} 张图片生成失败")
-                                    break
-
-                            await asyncio.sleep(wait_interval)
-                            waited_time += wait_interval
-
-                        logger.warning(f"第 {index + 1} 张图片生成超时")
-                    return None
+                if task_id:
+                    # 等待生成完成并获取结果
+                    await asyncio.sleep(1)  # 等待任务开始
 
-                except (OSError, requests.RequestException, ValueError, json.JSONDecodeError) as e:
-                    logger.error(f"生成第 {index + 1} 张图片时出错: {e}")
-                    return None
+                    # 轮询任务状态
+                    # 排在队列后面的任务还要等前面的任务完成，每靠后一张多等2分钟，最多10分钟
+                    max_wait_time = min(
+                        _BATCH_WAIT_PER_IMAGE * (index + 1), _BATCH_MAX_WAIT
+                    )
+                    wait_interval = 2
+                    waited_time = 0
+
+                    while waited_time < max_wait_time:
+                        history = await self.get_history(task_id)
+
+                        if history and task_id in history:
+                            task_data = history[task_id]
+
+                            if task_data.get("status", {}).get("completed", False):
+                                # 获取输出图片 - 优先查找最终输出文件(type="output")，而不是临时文件
+                                outputs = task_data.get("outputs", {})
+                                output_filename = None
+                                temp_filename = None
+
+                                for node_output in outputs.values():
+                                    if "images" in node_output:
+                                        for image_info in node_output["images"]:
+                                            filename = image_info.get("filename")
+                                            image_type = image_info.get("type", "")
+                                            if filename:
+                                                if image_type == "output":
+                                                    output_filename = filename
+                                                elif image_type == "temp":
+                                                    temp_filename = filename
+
+                                # 优先返回最终输出文件，如果没有则返回临时文件
+                                final_filename = output_filename or temp_filename
+                                if final_filename:
+                                    logger.info(
+                                        f"第 {index + 1} 张图片生成完成: {final_filename} (类型: {'output' if output_filename else 'temp'})"
+                                    )
+                                    return final_filename
+
+                            # 如果任务失败，跳出循环
+                            if task_data.get("status", {}).get("status_str") == "error":
+                                logger.error(f"第 {index + 1} 张图片生成失败")
+                                break
+
+                        await asyncio.sleep(wait_interval)
+                        waited_time += wait_interval
+
+                    logger.warning(f"第 {index + 1} 张图片生成超时")
+                return None
+
+            except (OSError, requests.RequestException, ValueError, json.JSONDecodeError) as e:
+                logger.error(f"生成第 {index + 1} 张图片时出错: {e}")
+                return None
 
         # 创建并发任务
         tasks = [generate_single_image(prompt, i) for i, prompt in enumerate(prompts)]
@@ -591,9 +621,11 @@ async def get_history(self, prompt_id: str) -> dict[str, Any] | None:
             历史记录数据
         """
         try:
-            response = requests.get(f"{self.base_url}/history/{prompt_id}", timeout=10)
+            response = await comfyui_request(
+                "GET", f"{self.base_url}/history/{prompt_id}", timeout=10
+            )
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             else:
                 logger.error(f"获取历史记录失败: {response.status_code}")
                 return None
@@ -604,7 +636,9 @@ async def get_history(self, prompt_id: str) -> dict[str, Any] | None:
     async def health_check(self) -> bool:
         """检查ComfyUI服务健康状态."""
         try:
-            response = requests.get(f"{self.base_url}/system_stats", timeout=5)
+            response = await comfyui_request(
+                "GET", f"{self.base_url}/system_stats", timeout=5
+            )
             return response.status_code == 200
         except (OSError, requests.RequestException, ValueError, json.JSONDecodeError) as e:
             logger.error(f"ComfyUI健康检查失败: {e}")
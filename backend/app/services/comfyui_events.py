@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+ComfyUI 任务执行事件订阅.
+
+ComfyUI 通过 /ws?clientId=... 向提交任务时携带相同 clientId 的连接推送执行事件,
+等待任务完成时订阅事件即可,不必定时轮询 /history.
+每个ComfyUI服务器只保持一条连接,所有任务共用.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# WebSocket 长时间无消息时回查一次任务历史,防止漏掉完成事件
+_WS_RECV_TIMEOUT = 30.0
+
+# 心跳间隔与超时(秒):长时间生成期间连接可能静默失效,ping 超时即断开重连
+_WS_PING_INTERVAL = 20.0
+_WS_PING_TIMEOUT = 20.0
+
+# 单次等待中连接断开后最多重连的次数,超过后调用方退化为轮询
+_WS_MAX_RECONNECTS = 3
+
+# WebSocket 不可用时抛出的异常,调用方据此退化为轮询
+WEBSOCKET_ERRORS = (OSError, TimeoutError, websockets.WebSocketException)
+
+# 退化为轮询时的等待间隔(秒):从很短的间隔开始,按倍数增长到上限
+_POLL_INITIAL_DELAY = 0.1
+_POLL_BACKOFF = 1.5
+_POLL_MAX_DELAY = 2.0
+
+
+def poll_delays() -> Iterator[float]:
+    """生成轮询任务历史的等待间隔.
+
+    很快完成的任务第一次查询即可拿到结果,耗时长的任务稳定在每2秒查询一次.
+    """
+    delay = _POLL_INITIAL_DELAY
+    while True:
+        yield delay
+        delay = min(delay * _POLL_BACKOFF, _POLL_MAX_DELAY)
+
+
+def _event_prompt_id(message: str) -> tuple[dict[str, Any], Any] | None:
+    """解析一条文本消息,返回 (事件, prompt_id),格式不符时返回None."""
+    try:
+        event = json.loads(message)
+    except ValueError:
+        return None
+    if not isinstance(event, dict):
+        return None
+    data = event.get("data") or {}
+    if not isinstance(data, dict):
+        return None
+    return event, data.get("prompt_id")
+
+
+def is_prompt_finished(event: dict[str, Any], task_id: str) -> bool:
+    """判断一条执行事件是否表示任务执行结束."""
+    data = event.get("data") or {}
+    if data.get("prompt_id") != task_id:
+        return False
+
+    # executing 且 node 为空表示整个任务执行完毕
+    event_type = event.get("type")
+    return event_type in ("execution_success", "execution_error") or (
+        event_type == "executing" and data.get("node") is None
+    )
+
+
+class PromptEventListener:
+    """一个ComfyUI服务器的执行事件订阅.
+
+    同一事件循环内的所有任务共用一个 clientId 和一条 WebSocket 连接,
+    后台任务接收事件并按 prompt_id 唤醒对应的等待者.
+    """
+
+    def __init__(self, base_url: str):
+        """初始化事件订阅.
+
+        Args:
+            base_url: ComfyUI服务器基础URL
+        """
+        ws_base = base_url.replace("http", "ws", 1)
+        self.client_id = uuid.uuid4().hex
+        self.loop = asyncio.get_running_loop()
+        self._ws_url = f"{ws_base}/ws?clientId={self.client_id}"
+        self._waiters: dict[str, asyncio.Future[None]] = {}
+        self._receiver: asyncio.Task[None] | None = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _ensure_connected(self) -> None:
+        """连接尚未建立或已断开时重新连接并启动接收任务."""
+        async with self._connect_lock:
+            if self._receiver is not None and not self._receiver.done():
+                return
+            ws = await websockets.connect(
+                self._ws_url,
+                max_size=None,
+                ping_interval=_WS_PING_INTERVAL,
+                ping_timeout=_WS_PING_TIMEOUT,
+            )
+            self._receiver = asyncio.create_task(self._receive(ws))
+
+    async def _receive(self, ws: websockets.ClientConnection) -> None:
+        """接收执行事件,唤醒已结束任务的等待者."""
+        error: Exception = ConnectionError("ComfyUI WebSocket 连接已关闭")
+        try:
+            # 接收结束(断开、出错或被取消)时关闭连接
+            async with ws:
+                async for message in ws:
+                    # 二进制消息是采样预览图,忽略
+                    if isinstance(message, bytes):
+                        continue
+
+                    parsed = _event_prompt_id(message)
+                    if parsed is None:
+                        logger.debug(f"忽略无法解析的 ComfyUI 消息: {message[:200]}")
+                        continue
+                    event, task_id = parsed
+                    waiter = self._waiters.get(task_id)
+                    if (
+                        waiter is not None
+                        and not waiter.done()
+                        and is_prompt_finished(event, task_id)
+                    ):
+                        waiter.set_result(None)
+        except websockets.WebSocketException as e:
+            error = ConnectionError(f"ComfyUI WebSocket 连接中断: {e}")
+        except Exception as e:
+            # 其他异常同样交给等待者处理,不让接收任务带着未取回的异常结束
+            logger.error(f"ComfyUI WebSocket 接收事件失败: {e}")
+            error = ConnectionError(f"ComfyUI WebSocket 接收事件失败: {e}")
+        finally:
+            # 连接断开后收不到事件,让等待者改为查询历史
+            for waiter in self._waiters.values():
+                if not waiter.done():
+                    waiter.set_exception(error)
+
+    async def wait(
+        self, task_id: str, check_history: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """阻塞到任务执行结束.
+
+        Args:
+            task_id: 任务ID
+            check_history: 查询任务历史的协程函数,任务结束后返回非空结果
+
+        Raises:
+            WEBSOCKET_ERRORS 中的异常: WebSocket 无法连接或连接中断
+        """
+        waiter = await self._register(task_id)
+        reconnects = 0
+        try:
+            while True:
+                # 注册等待者之前或重连期间任务可能已经结束,先查一次历史
+                if await check_history():
+                    return
+
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), _WS_RECV_TIMEOUT)
+                    return
+                except TimeoutError:
+                    # 长时间没有收到完成事件,回到循环开头回查历史防止漏掉
+                    continue
+                except ConnectionError as e:
+                    if reconnects >= _WS_MAX_RECONNECTS:
+                        raise
+                    reconnects += 1
+                    logger.warning(
+                        f"ComfyUI WebSocket 断开,第 {reconnects} 次重连: {e}"
+                    )
+                    waiter = await self._register(task_id)
+        finally:
+            if self._waiters.get(task_id) is waiter:
+                del self._waiters[task_id]
+            if waiter.done() and not waiter.cancelled():
+                # 标记异常已处理,避免未取回的异常在回收时告警
+                waiter.exception()
+
+    async def close(self) -> None:
+        """停止接收事件并关闭连接,尚在等待的任务会收到 ConnectionError."""
+        async with self._connect_lock:
+            receiver, self._receiver = self._receiver, None
+        if receiver is not None and not receiver.done():
+            receiver.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await receiver
+
+    async def _register(self, task_id: str) -> asyncio.Future[None]:
+        """确保连接可用,并为任务注册新的等待者."""
+        await self._ensure_connected()
+        waiter = self.loop.create_future()
+        self._waiters[task_id] = waiter
+        return waiter
+
+
+# ComfyUI服务器基础URL -> 事件订阅
+_listeners: dict[str, PromptEventListener] = {}
+
+
+def prompt_listener(base_url: str) -> PromptEventListener:
+    """获取当前事件循环中某个ComfyUI服务器的事件订阅(首次使用时创建).
+
+    提交任务时应使用返回对象的 client_id,任务的执行事件才会推送到该订阅.
+    """
+    listener = _listeners.get(base_url)
+    if listener is None or listener.loop is not asyncio.get_running_loop():
+        listener = _listeners[base_url] = PromptEventListener(base_url)
+    return listener
+
+
+async def close_listeners() -> None:
+    """关闭当前事件循环中的所有事件订阅,应用关闭时调用."""
+    loop = asyncio.get_running_loop()
+    for base_url, listener in list(_listeners.items()):
+        if listener.loop is loop:
+            del _listeners[base_url]
+            await listener.close()
+
+
+async def wait_for_prompt(
+    base_url: str,
+    task_id: str,
+    check_history: Callable[[], Awaitable[Any]],
+) -> None:
+    """通过共享的WebSocket连接等待任务执行结束.
+
+    Args:
+        base_url: ComfyUI服务器基础URL
+        task_id: 任务ID,须由 prompt_listener(base_url).client_id 提交
+        check_history: 查询任务历史的协程函数,任务结束后返回非空结果
+
+    Raises:
+        WEBSOCKET_ERRORS 中的异常: WebSocket 无法连接或连接中断
+    """
+    await prompt_listener(base_url).wait(task_id, check_history)
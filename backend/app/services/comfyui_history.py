@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+ComfyUI 任务历史解析.
+
+/history/{task_id} 返回的单个任务记录形如
+{"status": {"status_str": "success", ...}, "outputs": {节点ID: {"images": [...]}}},
+各客户端统一通过 parse_history 读取任务状态和生成的图片文件名.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+# ComfyUI 表示任务成功/失败的 status_str 取值
+_FINISHED_STATUSES = frozenset({"success", "completed"})
+_FAILED_STATUSES = frozenset({"error", "failed"})
+
+
+@dataclass(slots=True)
+class HistoryResult:
+    """单个任务的历史记录解析结果."""
+
+    status: str
+    images: tuple[str, ...]
+
+    @property
+    def finished(self) -> bool:
+        """任务是否已成功结束."""
+        return self.status in _FINISHED_STATUSES
+
+    @property
+    def failed(self) -> bool:
+        """任务是否执行失败."""
+        return self.status in _FAILED_STATUSES
+
+
+def parse_history(task_info: dict[str, Any]) -> HistoryResult:
+    """解析 /history/{task_id} 中的单个任务记录.
+
+    Args:
+        task_info: 任务记录,任务尚未出现在历史中时为空字典
+
+    Returns:
+        任务状态和按输出节点顺序排列的图片文件名
+    """
+    status = task_info.get("status", {}).get("status_str", "unknown")
+    images = tuple(
+        image["filename"]
+        for node_output in task_info.get("outputs", {}).values()
+        for image in node_output.get("images", ())
+        if image.get("filename")
+    )
+    return HistoryResult(status, images)
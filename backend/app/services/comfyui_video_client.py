@@ -11,13 +11,19 @@
 from pathlib import Path
 from typing import Any
 
+import orjson
 import requests
 from requests.exceptions import RequestException, Timeout
 
 from ..config import settings
+from ..workflow_config.workflow_config import load_workflow_json, load_workflow_text
+from .comfyui_client import comfyui_request
 
 logger = logging.getLogger(__name__)
 
+# 工作流请求体已由 orjson 序列化为字节,直接作为 data 发送
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class ComfyUIVideoClient:
     """ComfyUI图生视频客户端."""
@@ -43,8 +49,7 @@ def _load_workflow(self) -> None:
                     f"图生视频工作流文件不存在: {self.workflow_path}"
                 )
 
-            with open(workflow_file, encoding="utf-8") as f:
-                self.workflow_json = json.load(f)
+            self.workflow_json = load_workflow_json(workflow_file)
 
             logger.info(f"成功加载ComfyUI图生视频工作流: {self.workflow_path}")
 
@@ -70,7 +75,7 @@ def replace_image_placeholder(
 
         try:
             # 深拷贝工作流数据
-            updated_workflow = json.loads(json.dumps(workflow_data))
+            updated_workflow = orjson.loads(orjson.dumps(workflow_data))
 
             # 遍历所有节点，查找并替换图片占位符
             for node_id, node_data in updated_workflow.items():
@@ -114,16 +119,17 @@ async def generate_video_from_image(
         try:
             comfyui_url = settings.comfyui_api_url
             image_url = f"{comfyui_url}/view?filename={image_filename}"
-            response = requests.get(image_url, timeout=30)
+            response = await comfyui_request("GET", image_url, timeout=30)
             upload_url = f"{comfyui_url}/upload/image"
-            response = requests.post(
+            response = await comfyui_request(
+                "POST",
                 upload_url,
                 files={"image": (image_filename, response.content, "image/png")},
                 timeout=30,
             )
 
             # 准备工作流数据
-            workflow_data = open(self.workflow_path, encoding="utf-8").read()
+            workflow_data = load_workflow_text(self.workflow_path)
 
             # 替换图片占位符
             workflow_data = workflow_data.replace(
@@ -139,9 +145,11 @@ async def generate_video_from_image(
             )
 
             # 调用ComfyUI API
-            response = requests.post(
+            response = await comfyui_request(
+                "POST",
                 f"{self.base_url}/prompt",
-                json={"prompt": json.loads(workflow_data)},
+                data=orjson.dumps({"prompt": orjson.loads(workflow_data)}),
+                headers=_JSON_HEADERS,
                 timeout=30,
             )
 
@@ -256,9 +264,11 @@ async def check_video_generation_status(self, task_id: str) -> dict[str, Any]:
             任务状态信息
         """
         try:
-            response = requests.get(f"{self.base_url}/history/{task_id}", timeout=10)
+            response = await comfyui_request(
+                "GET", f"{self.base_url}/history/{task_id}", timeout=10
+            )
             if response.status_code == 200:
-                return response.json().get(task_id, {})
+                return orjson.loads(response.content).get(task_id, {})
             else:
                 logger.error(f"查询视频生成任务状态失败: {response.status_code}")
                 return {}
@@ -347,7 +357,7 @@ async def get_video_data(
                 url += f"&subfolder={subfolder}"
 
             logger.info(f"从ComfyUI API获取视频: {url}")
-            response = requests.get(url, timeout=60)
+            response = await comfyui_request("GET", url, timeout=60)
             if response.status_code == 200:
                 logger.info(
                     f"✅ 成功获取视频: {filename}, 大小: {len(response.content)} bytes"
@@ -363,7 +373,9 @@ async def get_video_data(
     async def health_check(self) -> bool:
         """检查ComfyUI服务健康状态."""
         try:
-            response = requests.get(f"{self.base_url}/system_stats", timeout=5)
+            response = await comfyui_request(
+                "GET", f"{self.base_url}/system_stats", timeout=5
+            )
             return response.status_code == 200
         except (OSError, requests.RequestException, ValueError, json.JSONDecodeError) as e:
             logger.error(f"ComfyUI健康检查失败: {e}")
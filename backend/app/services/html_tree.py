@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+HTML 文档树解析
+
+各爬虫直接用 lxml 构建文档树并执行预编译 XPath。
+lxml 拒绝的页面(如带 XML 编码声明的 str、残缺标记)交给 BeautifulSoup 修复后再解析,
+保证换用 lxml 后不会比原先的 BeautifulSoup 解析丢失页面。
+"""
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+
+def parse_html(content: str | bytes) -> lxml.html.HtmlElement:
+    """使用 lxml 直接解析 HTML,失败时回退到 BeautifulSoup 修复后再解析
+
+    Args:
+        content: 页面 HTML
+
+    Raises:
+        etree.ParserError: 修复后仍无法解析(如空文档)
+    """
+    try:
+        return lxml.html.document_fromstring(content)
+    except (etree.ParserError, ValueError):
+        return lxml.html.document_fromstring(str(BeautifulSoup(content, "lxml")))
@@ -6,14 +6,37 @@
 """
 
 import asyncio
+import codecs
 import os
+import re
 import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 
 import requests
 from bs4 import BeautifulSoup
+from urllib3.util.request import ACCEPT_ENCODING
+
+# 页面开头声明的编码: <meta charset="gbk"> 或 content="text/html; charset=gbk"
+_META_CHARSET_RE = re.compile(rb"""charset\s*=\s*["']?([\w-]+)""", re.IGNORECASE)
+
+# 只在页面前 1KB 中查找编码声明
+_CHARSET_SNIFF_BYTES = 1024
+
+# 连接池: 缓存的主机数与每个主机保留的连接数
+# 请求在默认线程池中执行(最多 32 个线程)，连接数与之匹配，并发时不必反复新建连接
+_POOL_CONNECTIONS = 16
+_POOL_MAXSIZE = 32
+
+# 需要重试的服务端临时错误状态码
+_RETRY_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+# GET 响应缓存: 最多保留的 URL 数(按最近使用淘汰)与新鲜期(秒)
+# 过期后携带 ETag / Last-Modified 发送条件请求，服务器返回 304 时直接复用缓存内容
+_RESPONSE_CACHE_SIZE = 512
+_RESPONSE_CACHE_TTL = 600
 
 
 class RequestStrategy(Enum):
@@ -95,7 +118,8 @@ class RequestsClient(IHttpClient):
 
     def __init__(self):
         self.session = requests.Session()
-        self._cache: dict[str, Response] = {}
+        # url -> (过期时间, 响应)
+        self._cache: OrderedDict[str, tuple[float, Response]] = OrderedDict()
         self._setup_default_headers()
         self._setup_ssl_context()
         self._setup_proxy_from_env()
@@ -107,7 +131,9 @@ def _setup_default_headers(self):
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
                 "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
+                # 由 urllib3 按已安装的解码器生成(安装 brotli 后包含 br)，
+                # 避免声明了 br 却无法解压服务器返回的内容
+                "Accept-Encoding": ACCEPT_ENCODING,
                 "DNT": "1",
                 "Connection": "keep-alive",
                 "Upgrade-Insecure-Requests": "1",
@@ -132,13 +158,20 @@ def _setup_ssl_context(self):
         ssl_context.verify_mode = ssl.CERT_NONE
 
         # 设置适配器
+        # 退避重试统一由 _execute_request 按 RequestConfig 执行(asyncio.sleep 不占用线程)，
+        # 适配器只对连接失败(如复用的 keep-alive 连接已被服务器关闭)立即重试一次，
+        # 避免两层重试叠加成数倍的请求次数和阻塞线程的 time.sleep
         adapter = HTTPAdapter(
+            pool_connections=_POOL_CONNECTIONS,
+            pool_maxsize=_POOL_MAXSIZE,
             max_retries=Retry(
-                total=5,
-                backoff_factor=0.5,
-                status_forcelist=[500, 502, 503, 504],
+                total=1,
+                connect=1,
+                read=0,
+                status=0,
+                backoff_factor=0,
                 allowed_methods=["GET", "POST"],
-            )
+            ),
         )
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
@@ -148,16 +181,25 @@ async def get(self, url: str, config: RequestConfig | None = None) -> Response:
         config = config or RequestConfig()
 
         # 检查缓存
-        if url in self._cache:
-            cached_response = self._cache[url]
-            cached_response.from_cache = True
-            return cached_response
-
-        # 执行请求
-        response = await self._execute_request("GET", url, None, config)
+        cached_response = None
+        cached = self._cache.get(url)
+        if cached is not None:
+            expires_at, cached_response = cached
+            self._cache.move_to_end(url)
+            if expires_at > time.monotonic():
+                cached_response.from_cache = True
+                return cached_response
+
+        # 执行请求(缓存已过期时为条件请求)
+        response = await self._execute_request(
+            "GET", url, None, config, cached_response
+        )
 
         # 缓存响应
-        self._cache[url] = response
+        self._cache[url] = (time.monotonic() + _RESPONSE_CACHE_TTL, response)
+        self._cache.move_to_end(url)
+        if len(self._cache) > _RESPONSE_CACHE_SIZE:
+            self._cache.popitem(last=False)
         return response
 
     async def post(
@@ -168,9 +210,17 @@ async def post(
         return await self._execute_request("POST", url, data, config)
 
     async def _execute_request(
-        self, method: str, url: str, data: dict | None, config: RequestConfig
+        self,
+        method: str,
+        url: str,
+        data: dict | None,
+        config: RequestConfig,
+        cached_response: Response | None = None,
     ) -> Response:
-        """执行HTTP请求"""
+        """执行HTTP请求
+
+        提供 cached_response 时发送条件请求，服务器返回 304 则复用该缓存响应。
+        """
         loop = asyncio.get_event_loop()
 
         # 准备请求头
@@ -179,6 +229,8 @@ async def _execute_request(
             headers.update(config.custom_headers)
         if config.headers:
             headers.update(config.headers)
+        if cached_response is not None:
+            headers.update(self._conditional_headers(cached_response))
 
         # 准备请求参数
         request_kwargs = {
@@ -221,6 +273,13 @@ async def _execute_request(
                         elapsed=elapsed,
                         strategy_used=RequestStrategy.SIMPLE,
                     )
+                elif r.status_code == 304 and cached_response is not None:
+                    # 内容未变化，不重新下载响应体
+                    cached_response.from_cache = True
+                    return cached_response
+                elif r.status_code in _RETRY_STATUS_CODES:
+                    # 服务端临时错误，交给下面的重试逻辑
+                    raise requests.HTTPError(f"HTTP {r.status_code}", response=r)
                 else:
                     raise Exception(f"HTTP {r.status_code}")
 
@@ -231,6 +290,18 @@ async def _execute_request(
 
         raise Exception("未知错误")
 
+    @staticmethod
+    def _conditional_headers(response: Response) -> dict[str, str]:
+        """根据缓存响应的 ETag / Last-Modified 构造条件请求头"""
+        headers = {}
+        for name, value in response.headers.items():
+            lowered = name.lower()
+            if lowered == "etag":
+                headers["If-None-Match"] = value
+            elif lowered == "last-modified":
+                headers["If-Modified-Since"] = value
+        return headers
+
     def _detect_encoding(self, response: requests.Response) -> str:
         """智能检测页面编码"""
         # 1. 优先使用HTTP头指定的编码
@@ -241,12 +312,17 @@ def _detect_encoding(self, response: requests.Response) -> str:
             elif encoding != "utf-8":
                 return encoding
 
-        # 2. 使用apparent_encoding
-        if hasattr(response, "apparent_encoding") and response.apparent_encoding:
-            encoding = response.apparent_encoding.lower()
+        # 2. 使用页面开头 meta 声明的编码
+        # 不用 apparent_encoding: chardet 是纯 Python 实现，会逐字节扫描整个响应体
+        match = _META_CHARSET_RE.search(response.content[:_CHARSET_SNIFF_BYTES])
+        if match:
+            encoding = match.group(1).decode("ascii").lower()
             if encoding in ["gb2312", "gbk"]:
                 return "gbk"
-            return encoding
+            try:
+                return codecs.lookup(encoding).name
+            except LookupError:
+                pass
 
         # 3. 默认utf-8
         return "utf-8"
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+ComfyUI 图片本地存储.
+
+图片首次从 ComfyUI 取回后按内容 SHA-256 落盘(相同图片只存一份),
+并以 ComfyUI 文件名建立索引，后续读取直接走本地磁盘，不再回源 GPU 主机。
+
+文件名索引假定 ComfyUI 不会复用输出文件名(SaveImage 按递增序号命名)。
+若清空了 ComfyUI 的输出目录导致序号重新开始，需同时清空本存储，
+否则相同文件名会返回旧图片。
+
+存储总大小超过 IMAGE_STORE_MAX_MB 时按最近使用时间淘汰最旧的图片，
+被淘汰的图片下次请求时重新从 ComfyUI 获取(设为 0 表示不限制)。
+需要手动清空时，删除 IMAGE_STORE_DIR 目录即可，服务运行中也可以删除。
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# 超出上限时淘汰到上限的该比例以下,避免之后每次写入都重新扫描
+_EVICT_LOW_WATERMARK = 0.9
+
+
+class ImageStore:
+    """按内容寻址的图片存储.
+
+    目录结构:
+        blobs/ab/<sha256>  图片字节,按内容哈希去重
+        names/<filename>   指向 blob 的硬链接,按 ComfyUI 文件名查找
+
+    读取命中时刷新文件的修改时间,淘汰时按修改时间从旧到新删除。
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = 0):
+        """初始化图片存储.
+
+        Args:
+            root: 存储根目录,首次写入时自动创建
+            max_bytes: 存储总大小上限(字节),0 表示不限制
+        """
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.name_dir = self.root / "names"
+        self.max_bytes = max_bytes
+        self._dirs_ready = False
+        # 已存储的总字节数,首次需要时扫描磁盘得到
+        self._total_bytes: int | None = None
+        self._evict_lock = threading.Lock()
+
+    def _ensure_dirs(self) -> None:
+        """首次写入时创建存储目录,仅导入模块不会在磁盘上留下目录."""
+        if not self._dirs_ready:
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            self.name_dir.mkdir(parents=True, exist_ok=True)
+            self._dirs_ready = True
+
+    def _blob_path(self, key: str) -> Path:
+        return self.blob_dir / key[:2] / key
+
+    def path(self, filename: str) -> Path | None:
+        """按 ComfyUI 文件名查找图片文件路径,未存储则返回 None."""
+        name_path = self.name_dir / filename
+        try:
+            # 刷新修改时间,记录最近使用(硬链接共享 inode,blob 同时更新)
+            os.utime(name_path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.debug(f"更新图片使用时间失败 {filename}: {e}")
+        return name_path if name_path.is_file() else None
+
+    def put_stream(self, filename: str, chunks: Iterable[bytes]) -> str:
+        """边接收边落盘保存图片,不在内存中拼接完整内容,返回内容哈希.
+
+        Args:
+            filename: ComfyUI 文件名
+            chunks: 图片数据分块(如 requests 的 iter_content)
+
+        Returns:
+            图片内容的 SHA-256
+        """
+        self._ensure_dirs()
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self.blob_dir)
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            key = digest.hexdigest()
+            blob_path = self._blob_path(key)
+            if blob_path.exists():
+                tmp_path.unlink()
+                size = 0
+            else:
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.replace(blob_path)
+        except BaseException:
+            # 下载中断时清理半个临时文件
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        self._link_name(filename, blob_path)
+        if self.max_bytes:
+            self._evict_if_needed(size)
+        return key
+
+    def _link_name(self, filename: str, blob_path: Path) -> None:
+        """为 blob 建立文件名索引(已存在则跳过)."""
+        name_path = self.name_dir / filename
+        if not name_path.exists():
+            try:
+                os.link(blob_path, name_path)
+            except FileExistsError:
+                pass
+            except OSError as e:
+                # 文件系统不支持硬链接时退化为复制
+                logger.debug(f"硬链接失败,改为复制: {e}")
+                shutil.copyfile(blob_path, name_path)
+
+    def _evict_if_needed(self, added_bytes: int) -> None:
+        """记录新写入的字节数,超出上限时淘汰最久未使用的图片."""
+        with self._evict_lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(e[1] for e in self._scan_entries().values())
+            else:
+                self._total_bytes += added_bytes
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            entries = self._scan_entries()
+            total = sum(size for _, size, _ in entries.values())
+            target = self.max_bytes * _EVICT_LOW_WATERMARK
+            evicted = 0
+            for _, size, paths in sorted(entries.values(), key=lambda e: e[0]):
+                if total <= target:
+                    break
+                for path in paths:
+                    path.unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+            self._total_bytes = total
+            logger.info(f"图片存储超出上限,淘汰 {evicted} 张图片")
+
+    def _scan_entries(self) -> dict[tuple[int, int], tuple[float, int, list[Path]]]:
+        """扫描存储中的文件,按 inode 合并 blob 与其文件名硬链接.
+
+        Returns:
+            (设备号, inode) -> (修改时间, 字节数, 全部路径)
+        """
+        entries: dict[tuple[int, int], tuple[float, int, list[Path]]] = {}
+        for path in (*self.blob_dir.glob("*/*"), *self.name_dir.iterdir()):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            inode = (stat.st_dev, stat.st_ino)
+            if inode in entries:
+                entries[inode][2].append(path)
+            else:
+                entries[inode] = (stat.st_mtime, stat.st_size, [path])
+        return entries
+
+
+image_store = ImageStore(
+    settings.image_store_dir, max_bytes=settings.image_store_max_mb * 1024 * 1024
+)
@@ -13,6 +13,7 @@
 from sqlalchemy.orm import Session
 
 from ..constants import TIMEOUT_SLOW
+from ..database import SESSION_LOCAL
 from ..models.scene_illustration import SceneImageGallery
 from ..models.text2img import ImageToVideoTask, RoleImageGallery
 from ..models.video_status import ImageVideoStatus
@@ -109,28 +110,32 @@ async def create_video_generation_task(
             )
             db.add(video_task)
             db.flush()  # 获取任务ID
+            task_id = video_task.id
 
             # 5. 更新视频状态为pending
             video_status.video_status = "pending"
-            video_status.current_task_id = video_task.id
+            video_status.current_task_id = task_id
             video_status.model_name = model_name  # 使用处理后的model_name
             video_status.user_input = request.user_input
             video_status.first_requested_at = datetime.now()
             video_status.retry_count = 0
             video_status.error_message = None
 
+            # 先提交，后台任务使用独立会话，需要能读到已提交的任务记录
+            db.commit()
+
             # 6. 异步处理视频生成
             import asyncio
 
             try:
                 # 创建异步任务并添加异常处理回调
+                # 只传递任务ID，后台任务自行创建数据库会话，不复用请求级会话
                 async_task = asyncio.create_task(
                     self._process_video_generation_async(
-                        task_id=video_task.id,
+                        task_id=task_id,
                         img_name=request.img_name,
                         model_name=model_name,  # 使用处理后的model_name
                         user_input=request.user_input,
-                        db=db,
                     )
                 )
 
@@ -140,7 +145,7 @@ def handle_task_exception(task: asyncio.Task) -> None:
                         exception = task.exception()
                         if exception:
                             logger.error(
-                                f"异步视频生成任务失败: task_id={video_task.id}, error={exception}"
+                                f"异步视频生成任务失败: task_id={task_id}, error={exception}"
                             )
                             # 这里可以添加额外的错误恢复逻辑
                     except (AttributeError, RuntimeError) as e:
@@ -148,17 +153,15 @@ def handle_task_exception(task: asyncio.Task) -> None:
 
                 async_task.add_done_callback(handle_task_exception)
 
-                logger.info(f"异步视频生成任务已创建: {video_task.id}")
+                logger.info(f"异步视频生成任务已创建: {task_id}")
             except RuntimeError as e:
                 logger.error(f"获取事件循环失败: {e}")
                 raise RuntimeError(f"无法创建异步任务: {e!s}")
 
-            db.commit()
-
-            logger.info(f"创建图生视频任务成功: {video_task.id}")
+            logger.info(f"创建图生视频任务成功: {task_id}")
 
             return ImageToVideoResponse(
-                task_id=video_task.id,
+                task_id=task_id,
                 img_name=request.img_name,
                 status="pending",
                 message="视频生成任务已创建，正在处理中",
@@ -288,20 +291,44 @@ def __init__(self, img_name, prompt, created_at):
         return None, None
 
     async def _process_video_generation_async(
-        self, task_id: int, img_name: str, model_name: str, user_input: str, db: Session
+        self, task_id: int, img_name: str, model_name: str, user_input: str
     ) -> None:
         """异步处理视频生成.
 
+        后台任务的生命周期长于请求，因此使用独立的数据库会话。
+
         Args:
             task_id: 任务ID
             img_name: 图片名称
             model_name: 模型名称（用于日志记录）
             user_input: 用户要求
-            db: 数据库会话
         """
+        task_db = SESSION_LOCAL()
         try:
-            task_db = db
+            await self._run_video_generation(
+                task_db, task_id, img_name, model_name, user_input
+            )
+        finally:
+            task_db.close()
+
+    async def _run_video_generation(
+        self,
+        task_db: Session,
+        task_id: int,
+        img_name: str,
+        model_name: str,
+        user_input: str,
+    ) -> None:
+        """视频生成处理流程.
 
+        Args:
+            task_db: 后台任务专用数据库会话
+            task_id: 任务ID
+            img_name: 图片名称
+            model_name: 模型名称（用于日志记录）
+            user_input: 用户要求
+        """
+        try:
             logger.info(
                 f"开始处理视频生成任务 {task_id}, 使用模型: {model_name}, 图片: {img_name}"
             )
@@ -619,7 +646,15 @@ def _extract_video_filename_from_outputs(self, outputs: dict) -> str | None:
             视频文件完整路径 (subfolder/filename)，失败返回None
         """
         try:
-            logger.info(f"ComfyUI返回的outputs结构: {json.dumps(outputs, indent=2, ensure_ascii=False)[:1000]}")
+            # INFO 只记录各节点的输出字段;完整结构可能很大,只在 DEBUG 时序列化
+            output_fields = {
+                node_id: list(node_output) for node_id, node_output in outputs.items()
+            }
+            logger.info(f"ComfyUI返回的outputs节点: {output_fields}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"ComfyUI返回的outputs结构: {json.dumps(outputs, indent=2, ensure_ascii=False)[:1000]}"
+                )
 
             # 第一优先级：查找save_output=true的节点（最终输出）
             for node_id, node_output in outputs.items():
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+HTML 解析进程池
+
+页面解析是 CPU 密集型操作，放到独立进程中执行可以绕开 GIL，
+让各爬虫在并发抓取网络页面的同时利用多核解析已返回的页面。
+
+工作进程由 forkserver 创建: 服务进程中已有线程池在运行，直接 fork
+会让子进程继承其他线程持有的锁(logging、urllib3 连接池等)而死锁。
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 解析进程池,应用启动时创建(或首次使用时创建),所有爬虫共享
+_parse_pool: ProcessPoolExecutor | None = None
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    """选择工作进程的启动方式(不支持 forkserver 的平台使用 spawn)"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """获取共享的解析进程池(尚未创建时立即创建)"""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=_mp_context()
+        )
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """关闭解析进程池，取消尚未开始的解析任务"""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
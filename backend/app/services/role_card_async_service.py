@@ -57,16 +57,17 @@ async def create_task(
             )
 
             db.add(task_record)
+            db.flush()  # 获取任务ID，提交后无需再 refresh
+            task_id = task_record.id
             db.commit()
-            db.refresh(task_record)
 
             # 启动后台任务
-            await self._start_background_task(task_record.id, request, db)
+            await self._start_background_task(task_id, request)
 
-            logger.info(f"创建人物卡生成任务: {task_record.id}")
+            logger.info(f"创建人物卡生成任务: {task_id}")
 
             return RoleCardTaskCreateResponse(
-                task_id=task_record.id,
+                task_id=task_id,
                 role_id=request.role_id,
                 status="pending",
                 message="任务创建成功，正在后台处理",
@@ -121,14 +122,15 @@ async def get_task_status(
             return None
 
     async def _start_background_task(
-        self, task_id: int, request: RoleCardGenerateRequest, db: Session
+        self, task_id: int, request: RoleCardGenerateRequest
     ) -> None:
         """启动后台处理任务.
 
+        后台任务自行创建数据库会话，这里只传递任务ID。
+
         Args:
             task_id: 任务ID
             request: 生成请求
-            db: 数据库会话
         """
         async with self.task_lock:
             if task_id in self.running_tasks:
@@ -141,10 +143,13 @@ async def _start_background_task(
             )
             self.running_tasks[task_id] = background_task
 
-            # 任务完成后清理
-            background_task.add_done_callback(
-                lambda t: asyncio.create_task(self._cleanup_task(task_id))
-            )
+            # 任务完成后记录未处理的异常并清理
+            def handle_task_done(task: asyncio.Task) -> None:
+                if not task.cancelled() and task.exception():
+                    logger.error(f"人物卡任务 {task_id} 异常退出: {task.exception()}")
+                self._cleanup_task(task_id, task)
+
+            background_task.add_done_callback(handle_task_done)
 
     async def _process_task_async(
         self, task_id: int, request: RoleCardGenerateRequest
@@ -209,35 +214,17 @@ async def _process_task_async(
                 logger.info(f"任务 {task_id}: 使用默认模型 {default_workflow.title}")
                 comfyui_client = create_comfyui_client_for_model(default_workflow.title)
 
-            # 逐个生成图片（ComfyUIClient只支持单张生成）
-            image_filenames = []
-            for i, prompt in enumerate(prompts):
-                logger.info(f"任务 {task_id}: 生成第 {i + 1}/{len(prompts)} 张图片")
-                # 首先提交生成任务，获取ComfyUI任务ID
-                comfyui_task_id = await comfyui_client.generate_image(prompt)
-                if comfyui_task_id:
-                    logger.info(f"任务 {task_id}: ComfyUI任务ID {comfyui_task_id}")
-                    # 等待任务完成并获取实际图片文件名
-                    completed_filenames = await comfyui_client.wait_for_completion(
-                        comfyui_task_id
-                    )
-                    if completed_filenames and len(completed_filenames) > 0:
-                        media_file = completed_filenames[0]  # 使用第一个生成的媒体文件
-                        filename = media_file.filename  # 获取文件名
-                        image_filenames.append(filename)
-                        logger.info(
-                            f"任务 {task_id}: 第 {i + 1} 张图片生成成功，文件名: {filename}"
-                        )
-                    else:
-                        logger.warning(
-                            f"任务 {task_id}: 第 {i + 1} 张图片生成失败（未获取到文件名）"
-                        )
-                else:
-                    logger.warning(
-                        f"任务 {task_id}: 第 {i + 1} 张图片生成失败（提交任务失败）"
-                    )
+            # 并发提交并等待所有提示词,ComfyUI 排队执行期间等待相互重叠
+            results = await asyncio.gather(
+                *(
+                    comfyui_client.generate_one(i, len(prompts), prompt)
+                    for i, prompt in enumerate(prompts)
+                )
+            )
+            # 按序号取回提示词,保留提示词与图片的对应关系,失败的提示词不会错位
+            generated = [(prompts[i], filename) for i, filename in results if filename]
 
-            if not image_filenames:
+            if not generated:
                 await self._update_task_status(
                     db,
                     task_id,
@@ -247,14 +234,12 @@ async def _process_task_async(
                 )
                 return
 
-            logger.info(f"任务 {task_id}: 成功生成 {len(image_filenames)} 张图片")
+            logger.info(f"任务 {task_id}: 成功生成 {len(generated)} 张图片")
 
             # 3. 保存图片信息到数据库
             saved_count = 0
-            for i, filename in enumerate(image_filenames):
+            for i, (prompt, filename) in enumerate(generated):
                 try:
-                    prompt = prompts[i] if i < len(prompts) else "未知提示词"
-
                     # 检查是否已存在相同的图片
                     existing_image = (
                         db.query(RoleImageGallery)
@@ -281,7 +266,6 @@ async def _process_task_async(
                     saved_count += 1
 
                     # 更新进度
-                    int((i + 1) / len(image_filenames) * 100)
                     await self._update_task_progress(
                         db, task_id, generated_images=i + 1
                     )
@@ -383,16 +367,18 @@ def _calculate_progress(self, task: RoleCardTask) -> float:
         else:
             return 0.0
 
-    async def _cleanup_task(self, task_id: int) -> None:
+    def _cleanup_task(self, task_id: int, task: asyncio.Task) -> None:
         """清理已完成的任务.
 
+        在事件循环线程中同步执行，中间没有 await，无需获取 task_lock。
+
         Args:
             task_id: 任务ID
+            task: 已完成的后台任务，仅当登记的仍是该任务时才移除
         """
-        async with self.task_lock:
-            if task_id in self.running_tasks:
-                del self.running_tasks[task_id]
-                logger.info(f"清理任务 {task_id}")
+        if self.running_tasks.get(task_id) is task:
+            del self.running_tasks[task_id]
+            logger.info(f"清理任务 {task_id}")
 
     async def get_running_tasks_count(self) -> int:
         """获取正在运行的任务数量.
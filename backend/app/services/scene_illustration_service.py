@@ -4,6 +4,7 @@
 提供场面绘制的核心业务逻辑，包括任务管理、图片生成和结果存储。
 """
 
+import asyncio
 import json
 import logging
 from datetime import datetime
@@ -161,15 +162,13 @@ async def generate_scene_images(
             logger.info(f"任务 {request.task_id}: 开始提交ComfyUI任务")
             comfyui_client = create_comfyui_client_for_model(model_name)
 
-            # 3. 提交多个生成任务到ComfyUI
+            # 3. 并发提交多个生成任务到ComfyUI
+            logger.info(f"任务 {request.task_id}: 并发提交 {request.num} 个ComfyUI任务")
+            submitted = await asyncio.gather(
+                *(comfyui_client.generate_image(prompts) for _ in range(request.num))
+            )
             comfyui_prompt_ids = []
-            for i in range(request.num):
-                logger.info(
-                    f"任务 {request.task_id}: 提交第 {i + 1}/{request.num} 个ComfyUI任务"
-                )
-
-                # 提交到ComfyUI，获取prompt_id
-                prompt_id = await comfyui_client.generate_image(prompts)
+            for i, prompt_id in enumerate(submitted):
                 if prompt_id:
                     comfyui_prompt_ids.append(prompt_id)
                     logger.info(
@@ -601,13 +600,16 @@ async def regenerate_scene_images(
             logger.info(f"使用模型重新生成图片: {model_name}")
             comfyui_client = create_comfyui_client_for_model(model_name)
 
-            # 4. 提交多个生成任务到ComfyUI（不等待完成）
+            # 4. 并发提交多个生成任务到ComfyUI（不等待完成）
+            logger.info(f"重新生成：并发提交 {request.count} 个ComfyUI任务")
+            submitted = await asyncio.gather(
+                *(
+                    comfyui_client.generate_image(str(original_prompt))
+                    for _ in range(request.count)
+                )
+            )
             comfyui_prompt_ids = []
-            for i in range(request.count):
-                logger.info(f"重新生成：提交第 {i + 1}/{request.count} 个ComfyUI任务")
-
-                # 提交到ComfyUI，获取prompt_id
-                prompt_id = await comfyui_client.generate_image(str(original_prompt))
+            for i, prompt_id in enumerate(submitted):
                 if prompt_id:
                     comfyui_prompt_ids.append(prompt_id)
                     logger.info(f"重新生成：第 {i + 1} 个ComfyUI任务ID: {prompt_id}")
@@ -11,13 +11,111 @@
 """
 
 import asyncio
+import os
 import re
 import urllib.parse
 from abc import ABC, abstractmethod
 from typing import Any
 
+import lxml.html
 import opencc
 from bs4 import BeautifulSoup
+from lxml import etree
+
+from .html_tree import parse_html
+from .parse_pool import get_parse_pool
+
+# ==================== 预编译的 XPath ====================
+# 直接用 lxml 驱动 XPath,避免 BeautifulSoup 在大页面上的 Python 层遍历开销
+
+# 搜索结果: h3 内指向 /xiaoshuo/ 的标题链接
+_SEARCH_LINK_XPATH = etree.XPath('//h3//a[contains(@href, "/xiaoshuo/")]')
+
+# 章节标题判定规则: 以"第"开头且包含"章",排除分页导航(如"1~30章")
+# 评分和提取两处共用同一条规则
+_CHAPTER_TITLE_TEST = (
+    'starts-with(normalize-space(), "第") and contains(., "章")'
+    ' and not(contains(., "~")) and not(contains(., "～"))'
+)
+
+# 统计 ul 内的章节链接数
+_CHAPTER_COUNT_XPATH = etree.XPath(f'count(.//a[@href and {_CHAPTER_TITLE_TEST}])')
+
+# li 内第一个链接,且仅当它是章节链接时返回
+_CHAPTER_LINK_XPATH = etree.XPath(f'(.//a)[1][{_CHAPTER_TITLE_TEST}]')
+
+# 真实章节列表的链接数远大于此值,达到即可认定,无需再扫描剩余的 ul
+_CHAPTER_LIST_MIN_LINKS = 20
+
+# 正文: 第一个 article 内的所有段落
+_ARTICLE_PARAGRAPH_XPATH = etree.XPath('(//article)[1]//p')
+
+# 章节标题: 优先 article h1,其次任意 h1
+_ARTICLE_H1_XPATH = etree.XPath('(//article//h1)[1]')
+_ANY_H1_XPATH = etree.XPath('(//h1)[1]')
+
+# 分页链接: 文本包含"下一頁"的链接
+_NEXT_PAGE_XPATH = etree.XPath('(//a[contains(., "下一頁")])[1]')
+
+
+def _text(element: lxml.html.HtmlElement) -> str:
+    """提取元素文本,等价于 BeautifulSoup 的 get_text(strip=True)"""
+    return ''.join(s.strip() for s in element.itertext())
+
+
+def _parse_chapter_page(html: str, base_url: str) -> list[dict[str, Any]]:
+    """解析单页章节列表
+
+    纯函数(不依赖实例状态),可在进程池中执行。标题保持原文,繁简转换由调用方完成。
+
+    Args:
+        html: 章节列表页 HTML
+        base_url: 站点根地址,用于补全相对链接
+
+    Returns:
+        章节列表
+    """
+    tree = parse_html(html)
+    chapters = []
+
+    # 找出章节链接最多的 ul (章节计数由预编译 XPath 完成)
+    best_ul = None
+    max_chapter_count = 0
+
+    for ul in tree.iter('ul'):
+        chapter_count = _CHAPTER_COUNT_XPATH(ul)
+        if chapter_count > max_chapter_count:
+            max_chapter_count = chapter_count
+            best_ul = ul
+            if chapter_count >= _CHAPTER_LIST_MIN_LINKS:
+                break
+
+    if best_ul is None:
+        return chapters
+
+    for item in best_ul.iter('li'):
+        # 在 li 中查找链接,过滤掉分页导航等非章节链接
+        links = _CHAPTER_LINK_XPATH(item)
+        if not links:
+            continue
+
+        link = links[0]
+        title = _text(link)
+        chapter_url = link.get('href', '')
+
+        if not chapter_url:
+            continue
+
+        # 转换为绝对路径
+        if chapter_url.startswith('/'):
+            chapter_url = f"{base_url}{chapter_url}"
+
+        chapters.append({
+            'title': title,
+            'url': chapter_url,
+        })
+
+    return chapters
 
 
 class WfxsCrawler(ABC):
@@ -72,25 +170,19 @@ async def search_novels(self, keyword: str) -> list[dict[str, Any]]:
                     return []
 
                 # 解析HTML
-                soup = BeautifulSoup(response.content, 'lxml')
+                tree = parse_html(response.content)
                 novels = []
 
                 # 解析搜索结果
                 # 微风小说网搜索结果结构:
-                # - 找所有 /xiaoshuo/ 的链接
-                # - 标题在 h3 > a 中
+                # - 标题在 h3 > a 中,链接指向 /xiaoshuo/
                 # - 作者在 h3 后的 p 标签中,格式为 "作者 | 連載"
-                all_links = soup.find_all('a', href=True)
-                novel_links = [link for link in all_links if '/xiaoshuo/' in link.get('href', '')]
-
-                for link in novel_links:
+                for link in _SEARCH_LINK_XPATH(tree):
                     try:
-                        # 确保这是 h3 标签内的链接(标题链接)
-                        h3_parent = link.find_parent('h3')
-                        if not h3_parent:
-                            continue
+                        # 最近的 h3 祖先(标题所在的 h3)
+                        h3_parent = next(link.iterancestors('h3'))
 
-                        title = link.get_text(strip=True)
+                        title = _text(link)
                         novel_url = link.get('href', '')
 
                         # 如果是相对路径，转换为绝对路径
@@ -99,9 +191,9 @@ async def search_novels(self, keyword: str) -> list[dict[str, Any]]:
 
                         # 提取作者 - 找 h3 之后的 p 标签
                         author = "未知"
-                        next_sibling = h3_parent.find_next_sibling('p')
-                        if next_sibling:
-                            text = next_sibling.get_text(strip=True)
+                        next_sibling = next(h3_parent.itersiblings('p'), None)
+                        if next_sibling is not None:
+                            text = _text(next_sibling)
                             if '|' in text:
                                 # 提取 " | " 之前的作者名
                                 author = text.split('|')[0].strip()
@@ -243,7 +335,6 @@ async def _get_chapters_from_page(self, page_url: str) -> list[dict[str, Any]]:
         try:
             # 为每个请求创建新的Playwright实例,避免被检测
             from playwright.async_api import async_playwright
-            import os
 
             async with async_playwright() as p:
                 browser = await p.chromium.launch(
@@ -275,66 +366,14 @@ async def _get_chapters_from_page(self, page_url: str) -> list[dict[str, Any]]:
                     await browser.close()
                     return []
 
-            soup = BeautifulSoup(content, 'lxml')
-            chapters = []
-
-            # 解析章节列表(使用现有逻辑)
-            all_uls = soup.find_all('ul')
-
-            best_ul = None
-            max_chapter_count = 0
-
-            for ul in all_uls:
-                chapter_links = ul.find_all('a', href=True)
-                chapter_count = 0
-
-                for link in chapter_links:
-                    text = link.get_text(strip=True)
-                    # 只计算以"第"开头且包含"章"的链接
-                    # 排除分页导航(如"1~30章"、"31~60章")
-                    if text.startswith('第') and '章' in text and '~' not in text and '～' not in text:
-                        chapter_count += 1
-
-                if chapter_count > max_chapter_count:
-                    max_chapter_count = chapter_count
-                    best_ul = ul
-
-            if best_ul:
-                chapter_items = best_ul.find_all('li')
-            else:
-                chapter_items = []
-
-            for item in chapter_items:
-                try:
-                    # 在 li 中查找链接
-                    link = item.find('a')
-                    if not link:
-                        continue
-
-                    title = link.get_text(strip=True)
-                    chapter_url = link.get('href', '')
-
-                    if not chapter_url:
-                        continue
-
-                    # 过滤掉分页导航链接
-                    # 只保留以"第"开头且包含"章"的标题
-                    if not (title.startswith('第') and '章' in title):
-                        continue
-                    # 排除范围导航(如"1~30章")
-                    if '~' in title or '～' in title:
-                        continue
-
-                    # 转换为绝对路径
-                    if chapter_url.startswith('/'):
-                        chapter_url = f"{self.base_url}{chapter_url}"
+            # 解析放到进程池中执行,避免大页面解析阻塞事件循环中的其他 Playwright 请求
+            loop = asyncio.get_running_loop()
+            chapters = await loop.run_in_executor(
+                get_parse_pool(), _parse_chapter_page, content, self.base_url
+            )
 
-                    chapters.append({
-                        'title': self.convert_to_simplified(title),
-                        'url': chapter_url,
-                    })
-                except Exception:
-                    continue
+            for chapter in chapters:
+                chapter['title'] = self.convert_to_simplified(chapter['title'])
 
             return chapters
 
@@ -353,7 +392,6 @@ async def get_chapter_content(self, chapter_url: str) -> dict[str, Any]:
         """
         # 为每个请求创建独立的Playwright实例,避免被检测
         from playwright.async_api import async_playwright
-        import os
 
         try:
             async with async_playwright() as p:
@@ -389,16 +427,14 @@ async def get_chapter_content(self, chapter_url: str) -> dict[str, Any]:
                     content = await page.content()
                     await browser.close()
 
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(content, 'lxml')
+                    tree = parse_html(content)
 
                     # 获取章节标题
-                    title_elem = soup.select_one('article h1') or soup.select_one('h1')
-                    title = title_elem.get_text(strip=True) if title_elem else ''
+                    title_elems = _ARTICLE_H1_XPATH(tree) or _ANY_H1_XPATH(tree)
+                    title = _text(title_elems[0]) if title_elems else ''
 
                     # 获取正文内容
-                    article = soup.select_one('article')
-                    if not article:
+                    if tree.find('.//article') is None:
                         return {
                             'title': self.convert_to_simplified(title),
                             'content': '',
@@ -406,33 +442,24 @@ async def get_chapter_content(self, chapter_url: str) -> dict[str, Any]:
                         }
 
                     # 提取段落
-                    paragraphs = article.select('p')
-                    content_parts = []
-
-                    for p in paragraphs:
-                        text = p.get_text(strip=True)
-                        if text and not self._should_skip_line(text):
-                            content_parts.append(text)
-
-                    content = '\n\n'.join(content_parts)
+                    content = self._extract_paragraphs(tree)
 
                     # 检查是否有分页
                     # 微风小说网的分页链接在list > listitem中,文本为"下一頁"
-                    # 注意:listitem不是标准HTML标签,BeautifulSoup无法识别,需要用find方法
                     from urllib.parse import urljoin
-                    next_page_link = soup.find('a', string=lambda text: text and '下一頁' in text)
+                    next_page_links = _NEXT_PAGE_XPATH(tree)
+                    next_page_link = next_page_links[0] if next_page_links else None
 
-                    if not next_page_link:
+                    if next_page_link is None:
                         # 备选方案:查找包含 /2.html 的链接
-                        all_links = soup.find_all('a', href=True)
-                        for link in all_links:
+                        for link in tree.iterfind('.//a[@href]'):
                             href = link.get('href', '')
                             # 找到包含"2.html"的链接,并确保它是章节分页链接(以.html结尾)
                             if '/2.html' in href and href.endswith('.html'):
                                 next_page_link = link
                                 break
 
-                    if next_page_link:
+                    if next_page_link is not None:
                         print(f"找到分页链接: {next_page_link.get('href', 'N/A')}")
                         # 如果有分页，获取下一页内容
                         next_page_url = next_page_link.get('href', '')
@@ -472,7 +499,6 @@ async def get_chapter_content(self, chapter_url: str) -> dict[str, Any]:
     async def _get_next_page_content_with_playwright(self, page_url: str) -> str:
         """使用独立Playwright实例获取下一页内容"""
         from playwright.async_api import async_playwright
-        import os
 
         try:
             async with async_playwright() as p:
@@ -508,22 +534,7 @@ async def _get_next_page_content_with_playwright(self, page_url: str) -> str:
                     content = await page.content()
                     await browser.close()
 
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(content, 'lxml')
-                    article = soup.select_one('article')
-
-                    if article:
-                        paragraphs = article.select('p')
-                        content_parts = []
-
-                        for p in paragraphs:
-                            text = p.get_text(strip=True)
-                            if text and not self._should_skip_line(text):
-                                content_parts.append(text)
-
-                        return '\n\n'.join(content_parts)
-                    else:
-                        return ''
+                    return self._extract_paragraphs(parse_html(content))
                 else:
                     await browser.close()
                     return ''
@@ -539,24 +550,24 @@ async def _get_next_page_content(self, page_url: str) -> str:
             if response.status_code != 200:
                 return ''
 
-            soup = BeautifulSoup(response.content, 'lxml')
-            article = soup.select_one('article')
+            return self._extract_paragraphs(parse_html(response.content))
 
-            if not article:
-                return ''
+        except Exception:
+            return ''
 
-            paragraphs = article.select('p')
-            content_parts = []
+    def _extract_paragraphs(self, tree: lxml.html.HtmlElement) -> str:
+        """提取第一个 article 内的段落文本,过滤无关行
 
-            for p in paragraphs:
-                text = p.get_text(strip=True)
-                if text and not self._should_skip_line(text):
-                    content_parts.append(text)
+        没有 article 时返回空字符串
+        """
+        content_parts = []
 
-            return '\n\n'.join(content_parts)
+        for p in _ARTICLE_PARAGRAPH_XPATH(tree):
+            text = _text(p)
+            if text and not self._should_skip_line(text):
+                content_parts.append(text)
 
-        except Exception:
-            return ''
+        return '\n\n'.join(content_parts)
 
     def _should_skip_line(self, text: str) -> bool:
         """判断是否应该跳过这一行"""
@@ -7,11 +7,97 @@
 
 import asyncio
 import re
+import time
 import urllib.parse
 from typing import Any
 
+import soupsieve as sv
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+from lxml import etree
+from urllib3.util.request import ACCEPT_ENCODING
+
 from .base_crawler import BaseCrawler
-from .http_client import RequestConfig, RequestStrategy
+from .html_tree import parse_html
+from .http_client import RequestStrategy, Response
+from .parse_pool import get_parse_pool
+
+# ==================== 预编译正则与 XPath ====================
+# 在逐条解析的热循环中复用，避免每次调用都走 re 模块的缓存查找
+
+# 链接格式
+_HREF_NOVEL_RE = re.compile(r"/xianshishuwu_(\d+)\.html")
+_HREF_PAGE_RE = re.compile(r"/xianshishuwu/\d+/0_\d+\.html")
+_HREF_CHAPTER_RE = re.compile(r"/xianshishuwu/\d+/\d+\.html")
+_PAGE_NUM_RE = re.compile(r"/0_(\d+)\.html")
+
+# 只需要链接的页面(章节目录、首页热门)只构建匹配的 a 标签，跳过其余节点
+_CHAPTER_LINK_STRAINER = SoupStrainer("a", href=_HREF_CHAPTER_RE)
+_NOVEL_LINK_STRAINER = SoupStrainer("a", href=_HREF_NOVEL_RE)
+
+# 搜索结果中的作者信息
+_AUTHOR_NCY_RE = re.compile(r"\n([^\n]+?)N次元")
+_AUTHOR_RE = re.compile(r"作者[：:]\s*([^\s\n]+)")
+_AUTHOR_BY_CAT_RE = re.compile(r"([^\s]+)(?:玄幻|都市|仙侠|历史|科幻|游戏|体育)")
+
+# 分类与连载状态关键词，合并为一个正则单次扫描
+_CATEGORIES = ("玄幻", "都市", "仙侠", "历史", "科幻", "游戏", "体育")
+_KEYWORD_RE = re.compile("|".join((*_CATEGORIES, "连载", "完结", "完本")))
+
+# 总章节数，如"共 1234 章"
+_TOTAL_CH_RE = re.compile(r"共\s*(\d+)\s*章")
+
+# 章节目录页: 首个包含总章节数的文本节点、所有分页链接的 href
+# 借助 EXSLT 正则扩展，在 lxml 中一次求值完成匹配，不必在 Python 层逐节点遍历
+_EXSLT_NS = {"re": "http://exslt.org/regular-expressions"}
+_TOTAL_CH_TEXT_XPATH = etree.XPath(
+    f'(//text()[re:test(., "{_TOTAL_CH_RE.pattern}")])[1]', namespaces=_EXSLT_NS
+)
+_PAGE_HREF_XPATH = etree.XPath(
+    f'//a/@href[re:test(., "{_HREF_PAGE_RE.pattern}")]', namespaces=_EXSLT_NS
+)
+
+# 搜索结果: 首个链接指向小说页(/xianshishuwu_)的 li
+_SEARCH_ITEM_XPATH = etree.XPath(
+    '//li[(.//a)[1][starts-with(@href, "/xianshishuwu_")]]'
+)
+
+# 搜索结果中明显不是小说标题的导航链接文字
+_SEARCH_SKIP_WORDS = ("首页", "下一页", "上一页", "更多", "登录", "注册")
+
+# 批量获取(章节列表分页、章节内容)时的最大并发请求数
+_FETCH_CONCURRENCY = 8
+
+# 热门小说(搜索失败时的推荐)缓存有效期(秒)，获取失败时只缓存较短时间，避免每次失败都回源首页
+_POPULAR_CACHE_TTL = 600
+_POPULAR_FAILURE_TTL = 60
+
+# base_url -> (过期时间, 热门小说列表)；爬虫实例按请求创建，缓存放在模块级共享
+_popular_cache: dict[str, tuple[float, list[dict[str, Any]]]] = {}
+_popular_lock = asyncio.Lock()
+
+# 章节页标题、正文的 CSS 选择器，按优先级排列，模块加载时编译一次
+_TITLE_SELECTORS = tuple(
+    sv.compile(selector)
+    for selector in ("h1", "h2", ".chapter-title", ".title", "title")
+)
+_CONTENT_SELECTORS = tuple(
+    sv.compile(selector)
+    for selector in (
+        "div#content",
+        "div.content",
+        "div.txt",
+        "div#chapter_content",
+        'div[class*="content"]',
+        'div[class*="txt"]',
+    )
+)
+
+# 正文清理: 一次扫描同时合并空行(分组1)与连续空格(分组2)
+_CLEAN_RE = re.compile(r"(\n\s*\n)|( +)")
+
+
+def _clean_sub(match: re.Match) -> str:
+    return "\n\n" if match.group(1) else " "
 
 
 class XspswCrawlerRefactored(BaseCrawler):
@@ -23,11 +109,15 @@ def __init__(self):
             base_url="https://m.xspsw.com", strategy=RequestStrategy.SIMPLE
         )
 
+        # 站内链接都以 / 开头，直接与此前缀拼接，不必每个链接都 urljoin 解析一遍 base_url
+        self._url_prefix = self.base_url.rstrip("/")
+
         # 移动端请求头
         self.custom_headers = {
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Accept-Encoding": "gzip, deflate",
+            # 安装 brotli 后包含 br，HTML 压缩率明显高于 gzip
+            "Accept-Encoding": ACCEPT_ENCODING,
             "Connection": "keep-alive",
             "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1",
         }
@@ -38,14 +128,6 @@ async def search_novels(self, keyword: str) -> list[dict[str, Any]]:
             # 使用真实的搜索功能
             search_url = f"{self.base_url}/search.html"
 
-            # 配置请求
-            RequestConfig(
-                timeout=10,
-                max_retries=3,
-                strategy=RequestStrategy.SIMPLE,
-                custom_headers=self.custom_headers,
-            )
-
             # 准备搜索参数
             search_data = {"searchkey": keyword.strip()}
 
@@ -55,7 +137,7 @@ async def search_novels(self, keyword: str) -> list[dict[str, Any]]:
             )
 
             # 解析搜索结果
-            novels = self._parse_xspsw_search_results(response.soup())
+            novels = self._parse_xspsw_search_results(response.content)
 
             return novels[:10]  # 限制返回数量
 
@@ -68,20 +150,11 @@ async def get_chapter_list(self, novel_url: str) -> list[dict[str, Any]]:
         """获取小说章节列表（支持分页获取完整列表）"""
         try:
             # 从小说URL提取novel_id
-            novel_id_match = re.search(r"/xianshishuwu_(\d+)\.html", novel_url)
+            novel_id_match = _HREF_NOVEL_RE.search(novel_url)
             if not novel_id_match:
                 return []
 
             novel_id = novel_id_match.group(1)
-            all_chapters = []
-
-            # 配置请求
-            RequestConfig(
-                timeout=10,
-                max_retries=3,
-                strategy=RequestStrategy.SIMPLE,
-                custom_headers=self.custom_headers,
-            )
 
             # 首先访问第一页获取总页数信息
             first_page_url = f"{self.base_url}/xianshishuwu/{novel_id}/"
@@ -89,40 +162,41 @@ async def get_chapter_list(self, novel_url: str) -> list[dict[str, Any]]:
                 first_page_url, timeout=10, custom_headers=self.custom_headers
             )
 
-            soup = response.soup()
-
             # 计算最大页数
-            max_page = self._calculate_max_page(soup)
+            max_page = self._calculate_max_page(response.content)
 
-            # 获取所有页的章节
-            for page_num in range(1, max_page + 1):
-                try:
-                    if page_num == 1:
-                        page_url = first_page_url
-                    else:
-                        page_url = (
-                            f"{self.base_url}/xianshishuwu/{novel_id}/0_{page_num}.html"
-                        )
+            # 第一页已获取，直接提取章节
+            all_chapters = self._extract_chapters_from_page(
+                self._soup(response, _CHAPTER_LINK_STRAINER)
+            )
+
+            # 其余分页并发获取，用信号量限制同时在途的请求数，避免请求过快
+            semaphore = asyncio.Semaphore(_FETCH_CONCURRENCY)
 
-                    # 访问分页
+            async def fetch_page_chapters(page_url: str) -> list[dict[str, Any]]:
+                async with semaphore:
                     page_response = await self.get_page(
                         page_url, timeout=10, custom_headers=self.custom_headers
                     )
-                    page_soup = page_response.soup()
-
-                    # 提取当前页的章节链接
-                    page_chapters = self._extract_chapters_from_page(
-                        page_soup, self.base_url
-                    )
-                    all_chapters.extend(page_chapters)
+                return self._extract_chapters_from_page(
+                    self._soup(page_response, _CHAPTER_LINK_STRAINER)
+                )
 
-                    # 添加延迟避免请求过快
-                    if page_num < max_page:
-                        await asyncio.sleep(0.5)
+            page_urls = [
+                f"{self.base_url}/xianshishuwu/{novel_id}/0_{page_num}.html"
+                for page_num in range(2, max_page + 1)
+            ]
+            results = await asyncio.gather(
+                *(fetch_page_chapters(page_url) for page_url in page_urls),
+                return_exceptions=True,
+            )
 
-                except Exception as e:
-                    print(f"获取第{page_num}页章节失败: {e!s}")
+            # 按页码顺序合并结果
+            for page_num, result in enumerate(results, start=2):
+                if isinstance(result, Exception):
+                    print(f"获取第{page_num}页章节失败: {result!s}")
                     continue
+                all_chapters.extend(result)
 
             # 去重保持顺序
             return self._deduplicate_chapters(all_chapters)
@@ -134,77 +208,100 @@ async def get_chapter_list(self, novel_url: str) -> list[dict[str, Any]]:
     async def get_chapter_content(self, chapter_url: str) -> dict[str, Any]:
         """获取章节内容"""
         try:
-            # 配置请求
-            RequestConfig(
-                timeout=10,
-                max_retries=3,
-                retry_delay=0.6,
-                strategy=RequestStrategy.SIMPLE,
-                custom_headers=self.custom_headers,
-            )
-
             # 获取章节页面
             response = await self.get_page(
                 chapter_url, timeout=10, custom_headers=self.custom_headers
             )
 
-            # 提取内容
-            soup = response.soup()
-
-            # 获取标题
-            title = self._extract_chapter_title(soup)
-
-            # 获取内容
-            content = self._extract_xspsw_content(soup)
-
-            return {"title": title, "content": content}
+            return _parse_chapter_html(response.content)
 
         except Exception as e:
             print(f"Xspsw获取章节内容失败: {e!s}")
             return {"title": "章节内容", "content": f"获取失败: {e!s}"}
 
+    async def get_chapters_content(
+        self, chapter_urls: list[str]
+    ) -> list[dict[str, Any]]:
+        """批量获取章节内容
+
+        并发获取多个章节，复用同一个 keep-alive 会话，避免逐章串行等待网络往返。
+        页面解析交给进程池，与后续章节的网络请求并行进行。
+
+        Args:
+            chapter_urls: 章节URL列表
+
+        Returns:
+            章节内容列表，顺序与 chapter_urls 一致
+        """
+        semaphore = asyncio.Semaphore(_FETCH_CONCURRENCY)
+        loop = asyncio.get_running_loop()
+        parse_pool = get_parse_pool()
+
+        async def fetch_chapter(chapter_url: str) -> dict[str, Any]:
+            try:
+                # 只在网络请求期间占用并发名额，解析时让出给下一个章节
+                async with semaphore:
+                    response = await self.get_page(
+                        chapter_url, timeout=10, custom_headers=self.custom_headers
+                    )
+                return await loop.run_in_executor(
+                    parse_pool, _parse_chapter_html, response.content
+                )
+            except Exception as e:
+                print(f"Xspsw获取章节内容失败: {e!s}")
+                return {"title": "章节内容", "content": f"获取失败: {e!s}"}
+
+        return await asyncio.gather(
+            *(fetch_chapter(chapter_url) for chapter_url in chapter_urls)
+        )
+
     # ==================== Xspsw专用提取方法 ====================
 
-    def _parse_xspsw_search_results(self, soup) -> list[dict[str, Any]]:
+    @staticmethod
+    def _soup(
+        response: Response, parse_only: SoupStrainer | None = None
+    ) -> BeautifulSoup:
+        """使用 lxml 解析页面，lxml 不可用时回退到 html.parser"""
+        return _make_soup(response.content, parse_only)
+
+    def _parse_xspsw_search_results(self, html: str) -> list[dict[str, Any]]:
         """解析Xspsw搜索结果页面"""
         novels = []
 
         # Xspsw搜索结果的特定结构：小说信息在li标签中
-        list_items = soup.find_all("li")
+        # 一次 XPath 只选出首个链接指向小说页的 li，跳过其余节点
+        try:
+            tree = parse_html(html)
+        except etree.ParserError:
+            return novels
 
-        for item in list_items:
+        for item in _SEARCH_ITEM_XPATH(tree):
             try:
-                # 查找链接
-                link = item.find("a")
-                if not link:
-                    continue
-
+                link = item.find(".//a")
                 href = link.get("href")
-                if not href or not href.startswith("/xianshishuwu_"):
-                    continue
 
                 # 从图片alt属性获取标题
-                img = item.find("img")
-                title = img.get("alt", "").strip() if img else link.get_text(strip=True)
+                img = item.find(".//img")
+                if img is not None:
+                    title = img.get("alt", "").strip()
+                else:
+                    title = "".join(text.strip() for text in link.itertext())
 
                 if not title or len(title) < 2:
                     continue
 
                 # 过滤掉明显不是小说标题的链接
-                if any(
-                    skip in title.lower()
-                    for skip in ["首页", "下一页", "上一页", "更多", "登录", "注册"]
-                ):
+                lowered_title = title.lower()
+                if any(skip in lowered_title for skip in _SEARCH_SKIP_WORDS):
                     continue
 
                 # 构建完整URL
-                novel_url = urllib.parse.urljoin(self.base_url, href)
+                novel_url = self._absolute_url(href)
 
                 # 从li标签的完整文本中提取信息
-                full_text = item.get_text()
+                full_text = item.text_content()
                 author = self._extract_xspsw_author(full_text)
-                status = self._extract_xspsw_status(full_text)
-                category = self._extract_xspsw_category(full_text)
+                status, category = self._extract_xspsw_status_and_category(full_text)
 
                 novels.append(
                     {
@@ -228,60 +325,74 @@ def _extract_xspsw_author(self, full_text: str) -> str:
         """提取Xspsw作者信息"""
         # 新格式："书名\n作者名N次元连载\n简介"
         # 尝试匹配 "作者名N次元" 格式
-        author_match = re.search(r"\n([^\n]+?)N次元", full_text)
+        author_match = _AUTHOR_NCY_RE.search(full_text)
         if author_match:
             author = author_match.group(1).strip()
             if author and len(author) > 1:
                 return author
 
         # 旧格式："书名 作者 分类 状态"
-        author_match = re.search(r"作者[：:]\s*([^\s\n]+)", full_text)
+        author_match = _AUTHOR_RE.search(full_text)
         if not author_match:
             # 尝试另一种格式：在分类前的名称
-            author_match = re.search(
-                r"([^\s]+)(?:玄幻|都市|仙侠|历史|科幻|游戏|体育)", full_text
-            )
+            author_match = _AUTHOR_BY_CAT_RE.search(full_text)
 
         if author_match:
             return author_match.group(1)
 
         return "未知作者"
 
-    def _extract_xspsw_status(self, full_text: str) -> str:
-        """提取连载状态"""
-        if "连载" in full_text:
-            return "连载"
-        elif "完结" in full_text or "完本" in full_text:
-            return "completed"
-        return "unknown"
-
-    def _extract_xspsw_category(self, full_text: str) -> str:
-        """提取分类信息"""
-        categories = ["玄幻", "都市", "仙侠", "历史", "科幻", "游戏", "体育"]
-        for category in categories:
-            if category in full_text:
-                return category
-        return "unknown"
+    def _extract_xspsw_status_and_category(self, full_text: str) -> tuple[str, str]:
+        """一次扫描提取连载状态和分类信息
+
+        Returns:
+            (status, category)，按关键词优先级而非出现位置选取
+        """
+        found = set(_KEYWORD_RE.findall(full_text))
+
+        if "连载" in found:
+            status = "连载"
+        elif "完结" in found or "完本" in found:
+            status = "completed"
+        else:
+            status = "unknown"
+
+        category = next((c for c in _CATEGORIES if c in found), "unknown")
+
+        return status, category
 
     async def _get_popular_novels(self) -> list[dict[str, Any]]:
-        """获取热门小说作为搜索fallback"""
+        """获取热门小说作为搜索fallback（带 TTL 缓存）"""
+        async with _popular_lock:
+            cached = _popular_cache.get(self.base_url)
+            if cached is None or cached[0] <= time.monotonic():
+                novels = await self._fetch_popular_novels()
+                ttl = _POPULAR_CACHE_TTL if novels else _POPULAR_FAILURE_TTL
+                cached = (time.monotonic() + ttl, novels)
+                _popular_cache[self.base_url] = cached
+
+        # 返回副本，避免调用方修改结果污染缓存
+        return [dict(novel) for novel in cached[1]]
+
+    async def _fetch_popular_novels(self) -> list[dict[str, Any]]:
+        """从首页抓取热门小说"""
         try:
             # 访问首页获取热门小说
             response = await self.get_page(
                 self.base_url, timeout=10, custom_headers=self.custom_headers
             )
-            soup = response.soup()
+            soup = self._soup(response, _NOVEL_LINK_STRAINER)
 
             novels = []
 
             # 查找热门小说链接
-            links = soup.find_all("a", href=re.compile(r"/xianshishuwu_\d+\.html"))
+            links = soup.find_all("a", href=_HREF_NOVEL_RE)
             for link in links[:10]:  # 只取前10个
                 try:
                     title = link.get_text(strip=True)
                     href = link.get("href")
                     if title and href and len(title) > 2:
-                        novel_url = urllib.parse.urljoin(self.base_url, href)
+                        novel_url = self._absolute_url(href)
                         novels.append(
                             {
                                 "title": title,
@@ -298,40 +409,37 @@ async def _get_popular_novels(self) -> list[dict[str, Any]]:
         except Exception:
             return []
 
-    def _calculate_max_page(self, soup) -> int:
+    def _calculate_max_page(self, html: str) -> int:
         """计算最大页数"""
         max_page = 1
 
+        try:
+            tree = parse_html(html)
+        except etree.ParserError:
+            return max_page
+
         # 尝试从页面中提取总章节数
-        total_chapters_text = soup.find(text=re.compile(r"共\s*\d+\s*章"))
-        if total_chapters_text:
-            total_match = re.search(r"共\s*(\d+)\s*章", str(total_chapters_text))
+        for total_chapters_text in _TOTAL_CH_TEXT_XPATH(tree):
+            total_match = _TOTAL_CH_RE.search(total_chapters_text)
             if total_match:
                 total_chapters = int(total_match.group(1))
                 # 每页大约100章，计算最大页数
                 max_page = (total_chapters + 99) // 100
 
-        # 查找分页链接，确定最大页数
-        pagination_links = soup.find_all(
-            "a", href=re.compile(r"/xianshishuwu/\d+/0_\d+\.html")
-        )
-        for link in pagination_links:
-            href = link.get("href", "")
-            page_match = re.search(r"/0_(\d+)\.html", href)
+        # 根据分页链接确定最大页数
+        for href in _PAGE_HREF_XPATH(tree):
+            page_match = _PAGE_NUM_RE.search(href)
             if page_match:
-                page_num = int(page_match.group(1))
-                max_page = max(max_page, page_num)
+                max_page = max(max_page, int(page_match.group(1)))
 
         return max_page
 
-    def _extract_chapters_from_page(self, soup, base_url: str) -> list[dict[str, Any]]:
+    def _extract_chapters_from_page(self, soup) -> list[dict[str, Any]]:
         """从分页中提取章节链接"""
         chapters = []
 
         # 查找当前页的所有章节链接
-        chapter_links = soup.find_all(
-            "a", href=re.compile(r"/xianshishuwu/\d+/\d+\.html")
-        )
+        chapter_links = soup.find_all("a", href=_HREF_CHAPTER_RE)
 
         for link in chapter_links:
             try:
@@ -339,7 +447,7 @@ def _extract_chapters_from_page(self, soup, base_url: str) -> list[dict[str, Any
                 chapter_href = link.get("href")
 
                 if chapter_title and chapter_href and len(chapter_title) > 1:
-                    full_url = urllib.parse.urljoin(base_url, chapter_href)
+                    full_url = self._absolute_url(chapter_href)
                     chapters.append({"title": chapter_title, "url": full_url})
 
             except Exception:
@@ -347,35 +455,35 @@ def _extract_chapters_from_page(self, soup, base_url: str) -> list[dict[str, Any
 
         return chapters
 
+    def _absolute_url(self, href: str) -> str:
+        """将页面中的链接转换为完整URL"""
+        if href.startswith("/") and not href.startswith("//"):
+            return self._url_prefix + href
+        return urllib.parse.urljoin(self.base_url, href)
+
+    @staticmethod
+    def _deduplicate_by_url(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """按URL去重，保留首次出现的条目和原有顺序（dict 保持插入顺序）"""
+        unique: dict[str, dict[str, Any]] = {}
+        for item in items:
+            unique.setdefault(item["url"], item)
+        return list(unique.values())
+
     def _deduplicate_chapters(
         self, chapters: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
         """章节去重保持顺序"""
-        seen = set()
-        unique = []
-        for chapter in chapters:
-            if chapter["url"] not in seen:
-                unique.append(chapter)
-                seen.add(chapter["url"])
-        return unique
+        return self._deduplicate_by_url(chapters)
 
     def _deduplicate_novels(self, novels: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """小说去重"""
-        seen = set()
-        unique_novels = []
-        for novel in novels:
-            if novel["url"] not in seen:
-                unique_novels.append(novel)
-                seen.add(novel["url"])
-        return unique_novels
-
-    def _extract_chapter_title(self, soup) -> str:
-        """提取章节标题"""
-        # Xspsw特定的标题选择器
-        title_selectors = ["h1", "h2", ".chapter-title", ".title", "title"]
+        return self._deduplicate_by_url(novels)
 
-        for selector in title_selectors:
-            title_elem = soup.select_one(selector)
+    @staticmethod
+    def _extract_chapter_title(soup) -> str:
+        """提取章节标题"""
+        for selector in _TITLE_SELECTORS:
+            title_elem = selector.select_one(soup)
             if title_elem:
                 title = title_elem.get_text().strip()
                 if title and len(title) > 1:
@@ -383,23 +491,15 @@ def _extract_chapter_title(self, soup) -> str:
 
         return "章节内容"
 
-    def _extract_xspsw_content(self, soup) -> str:
+    @staticmethod
+    def _extract_xspsw_content(soup) -> str:
         """提取Xspsw章节内容"""
-        # Xspsw特定的内容选择器
-        content_selectors = [
-            "div#content",
-            "div.content",
-            "div.txt",
-            "div#chapter_content",
-            'div[class*="content"]',
-            'div[class*="txt"]',
-        ]
-
         content = ""
         content_elem = None
 
-        for selector in content_selectors:
-            content_elem = soup.select_one(selector)
+        # 按优先级依次尝试，而非合并成一个选择器(那样会按文档顺序返回首个匹配)
+        for selector in _CONTENT_SELECTORS:
+            content_elem = selector.select_one(soup)
             if content_elem:
                 # 移除广告和无关元素
                 for ad in content_elem.find_all(["script", "style", "ins", "iframe"]):
@@ -412,17 +512,13 @@ def _extract_xspsw_content(self, soup) -> str:
         # 如果没有找到内容，尝试其他方法
         if not content or len(content) < 100:
             # 尝试找到最长的div
-            divs = soup.find_all("div")
-            longest_div = None
-            max_text_length = 0
+            # 只累加文本片段长度，不为每个 div 拼接完整文本
+            def text_length(div) -> int:
+                return sum(len(text) for text in div.strings)
 
-            for div in divs:
-                text_length = len(div.get_text())
-                if text_length > max_text_length:
-                    max_text_length = text_length
-                    longest_div = div
+            longest_div = max(soup.find_all("div"), key=text_length, default=None)
 
-            if longest_div and max_text_length > 500:
+            if longest_div and text_length(longest_div) > 500:
                 # 移除广告和无关元素
                 for ad in longest_div.find_all(["script", "style", "ins", "iframe"]):
                     ad.decompose()
@@ -430,12 +526,36 @@ def _extract_xspsw_content(self, soup) -> str:
 
         # 清理内容
         if content:
-            content = re.sub(r"\n\s*\n", "\n\n", content)
-            content = re.sub(r"^\s+|\s+$", "", content)
-            content = re.sub(r" +", " ", content)
+            content = _CLEAN_RE.sub(_clean_sub, content).strip()
 
         return content
 
 
+# ==================== 章节页面解析 ====================
+# 模块级纯函数，不依赖爬虫实例和网络会话，可直接提交到解析进程池
+
+
+def _make_soup(html: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """使用 lxml 解析 HTML，lxml 不可用时回退到 html.parser
+
+    Args:
+        html: 页面 HTML
+        parse_only: 只构建匹配的节点，其余节点直接跳过
+    """
+    try:
+        return BeautifulSoup(html, "lxml", parse_only=parse_only)
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+
+def _parse_chapter_html(html: str) -> dict[str, str]:
+    """解析章节页面，返回标题和正文"""
+    soup = _make_soup(html)
+    return {
+        "title": XspswCrawlerRefactored._extract_chapter_title(soup),
+        "content": XspswCrawlerRefactored._extract_xspsw_content(soup),
+    }
+
+
 # 为了向后兼容，创建别名
 XspswCrawler = XspswCrawlerRefactored
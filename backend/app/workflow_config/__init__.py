@@ -18,6 +18,8 @@
     WorkflowConfigManager,
     WorkflowInfo,
     WorkflowSettings,
+    load_workflow_json,
+    load_workflow_text,
     workflow_config_manager,
 )
 
@@ -30,6 +32,8 @@
     "WorkflowResponse",
     "WorkflowSettings",
     "WorkflowType",
+    "load_workflow_json",
+    "load_workflow_text",
     "settings",
     "workflow_config_manager",
 ]
@@ -3,10 +3,13 @@
 负责加载和管理YAML格式的工作流配置
 """
 
+import functools
 import logging
 import os
 from pathlib import Path
+from typing import Any
 
+import orjson
 import yaml
 from pydantic import BaseModel, Field
 
@@ -14,6 +17,9 @@
 
 logger = logging.getLogger(__name__)
 
+# 工作流JSON文本缓存条目数(每个工作流文件一条)
+_WORKFLOW_CACHE_SIZE = 16
+
 
 class WorkflowInfo(BaseModel):
     """工作流信息模型"""
@@ -67,8 +73,8 @@ def __init__(self, config_path: str | None = None):
                 config_path = Path("/app/workflows.yaml")
             else:
                 # 在本地开发环境
-                current_dir = Path(__file__).parent.parent
-                config_path = current_dir / "workflows.yaml"
+                backend_dir = Path(__file__).resolve().parents[2]
+                config_path = backend_dir / "workflows.yaml"
 
         self.config_path = Path(config_path)
         self._config: WorkflowConfig | None = None
@@ -264,5 +270,25 @@ def reload_config(self) -> None:
         self._load_config()
 
 
+@functools.lru_cache(maxsize=_WORKFLOW_CACHE_SIZE)
+def _read_workflow_text(path: str, mtime_ns: int) -> str:  # noqa: ARG001
+    # mtime_ns 只参与缓存键,文件修改后旧条目自然失效
+    return Path(path).read_text(encoding="utf-8")
+
+
+def load_workflow_text(path: str | Path) -> str:
+    """读取工作流JSON文本.
+
+    按(路径, 修改时间)缓存,客户端按请求创建时不再重复读盘,文件更新后自动重新读取.
+    """
+    path = Path(path)
+    return _read_workflow_text(str(path), path.stat().st_mtime_ns)
+
+
+def load_workflow_json(path: str | Path) -> dict[str, Any]:
+    """读取并解析工作流JSON,每次返回独立的字典,调用方可以随意修改."""
+    return orjson.loads(load_workflow_text(path))
+
+
 # 全局配置管理器实例
 workflow_config_manager = WorkflowConfigManager()
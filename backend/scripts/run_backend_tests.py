@@ -6,428 +6,404 @@
 提供完整的测试套件执行、报告生成和性能分析
 """
 
+import argparse
+import asyncio
+import compileall
+import functools
+import heapq
+import importlib.util
+import json
+import multiprocessing
 import os
+import string
 import sys
-import subprocess
-import argparse
 import time
-import json
-import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
 
-class BackendTestRunner:
-    """后端测试运行器"""
+# 运行测试必需的第三方包
+_REQUIRED_PACKAGES = ("pytest", "aiohttp")
 
-    def __init__(self, project_root: str):
-        self.project_root = Path(project_root)
-        self.backend_dir = self.project_root / "backend"
-        self.reports_dir = self.project_root / "test-reports"
-        self.reports_dir.mkdir(exist_ok=True)
-
-        # 测试分类
-        self.test_categories = {
-            "unit": {
-                "name": "单元测试",
-                "command": ["python", "-m", "pytest", "tests/unit"],
-                "timeout": 300,  # 5分钟
-                "files": [
-                    "test_cache_api.py",
-                    "test_cache_database.py",
-                ],
-            },
-            "integration": {
-                "name": "集成测试",
-                "command": ["python", "-m", "pytest", "tests/integration"],
-                "timeout": 600,  # 10分钟
-                "files": [
-                    "test_api_endpoints.py",
-                    "test_real_crawlers.py",
-                    "test_crawler_cache_integration.py",
-                    "test_cache_e2e.py",
-                ],
-            },
-            "performance": {
-                "name": "性能测试",
-                "command": ["python", "-m", "pytest", "tests/performance"],
-                "timeout": 1200,  # 20分钟
-                "files": [
-                    "test_cache_performance.py",
-                ],
-                "markers": ["performance"],
-            },
-            "e2e": {
-                "name": "端到端测试",
-                "command": ["python", "-m", "pytest", "tests/e2e"],
-                "timeout": 600,  # 10分钟
-                "files": [
-                    "test_cache_e2e.py",
-                ],
-            },
-            "all": {
-                "name": "所有测试",
-                "command": ["python", "-m", "pytest", "tests/"],
-                "timeout": 1800,  # 30分钟
-                "files": "all tests",
-            },
-        }
+# 后端服务健康检查地址及超时(秒)，服务未启动时快速失败
+_BACKEND_HEALTH_URL = "http://localhost:8000/health"
+_BACKEND_PROBE_TIMEOUT = 1.0
 
-    def run_test_category(self, category: str) -> Dict[str, Any]:
-        """运行指定类别的测试"""
-        if category not in self.test_categories:
-            print(f"❌ 未知的测试类别: {category}")
-            return {"success": False, "error": f"Unknown test category: {category}"}
+# 并发运行前预先编译字节码的目录(相对 backend 目录)
+_PRECOMPILE_DIRS = ("app", "tests")
 
-        config = self.test_categories[category]
-        print(f"\n🚀 运行 {config['name']}...")
-        print(f"📁 超时限制: {config['timeout']}秒")
+# 不按文件分片的类别(性能测试对计时敏感，保持串行)
+_UNSHARDED_CATEGORIES = frozenset({"performance"})
 
-        start_time = time.time()
-        result = self._execute_command(config['command'], config['timeout'])
-        end_time = time.time()
+# 报告中保留的输出尾部行数，完整输出保存在各类别的日志文件中
+_OUTPUT_TAIL_LINES = 200
 
-        duration = end_time - start_time
+# 读取日志尾部时从文件末尾读取的最大字节数
+_OUTPUT_TAIL_BYTES = 64 * 1024
 
-        # 解析测试结果
-        test_results = self._parse_test_output(result['stdout'], result['stderr'])
 
-        return {
-            "category": category,
-            "config": config,
-            "success": result['returncode'] == 0,
-            "duration": duration,
-            "results": test_results,
-            "output": result['stdout'],
-            "errors": result['stderr'],
-        }
+def _dump_json(obj: Any, path: Path) -> None:
+    """将对象写入JSON文件，安装了 orjson 时使用其C实现的编码器"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
 
-    def _execute_command(self, command: List[str], timeout: int) -> Dict[str, Any]:
-        """执行命令并返回结果"""
-        try:
-            print(f"🔄 执行命令: {' '.join(command)}")
-
-            # 在后端目录中执行
-            process = subprocess.Popen(
-                command,
-                cwd=self.backend_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                shell=False,
-            )
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
 
-            # 设置超时
-            try:
-                stdout, stderr = process.communicate(timeout=timeout)
-                returncode = process.returncode
-            except subprocess.TimeoutExpired:
-                process.kill()
-                print(f"⏱️ 命令超时，正在终止...")
-                stdout, stderr = process.communicate(timeout=5)
-                returncode = -1
-            except:
-                stdout, stderr = process.communicate(timeout=5)
-                returncode = -2
 
-        except Exception as e:
-            print(f"💥 命令执行异常: {e}")
-            return {
-                "returncode": -1,
-                "stdout": "",
-                "stderr": str(e),
-                "exception": True,
-            }
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: Path) -> Path:
+    """首次写入前创建目录，同一路径只创建一次"""
+    path.mkdir(parents=True, exist_ok=True)
+    return path
 
-        return {
-            "returncode": returncode,
-            "stdout": stdout,
-            "stderr": stderr,
-            "exception": False,
-        }
 
-    def _parse_test_output(self, stdout: str, stderr: str) -> Dict[str, Any]:
-        """解析pytest输出并提取测试结果"""
-        try:
-            # 提取测试统计
-            lines = (stdout + stderr).split('\n')
-
-            test_results = {
-                "total": 0,
-                "passed": 0,
-                "failed": 0,
-                "skipped": 0,
-                "errors": 0,
-                "duration": 0.0,
-                "failed_tests": [],
-                "passed_tests": [],
-                "skipped_tests": [],
-            }
+def _empty_results() -> dict[str, Any]:
+    """空的测试统计结果"""
+    return {
+        "total": 0,
+        "passed": 0,
+        "failed": 0,
+        "skipped": 0,
+        "errors": 0,
+        "duration": 0.0,
+        "failed_tests": [],
+        "passed_tests": [],
+        "skipped_tests": [],
+    }
 
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # 解析pytest的总结行
-                if "tests discovered" in line:
-                    # pytest 5.x 的格式
-                    match = line.split("tests discovered")[0]
-                    if match:
-                        test_results["total"] = int(match.split()[0])
-
-                elif "passed in " in line or ("passed in" in line and "failed in" in line):
-                    # pytest 5.x+ 的详细格式
-                    parts = line.split(",")
-                    for part in parts:
-                        part = part.strip()
-                        if "passed in" in part:
-                            count = part.split("=")[1] if "=" in part else 1
-                            test_results["passed"] += int(count)
-                        elif "failed in" in part:
-                            count = part.split("=")[1] if "=" in part else 1
-                            test_results["failed"] += int(count)
-                        elif "skipped" in part:
-                            count = part.split("=")[1] if "=" in part else 1
-                            test_results["skipped"] += int(count)
-                        elif "errors" in part:
-                            count = part.split("=")[1] if "=" in part else 1
-                            test_results["errors"] += int(count)
-                        elif "duration" in part:
-                            duration_str = part.split("=")[1].strip()
-                            if duration_str.endswith("s"):
-                                test_results["duration"] = float(duration_str[:-1])
-                            else:
-                                # 处理 HH:MM:SS 格式
-                                time_parts = duration_str.split(":")
-                                if len(time_parts) == 3:
-                                    hours = int(time_parts[0])
-                                    minutes = int(time_parts[1])
-                                    seconds = int(time_parts[2])
-                                    test_results["duration"] = hours * 3600 + minutes * 60 + seconds
-                                elif len(time_parts) == 2:
-                                    minutes = int(time_parts[0])
-                                    seconds = int(time_parts[1])
-                                    test_results["duration"] = minutes * 60 + seconds
-
-                # 提取失败的测试信息
-                if "FAILED " in line or "ERROR " in line:
-                    test_name = self._extract_test_name(line)
-                    if test_name:
-                        test_results["failed_tests"].append(test_name)
-
-            return test_results
-
-        except Exception as e:
-            print(f"⚠️ 解析测试输出时出错: {e}")
-            return {
-                "total": 0,
-                "passed": 0,
-                "failed": 0,
-                "skipped": 0,
-                "errors": 0,
-                "duration": 0.0,
-                "failed_tests": [],
-                "passed_tests": [],
-                "skipped_tests": [],
-                "parsing_error": str(e),
-            }
 
-    def _extract_test_name(self, line: str) -> str:
-        """从pytest输出中提取测试名称"""
-        try:
-            # 查找测试名称模式
-            patterns = [
-                r"test_(.*?)\.py::",
-                r"::test_(.*?)\s+",
-                r"FAILED (test_.*?)\s+",
-                r"ERROR (test_.*?)\s+",
-            ]
+@dataclass
+class ReportData:
+    """一次测试运行的报告数据，HTML 和 JSON 报告共用"""
 
-            for pattern in patterns:
-                match = re.search(pattern, line)
-                if match:
-                    return match.group(1)
-            return ""
-        except:
-            return ""
+    timestamp: str
+    # 报告文件名标识，HTML 和 JSON 报告共用，避免同一秒内生成的文件互相覆盖
+    report_id: str
+    results: list[dict[str, Any]]
+    totals: dict[str, Any]
+    categories: dict[str, dict[str, Any]]
 
-    def generate_html_report(self, results: List[Dict[str, Any]]) -> str:
-        """生成HTML测试报告"""
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
 
-        html = f"""
+def _shard_files(node_ids: list[str], shard_count: int) -> list[frozenset[str]]:
+    """按测试文件把测试分成若干份，每次把用例最多的文件分给当前最轻的一份
+
+    同一文件的测试留在同一份中，模块级 fixture 不会在多个分片里重复初始化。
+    """
+    file_counts: dict[str, int] = {}
+    for node_id in node_ids:
+        path = node_id.split("::", 1)[0]
+        file_counts[path] = file_counts.get(path, 0) + 1
+
+    shards: list[list[str]] = [[] for _ in range(min(shard_count, len(file_counts)))]
+    heap = [(0, index) for index in range(len(shards))]
+    for path, count in sorted(file_counts.items(), key=lambda item: -item[1]):
+        load, index = heapq.heappop(heap)
+        shards[index].append(path)
+        heapq.heappush(heap, (load + count, index))
+
+    return [frozenset(shard) for shard in shards]
+
+
+def _merge_results(shard_results: list[dict[str, Any]]) -> dict[str, Any]:
+    """合并各分片的统计结果，耗时取最慢的分片"""
+    merged = _empty_results()
+    for results in shard_results:
+        for key in ("total", "passed", "failed", "skipped", "errors"):
+            merged[key] += results[key]
+        for key in ("failed_tests", "passed_tests", "skipped_tests"):
+            merged[key].extend(results[key])
+        merged["duration"] = max(merged["duration"], results["duration"])
+    return merged
+
+
+class _NodeIdCollector:
+    """pytest插件: 收集测试用例的 node id(配合 --collect-only 使用)"""
+
+    def __init__(self):
+        self.results: list[str] = []
+
+    def pytest_collection_finish(self, session):
+        self.results = [item.nodeid for item in session.items]
+
+
+class _ResultCollector:
+    """pytest插件: 直接从测试报告中收集结果，无需解析文本输出"""
+
+    def __init__(self, only_files: frozenset[str] | None = None):
+        self.results = _empty_results()
+        self._start_time = 0.0
+        # 分片运行时只保留这些文件中的测试
+        self.only_files = only_files
+
+    def pytest_collection_modifyitems(self, config, items):
+        if self.only_files is None:
+            return
+
+        selected, deselected = [], []
+        for item in items:
+            if item.nodeid.split("::", 1)[0] in self.only_files:
+                selected.append(item)
+            else:
+                deselected.append(item)
+
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    def pytest_sessionstart(self, session):
+        self._start_time = time.time()
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self.results["errors"] += 1
+            self.results["failed_tests"].append(report.nodeid)
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == "call":
+            if hasattr(report, "wasxfail") or report.skipped:
+                self._record("skipped", report.nodeid)
+            elif report.passed:
+                self._record("passed", report.nodeid)
+            else:
+                self._record("failed", report.nodeid)
+        elif report.failed:
+            # setup/teardown 阶段失败
+            self.results["errors"] += 1
+            self.results["total"] += report.when == "setup"
+            self.results["failed_tests"].append(report.nodeid)
+        elif report.skipped and report.when == "setup":
+            self._record("skipped", report.nodeid)
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.results["duration"] = time.time() - self._start_time
+
+    def _record(self, outcome: str, nodeid: str) -> None:
+        self.results["total"] += 1
+        self.results[outcome] += 1
+        self.results[f"{outcome}_tests"].append(nodeid)
+
+
+async def _wait_readable(fd: int, timeout: float | None = None) -> bool:
+    """等待文件描述符变为可读(数据到达、对端关闭或子进程退出)
+
+    Returns:
+        超时前变为可读时返回 True
+    """
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+    try:
+        await asyncio.wait_for(ready, timeout)
+        return True
+    except TimeoutError:
+        return False
+    finally:
+        loop.remove_reader(fd)
+
+
+def _pytest_worker(args: list[str], cwd: str, log_path: str, conn, plugin) -> None:
+    """在子进程中运行 pytest.main，输出写入日志文件，插件收集的结果通过管道回传"""
+    import pytest
+
+    os.chdir(cwd)
+    # 与 python -m pytest 一致，把工作目录加入模块搜索路径
+    sys.path.insert(0, cwd)
+    # 字节码已由父进程预先编译，并发的子进程只读取，不再争抢写入 __pycache__
+    sys.dont_write_bytecode = True
+
+    with open(log_path, "w", encoding="utf-8") as log:
+        os.dup2(log.fileno(), sys.stdout.fileno())
+        os.dup2(log.fileno(), sys.stderr.fileno())
+
+        exit_code = pytest.main(args, plugins=[plugin])
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    conn.send((int(exit_code), plugin.results))
+    conn.close()
+
+
+# HTML 报告骨架，导入时解析一次
+_HTML_SHELL = string.Template("""
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>后端缓存功能测试报告 - {timestamp}</title>
+    <title>后端缓存功能测试报告 - ${timestamp}</title>
     <style>
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             line-height: 1.6;
             color: #333;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background-color: white;
             padding: 20px;
             border-radius: 8px;
             box-shadow: 0 2px 10px rgba(0, 0, 0.1);
-        }}
-        .header {{
+        }
+        .header {
             text-align: center;
             margin-bottom: 30px;
             padding-bottom: 20px;
             border-bottom: 2px solid #e0e0e0;
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             color: #2196F3;
             font-size: 28px;
             margin: 0;
-        }}
-        .header p {{
+        }
+        .header p {
             color: #666;
             font-size: 16px;
             margin: 10px 0;
-        }}
-        .summary {{
+        }
+        .summary {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
-        }}
-        .summary-item {{
+        }
+        .summary-item {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 20px;
             border-radius: 8px;
             text-align: center;
             font-weight: bold;
-        }}
-        .summary-item .number {{
+        }
+        .summary-item .number {
             font-size: 36px;
             font-weight: bold;
-        }}
-        .summary-item .label {{
+        }
+        .summary-item .label {
             font-size: 16px;
             margin-top: 5px;
-        }}
-        .test-categories {{
+        }
+        .test-categories {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 20px;
-        }}
-        .category-card {{
+        }
+        .category-card {
             border: 1px solid #ddd;
             border-radius: 8px;
             overflow: hidden;
-        }}
-        .category-header {{
+        }
+        .category-header {
             background: #f8f9fa;
             padding: 15px;
             font-weight: bold;
             border-bottom: 1px solid #e9ecef;
-        }}
-        .category-content {{
+        }
+        .category-content {
             padding: 20px;
-        }}
-        .status {{
+        }
+        .status {
             display: flex;
             justify-content: space-between;
             margin-bottom: 10px;
             font-size: 14px;
-        }}
-        .status-badge {{
+        }
+        .status-badge {
             padding: 4px 12px;
             border-radius: 20px;
             font-weight: bold;
-        }}
-        .status-success {{
+        }
+        .status-success {
             background: #4CAF50;
             color: white;
-        }}
-        .status-failed {{
+        }
+        .status-failed {
             background: #F44336;
             color: white;
-        }}
-        .details {{
+        }
+        .details {
             margin-top: 15px;
-        }}
-        .detail-item {{
+        }
+        .detail-item {
             padding: 10px 15px;
             margin: 5px 0;
             border-radius: 4px;
             background: #f8f9fa;
             border-left: 3px solid #2196F3;
-        }}
-        .detail-item.success {{
+        }
+        .detail-item.success {
             border-left-color: #4CAF50;
-        }}
-        .detail-item.failed {{
+        }
+        .detail-item.failed {
             border-left-color: #F44336;
-        }}
-        .charts {{
+        }
+        .charts {
             margin-top: 30px;
-        }}
-        .chart {{
+        }
+        .chart {
             background: white;
             border-radius: 8px;
             padding: 20px;
             box-shadow: 0 2px 10px rgba(0, 0, 0.1);
-        }}
-        .progress-bar {{
+        }
+        .progress-bar {
             height: 20px;
             background-color: #e0e0e0;
             border-radius: 10px;
             overflow: hidden;
-        }}
-        .progress-fill {{
+        }
+        .progress-fill {
             height: 100%;
             background: linear-gradient(90deg, #4CAF50 0%, #45a049 100%);
             transition: width 0.3s ease-in-out;
-        }}
-        .performance-metrics {{
+        }
+        .performance-metrics {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 20px;
             margin-top: 20px;
-        }}
-        .metric {{
+        }
+        .metric {
             text-align: center;
             padding: 15px;
             background: #f8f9fa;
             border-radius: 8px;
-        }}
-        .metric .value {{
+        }
+        .metric .value {
             font-size: 24px;
             font-weight: bold;
             color: #2196F3;
-        }}
-        .metric .label {{
+        }
+        .metric .label {
             color: #666;
             margin-top: 5px;
-        }}
-        @media print {{
-            body {{
+        }
+        @media print {
+            body {
                 padding: 10px;
-            }}
-            .container {{
+            }
+            .container {
                 padding: 15px;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
     <div class="container">
         <div class="header">
             <h1>🔧 Novel Builder 后端缓存功能测试报告</h1>
-            <p>生成时间: {timestamp}</p>
+            <p>生成时间: ${timestamp}</p>
         </div>
 
         <div class="summary">
@@ -435,102 +411,65 @@ def generate_html_report(self, results: List[Dict[str, Any]]) -> str:
                 <div class="number">⚡️</div>
                 <div class="label">
                     <div>总测试数</div>
-                    <div>{len(results)}</div>
+                    <div>${total}</div>
                 </div>
             </div>
             <div class="summary-item">
                 <div class="number">✅</div>
                 <div class="label">
                     <div>通过测试</div>
-                    <div>{sum(r.get('success', 0) for r in results)}</div>
+                    <div>${passed}</div>
                 </div>
             </div>
             <div class="summary-item">
                 <div class="number">❌</div>
                 <div class="label">
                     <div>失败测试</div>
-                    <div>{sum(r.get('failed', 0) for r in results)}</div>
+                    <div>${failed}</div>
                 </div>
             </div>
             <div class="summary-item">
                 <div class="number">⏱️</div>
                 <div class="label">
                     <div>跳过测试</div>
-                    <div>{sum(r.get('skipped', 0) for r in results)}</div>
+                    <div>${skipped}</div>
                 </div>
             </div>
             <div class="summary-item">
                 <div class="number">⚠️</div>
                 <div class="label">
                     <div>错误测试</div>
-                    <div>{sum(r.get('errors', 0) for r in results)}</div>
+                    <div>${errors}</div>
                 </div>
             </div>
         </div>
 
         <div class="test-categories">
             <h2>📋 测试分类结果</h2>
-        """
-
-        # 每个测试类别的结果
-        for result in results:
-            category = result.get('category', 'unknown')
-            config = self.test_categories.get(category, {})
-
-            status_class = 'status-success' if result.get('success') else 'status-failed'
-            status_text = '通过' if result.get('success') else '失败'
-
-            total = result['results']['total']
-            passed = result['results']['passed']
-            failed = result['results']['failed']
-            pass_rate = (passed / total * 100) if total > 0 else 0
-
-            html += f"""
-            <div class="category-card">
-                <div class="category-header">
-                    <h3>{config['name']}</h3>
-                    <div class="status">
-                        <span class="status-badge {status_class}">{status_text}</span>
-                        <span>({passed}/{total} - {pass_rate:.1f}%)</span>
-                    </div>
-                </div>
-                <div class="category-content">
-                    <div class="status">
-                        <div>⏱️ 状态: <span class="status-badge status-success">✓</span> {status_text}</span></div>
-                        <div>⏱️ 耗时: {result['duration']:.1f}秒</div>
-                        <div>📝 总数: <strong>{total}</strong></div>
-                        <div>📊 成功率: <strong>{pass_rate:.1f}%</strong></div>
-                    </div>
-                    <div class="details">
-                        <h4>测试结果详情</h4>
-                        {self._generate_test_details_html(result['results'])}
-                    </div>
-                </div>
-            </div>
-        </div>
+${category_cards}        </div>
 
         <div class="charts">
             <h2>📊 性能指标</h2>
             <div class="performance-metrics">
                 <div class="metric">
                     <div class="label">平均测试时间</div>
-                    <div class="value">{sum(r['duration'] for r in results) / len(results):.2f}s</div>
+                    <div class="value">${duration_avg}s</div>
                 </div>
                 <div class="metric">
                     <div class="label">最长测试时间</div>
-                    <div class="value">{max(r['duration'] for r in results):.2f}s</div>
+                    <div class="value">${duration_max}s</div>
                 </div>
             </div>
             <div class="performance-metrics">
                 <div class="metric">
                     <div class="label">总测试覆盖</div>
-                    <div class="value">{sum(r['results']['total'] for r in results)}</div>
+                    <div class="value">${total}</div>
                 </div>
             </div>
             <div class="performance-metrics">
                 <div class="metric">
                     <div class="label">测试通过率</div>
-                    <div class="value">{sum(r['results']['passed']) / sum(r['results']['total']) * 100:.1f}%</div>
+                    <div class="value">${pass_rate}%</div>
                 </div>
             </div>
         </div>
@@ -539,10 +478,10 @@ def generate_html_report(self, results: List[Dict[str, Any]]) -> str:
             <h2>📈 测试进度可视化</h2>
             <div class="chart">
                 <div class="progress-bar">
-                    <div class="progress-fill" style="width: {sum(r.get('success', 0) for r in results) / len(results) * 100}%"></div>
+                    <div class="progress-fill" style="width: ${progress}%"></div>
                 </div>
                 <p style="text-align: center; margin-top: 10px; color: #666;">
-                    总体测试进度: {sum(r.get('success', 0) for r in results)}/{sum(r['results']['total'])}%
+                    总体测试进度: ${passed}/${total}
                 </p>
             </div>
         </div>
@@ -552,26 +491,501 @@ def generate_html_report(self, results: List[Dict[str, Any]]) -> str:
             <div style="background: #fff3cd; padding: 20px; border-radius: 8px; border-left: 4px solid #4CAF50;">
                 <h4 style="color: #856404; margin: 0 0 10px 0;">💡 建议</h4>
                 <ul style="margin-left: 20px; color: #666;">
-        """
-
-        html += f"""
+                </ul>
+            </div>
         </div>
     </div>
 </body>
 </html>
+""")
+
+# 单个测试类别的结果卡片
+_CATEGORY_CARD = string.Template("""
+            <div class="category-card">
+                <div class="category-header">
+                    <h3>${name}</h3>
+                    <div class="status">
+                        <span class="status-badge ${status_class}">${status_text}</span>
+                        <span>(${passed}/${total} - ${pass_rate}%)</span>
+                    </div>
+                </div>
+                <div class="category-content">
+                    <div class="status">
+                        <div>⏱️ 状态: <span class="status-badge status-success">✓</span> ${status_text}</span></div>
+                        <div>⏱️ 耗时: ${duration}秒</div>
+                        <div>📝 总数: <strong>${total}</strong></div>
+                        <div>📊 成功率: <strong>${pass_rate}%</strong></div>
+                    </div>
+                    <div class="details">
+                        <h4>测试结果详情</h4>
+                        ${details}
+                    </div>
+                </div>
+            </div>
+""")
+
+
+@dataclass(frozen=True, slots=True)
+class TestCategory:
+    """测试类别定义(不可变，所有运行器共享)"""
+
+    key: str
+    name: str
+    # 传给 pytest 的测试路径(第一项)及选项
+    args: tuple[str, ...]
+    timeout: int
+    files: tuple[str, ...] = ()
+    markers: tuple[str, ...] = ()
+
+
+# 测试分类
+TEST_CATEGORIES: tuple[TestCategory, ...] = (
+    TestCategory(
+        key="unit",
+        name="单元测试",
+        args=("tests/unit",),
+        timeout=300,  # 5分钟
+        files=(
+            "test_cache_api.py",
+            "test_cache_database.py",
+        ),
+    ),
+    TestCategory(
+        key="integration",
+        name="集成测试",
+        # 端到端测试文件位于 integration 目录，由 e2e 类别单独运行，这里跳过避免重复执行
+        args=(
+            "tests/integration",
+            "--ignore=tests/integration/test_cache_e2e.py",
+        ),
+        timeout=600,  # 10分钟
+        files=(
+            "test_api_endpoints.py",
+            "test_real_crawlers.py",
+            "test_crawler_cache_integration.py",
+        ),
+    ),
+    TestCategory(
+        key="performance",
+        name="性能测试",
+        args=("tests/performance",),
+        timeout=1200,  # 20分钟
+        files=(
+            "test_cache_performance.py",
+        ),
+        markers=("performance",),
+    ),
+    TestCategory(
+        key="e2e",
+        name="端到端测试",
+        args=("tests/integration/test_cache_e2e.py",),
+        timeout=600,  # 10分钟
+        files=(
+            "test_cache_e2e.py",
+        ),
+    ),
+    TestCategory(
+        key="all",
+        name="所有测试",
+        args=("tests/",),
+        timeout=1800,  # 30分钟
+    ),
+)
+
+
+class BackendTestRunner:
+    """后端测试运行器"""
+
+    def __init__(
+        self,
+        project_root: str,
+        workers: int | None = None,
+        incremental: bool = False,
+    ):
+        self.project_root = Path(project_root)
+        self.backend_dir = self.project_root / "backend"
+        self.reports_dir = self.project_root / "test-reports"
+
+        # 测试分类，按类别名查找
+        self.test_categories: dict[str, TestCategory] = {
+            category.key: category for category in TEST_CATEGORIES
+        }
+        self.incremental = incremental
+        # 测试路径 -> 是否包含测试文件
+        self._test_files_found: dict[str, bool] = {}
+        # 按运行参数追加到各类别的 pytest 选项
+        self._xdist_args: list[str] = []
+
+        # pytest-xdist 并行执行，默认保留两个核心给系统和其他类别的子进程
+        # 注意: 并行时各 worker 是独立进程，共享资源(临时目录、端口、数据库文件)需按 worker 隔离
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 2) - 2)
+        self.workers = workers
+        # 未安装 pytest-xdist 时，由运行器按测试文件分片并发执行
+        self.shard_count = 1
+
+        if workers > 1 and importlib.util.find_spec("xdist") is not None:
+            self._xdist_args = ["-n", str(workers), "--dist=loadfile"]
+        elif workers > 1 and not incremental:
+            # 增量模式下各分片会同时改写同一份 lastfailed 记录，因此不分片
+            self.shard_count = workers
+
+    def _has_test_files(self, target: str) -> bool:
+        """测试路径是否存在测试文件(结果按路径缓存)"""
+        if target not in self._test_files_found:
+            path = self.backend_dir / target
+            if path.is_file():
+                found = True
+            elif path.is_dir():
+                found = any(
+                    name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+                    for _, _, names in os.walk(path)
+                    for name in names
+                )
+            else:
+                found = False
+            self._test_files_found[target] = found
+        return self._test_files_found[target]
+
+    def _pytest_args(self, category: TestCategory) -> list[str]:
+        """类别的 pytest 参数，加上并行和增量运行选项"""
+        args = list(category.args)
+
+        # 性能测试对计时敏感，保持串行
+        if category.key not in _UNSHARDED_CATEGORIES:
+            args += self._xdist_args
+
+        # 增量模式: 只重跑上次失败的测试，没有失败记录时运行全部
+        # 各类别并发执行，每个类别使用独立的缓存目录，避免同时写 lastfailed 互相覆盖
+        if self.incremental:
+            args += [
+                "-p", "cacheprovider",
+                "--lf",
+                "--last-failed-no-failures=all",
+                f"--cache-dir=.pytest_cache_backend/{category.key}",
+            ]
+        return args
+
+    def run_test_category(self, category: str) -> dict[str, Any]:
+        """运行指定类别的测试"""
+        return asyncio.run(self.run_category_async(category))
+
+    async def run_category_async(self, category: str) -> dict[str, Any]:
+        """异步运行指定类别的测试"""
+        if category not in self.test_categories:
+            print(f"❌ 未知的测试类别: {category}")
+            return {"success": False, "error": f"Unknown test category: {category}"}
+
+        config = self.test_categories[category]
+        print(f"\n🚀 运行 {config.name}...")
+
+        # 没有测试文件时不启动 pytest
+        if not self._has_test_files(config.args[0]):
+            print(f"⏭️ {config.name}: 未找到测试文件，跳过")
+            return {
+                "category": category,
+                "config": config,
+                "success": True,
+                "duration": 0.0,
+                "results": _empty_results(),
+                "output": "",
+                "errors": "",
+                "skipped_reason": "no test files",
+            }
+
+        print(f"📁 超时限制: {config.timeout}秒")
+
+        args = self._pytest_args(config)
+        start_time = time.time()
+        if self.shard_count > 1 and category not in _UNSHARDED_CATEGORIES:
+            result = await self._run_sharded(category, args, config.timeout)
+        else:
+            result = await self._run_pytest_inproc(
+                category, args, config.timeout, _ResultCollector()
+            )
+        end_time = time.time()
+
+        duration = end_time - start_time
+
+        return {
+            "category": category,
+            "config": config,
+            "success": result['returncode'] == 0,
+            "duration": duration,
+            "results": result['results'],
+            "output": result['stdout'],
+            "errors": result['stderr'],
+        }
+
+    async def run_all_async(self) -> list[dict[str, Any]]:
+        """并发运行所有测试类别
+
+        各类别在独立的 pytest 子进程中执行，总耗时取决于最慢的类别而非各类别之和。
+        "all" 类别是其他类别的并集，不再重复运行。
         """
+        categories = [c for c in self.test_categories if c != "all"]
+
+        # 并发启动前统一编译一次字节码
+        # 直接在当前线程执行: 随后会 fork 子进程，父进程中不应留有其他线程
+        self._precompile()
+
+        outcomes = await asyncio.gather(
+            *(self.run_category_async(c) for c in categories),
+            return_exceptions=True,
+        )
+
+        results = []
+        for category, outcome in zip(categories, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                print(f"💥 {self.test_categories[category].name}执行异常: {outcome}")
+                outcome = {
+                    "category": category,
+                    "config": self.test_categories[category],
+                    "success": False,
+                    "duration": 0.0,
+                    "results": _empty_results(),
+                    "output": "",
+                    "errors": str(outcome),
+                }
+            results.append(outcome)
+        return results
+
+    def _precompile(self) -> None:
+        """并行编译被测代码和测试代码的字节码"""
+        for directory in _PRECOMPILE_DIRS:
+            path = self.backend_dir / directory
+            if path.is_dir():
+                compileall.compile_dir(path, quiet=1, workers=0)
+
+    async def _run_sharded(
+        self, category: str, args: list[str], timeout: int
+    ) -> dict[str, Any]:
+        """按测试文件分片，各分片在独立的 pytest 子进程中并发执行"""
+        collected = await self._run_pytest_inproc(
+            f"{category}.collect", args + ["--collect-only", "-q"], timeout,
+            _NodeIdCollector(),
+        )
+        shards = _shard_files(collected['results'], self.shard_count)
+
+        # 收集失败或只有一个文件时直接整体运行，错误信息由正常运行报告
+        if collected['returncode'] != 0 or len(shards) <= 1:
+            return await self._run_pytest_inproc(
+                category, args, timeout, _ResultCollector()
+            )
+
+        outcomes = await asyncio.gather(*(
+            self._run_pytest_inproc(
+                f"{category}.{index}", args, timeout, _ResultCollector(shard)
+            )
+            for index, shard in enumerate(shards)
+        ))
+
+        return {
+            "returncode": next(
+                (o['returncode'] for o in outcomes if o['returncode'] != 0), 0
+            ),
+            "results": _merge_results([o['results'] for o in outcomes]),
+            "stdout": "".join(o['stdout'] for o in outcomes),
+            "stderr": "",
+        }
+
+    async def _run_pytest_inproc(
+        self, name: str, args: list[str], timeout: int, plugin
+    ) -> dict[str, Any]:
+        """在 fork 出的子进程中调用 pytest.main 运行测试
+
+        pytest 及其插件只在当前进程导入一次，fork 出的子进程直接复用，
+        省去每个类别启动新解释器、发现插件的开销；同时各类别的模块状态互相隔离。
+        plugin 在子进程中收集结果，其 results 属性回传给父进程。
+        """
+        # 先在父进程中导入，子进程 fork 后无需重复导入
+        import pytest  # noqa: F401
+
+        log_path = _ensure_dir(self.reports_dir) / f"{name}.log"
+        print(f"🔄 执行: pytest {' '.join(args)} (日志: {log_path})")
+
+        # Linux 上使用 fork 复用已导入的模块，其他平台退回默认方式
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+        parent_conn, child_conn = context.Pipe(duplex=False)
+
+        # fork 前刷新缓冲，避免父进程未输出的内容被子进程重复输出
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        process = context.Process(
+            target=_pytest_worker,
+            args=(args, str(self.backend_dir), str(log_path), child_conn, plugin),
+        )
+        process.start()
+        child_conn.close()
+
+        # 父进程中的插件未参与运行，其 results 即为空结果
+        results = plugin.results
+        try:
+            # 由事件循环监听管道，不占用线程: 其他类别还会继续 fork，
+            # 父进程中存在线程时 fork 出的子进程可能因继承被占用的锁而死锁
+            if await _wait_readable(parent_conn.fileno(), timeout):
+                returncode, results = parent_conn.recv()
+            else:
+                process.kill()
+                print(f"⏱️ {name} 测试超时，正在终止...")
+                returncode = -1
+        except EOFError:
+            # 子进程异常退出，没有回传结果
+            returncode = -2
+        finally:
+            parent_conn.close()
+            # 子进程退出后 sentinel 变为可读，此时 join 不会阻塞
+            await _wait_readable(process.sentinel)
+            process.join()
+
+        return {
+            "returncode": returncode,
+            "results": results,
+            "stdout": self._read_log_tail(log_path),
+            "stderr": "",
+        }
+
+    @staticmethod
+    def _read_log_tail(log_path: Path) -> str:
+        """读取日志文件的最后若干行(只读取文件末尾，不逐行扫描整个日志)"""
+        try:
+            with open(log_path, "rb") as log:
+                size = log.seek(0, os.SEEK_END)
+                log.seek(max(0, size - _OUTPUT_TAIL_BYTES))
+                tail = log.read()
+        except OSError:
+            return ""
+
+        lines = tail.decode("utf-8", errors="replace").splitlines(keepends=True)
+        if len(tail) < size and lines:
+            # 第一行可能只读到一半，丢弃
+            lines = lines[1:]
+        return "".join(lines[-_OUTPUT_TAIL_LINES:])
+
+    @staticmethod
+    def _aggregate(results: list[dict[str, Any]]) -> dict[str, Any]:
+        """一次遍历汇总所有类别的统计数据，供各报告共用"""
+        totals = {
+            "categories": len(results),
+            "succeeded": 0,
+            "total": 0,
+            "passed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "errors": 0,
+            "duration_sum": 0.0,
+            "duration_max": 0.0,
+            "duration_min": 0.0,
+            "test_duration_sum": 0.0,
+            "test_duration_max": 0.0,
+            "test_duration_min": 0.0,
+        }
+        if not results:
+            totals.update(duration_avg=0.0, test_duration_avg=0.0, pass_rate=0.0)
+            return totals
+
+        duration_min = test_duration_min = float("inf")
+        for r in results:
+            counts = r.get('results', {})
+            totals["succeeded"] += bool(r.get('success'))
+            totals["total"] += counts.get('total', 0)
+            totals["passed"] += counts.get('passed', 0)
+            totals["failed"] += counts.get('failed', 0)
+            totals["skipped"] += counts.get('skipped', 0)
+            totals["errors"] += counts.get('errors', 0)
+
+            duration = r.get('duration', 0.0)
+            totals["duration_sum"] += duration
+            totals["duration_max"] = max(totals["duration_max"], duration)
+            duration_min = min(duration_min, duration)
+
+            test_duration = counts.get('duration', 0.0)
+            totals["test_duration_sum"] += test_duration
+            totals["test_duration_max"] = max(totals["test_duration_max"], test_duration)
+            test_duration_min = min(test_duration_min, test_duration)
+
+        totals["duration_min"] = duration_min
+        totals["test_duration_min"] = test_duration_min
+        totals["duration_avg"] = totals["duration_sum"] / len(results)
+        totals["test_duration_avg"] = totals["test_duration_sum"] / len(results)
+        totals["pass_rate"] = (
+            totals["passed"] / totals["total"] * 100 if totals["total"] > 0 else 0
+        )
+        return totals
+
+    def build_report_bundle(self, results: list[dict[str, Any]]) -> ReportData:
+        """汇总测试结果，生成各格式报告共用的数据"""
+        categories = {}
+        for r in results:
+            counts = r['results']
+            total = counts['total']
+            categories[r['category']] = {
+                "config": asdict(self.test_categories[r['category']]),
+                "results": counts,
+                "success": r['success'],
+                "duration": r['duration'],
+                "total": total,
+                "passed": counts['passed'],
+                "failed": counts['failed'],
+                "errors": counts['errors'],
+                "skipped": counts['skipped'],
+                "pass_rate": (counts['passed'] / total) * 100 if total > 0 else 0,
+            }
+
+        return ReportData(
+            timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+            report_id=str(time.time_ns()),
+            results=results,
+            totals=self._aggregate(results),
+            categories=categories,
+        )
+
+    def generate_html_report(self, data: ReportData) -> str:
+        """生成HTML测试报告"""
+        totals = data.totals
+
+        # 各类别卡片先收集到列表，最后一次性拼接
+        category_cards = []
+        for summary in data.categories.values():
+            category_cards.append(_CATEGORY_CARD.substitute(
+                name=summary['config']['name'],
+                status_class='status-success' if summary['success'] else 'status-failed',
+                status_text='通过' if summary['success'] else '失败',
+                passed=summary['passed'],
+                total=summary['total'],
+                pass_rate=f"{summary['pass_rate']:.1f}",
+                duration=f"{summary['duration']:.1f}",
+                details=self._generate_test_details_html(summary['results']),
+            ))
+
+        html = _HTML_SHELL.substitute(
+            timestamp=data.timestamp,
+            total=totals['total'],
+            passed=totals['passed'],
+            failed=totals['failed'],
+            skipped=totals['skipped'],
+            errors=totals['errors'],
+            category_cards=''.join(category_cards),
+            duration_avg=f"{totals['duration_avg']:.2f}",
+            duration_max=f"{totals['duration_max']:.2f}",
+            pass_rate=f"{totals['pass_rate']:.1f}",
+            progress=totals['succeeded'] / max(totals['categories'], 1) * 100,
+        )
 
         # 保存HTML报告
-        report_filename = f"backend_test_report_{int(time.time())}.html"
-        report_path = self.reports_dir / report_filename
+        report_filename = f"backend_test_report_{data.report_id}.html"
+        report_path = _ensure_dir(self.reports_dir) / report_filename
 
         with open(report_path, 'w', encoding='utf-8') as f:
             f.write(html)
 
-        print(f"📄 HTML报告已保存: {report_path}")
         return report_path
 
-    def _generate_test_details_html(self, test_results: Dict[str, Any]) -> str:
+    def _generate_test_details_html(self, test_results: dict[str, Any]) -> str:
         """生成测试详情HTML"""
         html_parts = []
 
@@ -592,84 +1006,77 @@ def _generate_test_details_html(self, test_results: Dict[str, Any]) -> str:
 
         return ''.join(html_parts)
 
-    def generate_json_report(self, results: List[Dict[str, Any]]) -> str:
+    def generate_json_report(self, data: ReportData) -> str:
         """生成JSON测试报告"""
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        totals = data.totals
 
         report = {
-            "timestamp": timestamp,
+            "timestamp": data.timestamp,
             "summary": {
-                "total_tests": sum(r.get('results', {}).get('total', 0) for r in results),
-                "passed_tests": sum(r.get('results', {}).get('passed', 0) for r in results),
-                "failed_tests": sum(r.get('results', {}).get('failed', 0) for r in results),
-                "skipped_tests": sum(r.get('results', {}).get('skipped', 0) for r in results),
-                "total_duration": sum(r.get('duration', 0.0) for r in results),
-                "average_duration": sum(r.get('duration', 0.0) for r in results) / len(results),
-                "max_duration": max(r.get('duration', 0.0) for r in results),
-                "min_duration": min(r.get('duration', 0.0) for r in results),
+                "total_tests": totals["total"],
+                "passed_tests": totals["passed"],
+                "failed_tests": totals["failed"],
+                "skipped_tests": totals["skipped"],
+                "total_duration": totals["duration_sum"],
+                "average_duration": totals["duration_avg"],
+                "max_duration": totals["duration_max"],
+                "min_duration": totals["duration_min"],
             },
-            "pass_rate": sum(r.get('results', {}).get('passed', 0) for r in results) / sum(r.get('results', {}).get('total', 0) for r in results) * 100 if sum(r.get('results', {}).get('total', 0) for r in results) > 0 else 0,
-            "categories": {
-                category: {
-                    "config": self.test_categories[category],
-                    "results": r['results'],
-                    "success": r['success'],
-                    "duration": r['duration'],
-                    "total": r['results']['total'],
-                    "passed": r['results']['passed'],
-                    "failed": r['results']['failed'],
-                    "errors": r['results']['errors'],
-                    "skipped": r['results']['skipped'],
-                    "pass_rate": (r['results']['passed'] / r['results']['total']) * 100 if r['results']['total'] > 0 else 0,
-                }
-                for category, r in zip(self.test_categories.keys(), results)
+            "pass_rate": totals["pass_rate"],
+            "categories": data.categories,
+            "performance_metrics": {
+                "total_tests_run": totals["total"],
+                "average_response_time": totals["test_duration_avg"],
+                "max_response_time": totals["test_duration_max"],
+                "min_response_time": totals["test_duration_min"],
+                "total_coverage": totals["total"],
             },
-        "performance_metrics": {
-                "total_tests_run": sum(r.get('results', {}).get('total', 0) for r in results),
-                "average_response_time": sum(r.get('results', {}).get('duration', 0.0) for r in results) / len(results),
-                "max_response_time": max(r.get('results', {}).get('duration', 0.0) for r in results),
-                "min_response_time": min(r.get('results', {}).get('duration', 0.0) for r in results),
-                "total_coverage": sum(r.get('results', {}).get('total', 0) for r in results),
         }
 
         # 保存JSON报告
-        report_filename = f"backend_test_report_{int(time.time())}.json"
-        report_path = self.reports_dir / report_filename
+        report_filename = f"backend_test_report_{data.report_id}.json"
+        report_path = _ensure_dir(self.reports_dir) / report_filename
 
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        _dump_json(report, report_path)
 
-        print(f"📄 JSON报告已保存: {report_path}")
         return report_path
 
-    def print_summary(self, results: List[Dict[str, Any]]):
-        """打印测试摘要"""
-        print(f"\n{'=' * 60}")
-        print("📊 后端缓存功能测试摘要")
-        print(f"{'=' * 60}")
+    def print_summary(self, results: list[dict[str, Any]]):
+        """打印测试摘要
+
+        各行先收集到列表中，最后一次性写出，避免逐行 print。
+        """
+        lines: list[str] = []
+        out = lines.append
+
+        out(f"\n{'=' * 60}")
+        out("📊 后端缓存功能测试摘要")
+        out(f"{'=' * 60}")
 
-        total_tests = sum(r.get('results', {}).get('total', 0) for r in results)
-        passed_tests = sum(r.get('results', {}).get('passed', 0) for r in results)
-        failed_tests = sum(r.get('results', {}).get('failed', 0) for r in results)
-        skipped_tests = sum(r.get('results', {}).get('skipped', 0) for r in results)
-        total_duration = sum(r.get('duration', 0.0) for r in results)
+        totals = self._aggregate(results)
+        total_tests = totals["total"]
+        passed_tests = totals["passed"]
+        failed_tests = totals["failed"]
+        skipped_tests = totals["skipped"]
+        total_duration = totals["duration_sum"]
 
         if total_tests == 0:
-            print("⚠️ 没有运行任何测试")
+            out("⚠️ 没有运行任何测试")
+            print("\n".join(lines))
             return
 
-        success_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
+        success_rate = totals["pass_rate"]
 
-        print(f"📈 测试执行统计:")
-        print(f"   • 总测试数: {total_tests}")
-        print(f"   • ✅ 通过: {passed_tests}")
-        print(f"   • ❌ 失败: {failed_tests}")
-        print(f"   • ⏱️ 跳过: {skipped_tests}")
-        print(f"   • ⏱️ 耗时: {total_duration:.1f}s")
-        print(f"   • 📊 平均耗时: {total_duration/len(results):.2f}s")
-        print(f"   • 📈 通过率: {success_rate:.1f}%")
+        out(f"📈 测试执行统计:")
+        out(f"   • 总测试数: {total_tests}")
+        out(f"   • ✅ 通过: {passed_tests}")
+        out(f"   • ❌ 失败: {failed_tests}")
+        out(f"   • ⏱️ 跳过: {skipped_tests}")
+        out(f"   • ⏱️ 耗时: {total_duration:.1f}s")
+        out(f"   • 📊 平均耗时: {totals['duration_avg']:.2f}s")
+        out(f"   • 📈 通过率: {success_rate:.1f}%")
 
-        print(f"\n📊 各类别详细结果:")
+        out(f"\n📊 各类别详细结果:")
         for result in results:
             category = result['category']
             config = self.test_categories[category]
@@ -680,39 +1087,40 @@ def print_summary(self, results: List[Dict[str, Any]]):
             failed = result['results']['failed']
 
             status = "✅ 成功" if success else "❌ 失败"
-            print(f"   {status} {config['name']}:")
-            print(f"      ⏱️ 耗时: {duration:.1f}s")
-            print(f"      📊 通过率: {(passed/total*100):.1f}% ({passed}/{total})")
+            out(f"   {status} {config.name}:")
+            out(f"      ⏱️ 耗时: {duration:.1f}s")
+            out(f"      📊 通过率: {(passed/total*100) if total else 0:.1f}% ({passed}/{total})")
 
             if not success and result['results']['failed_tests']:
-                print(f"      ❌ 失败数量: {len(result['results']['failed_tests'])}")
+                out(f"      ❌ 失败数量: {len(result['results']['failed_tests'])}")
                 if len(result['results']['failed_tests']) <= 5:
                     for failed_test in result['results']['failed_tests'][:5]:
-                        print(f"        • {failed_test}")
+                        out(f"        • {failed_test}")
                 else:
-                    print(f"        • 失败数量: {len(result['results']['failed_tests'])} (显示前5个)")
-                    print(f"        • ... 还有 {len(result['results']['failed_tests']) - 5} 个失败测试")
+                    out(f"        • 失败数量: {len(result['results']['failed_tests'])} (显示前5个)")
+                    out(f"        • ... 还有 {len(result['results']['failed_tests']) - 5} 个失败测试")
 
         # 性能指标分析
-        if duration > 0:
+        if duration > 0 and total > 0:
             avg_per_test = duration / total
             if avg_per_test > 10.0:
-                print(f"⚠️  ⚠️ 平均测试时间较长: {avg_per_test:.1f}s")
+                out(f"⚠️  ⚠️ 平均测试时间较长: {avg_per_test:.1f}s")
             elif avg_per_test > 5.0:
-                print(f"⚠️  ⚠️ 平均测试时间较长: {avg_per_test:.1f}s")
+                out(f"⚠️  ⚠️ 平均测试时间较长: {avg_per_test:.1f}s")
             elif avg_per_test > 3.0:
-                print(f"⚠️  ⚠️ 平均测试时间较长: {avg_per_test:.1f}s")
+                out(f"⚠️  ⚠️ 平均测试时间较长: {avg_per_test:.1f}s")
             elif avg_per_test > 1.0:
-                print(f"⚠️  ⚠️ 平均测试时间较长: {avg_per_test:.1f}s")
+                out(f"⚠️  ⚠️ 平均测试时间较长: {avg_per_test:.1f}s")
 
         if success_rate < 80:
-            print(f"⚠️  ⚠️ 通过率较低: {success_rate:.1f}%")
+            out(f"⚠️  ⚠️ 通过率较低: {success_rate:.1f}%")
         elif success_rate < 90:
-            print(f"⚠️  ⚠️ 建议优化测试用例")
+            out(f"⚠️  ⚠️ 建议优化测试用例")
         elif success_rate < 100:
-            print(f"ℹ️️  通过率良好，仍有改进空间")
+            out(f"ℹ️️  通过率良好，仍有改进空间")
 
-        print(f"\n{'=' * 60}")
+        out(f"\n{'=' * 60}")
+        print("\n".join(lines))
 
         return {
             "total_tests": total_tests,
@@ -723,71 +1131,61 @@ def print_summary(self, results: List[Dict[str, Any]]):
         }
 
     def check_environment(self) -> bool:
-        """检查测试环境"""
-        print("🔍 检查测试环境...")
+        """检查测试环境(结果会被缓存，重复调用不再检查)"""
+        return self.environment_ready
 
-        # 检查Python环境
-        try:
-            import sys
-            python_version = sys.version
-            print(f"   ✅ Python版本: {python_version}")
-        except Exception as e:
-            print(f"   ❌ Python版本检查失败: {e}")
-            return False
+    @functools.cached_property
+    def environment_ready(self) -> bool:
+        """测试环境是否就绪"""
+        print("🔍 检查测试环境...")
+        print(f"   ✅ Python版本: {sys.version}")
 
-        # 检查必要的包
-        required_packages = ['pytest', 'aiohttp', 'asyncio']
-        missing_packages = []
+        # 检查必要的包(只查找模块，不执行导入)
+        missing_packages = [
+            package for package in _REQUIRED_PACKAGES
+            if importlib.util.find_spec(package) is None
+        ]
 
-        for package in required_packages:
-            try:
-                __import__(package)
+        for package in _REQUIRED_PACKAGES:
+            if package not in missing_packages:
                 print(f"   ✅ {package} 可用")
-            except ImportError:
-                missing_packages.append(package)
 
         if missing_packages:
             print(f"   ❌ 缺少必要的包: {', '.join(missing_packages)}")
             print(f"   💡 请安装: pip install {' '.join(missing_packages)}")
             return False
 
-        # 检查后端服务状态
-        try:
-            import asyncio
-            import aiohttp
-        except ImportError:
-            print(f"   ⚠️ aiohttp包不可用，跳过网络相关测试")
-            missing_packages.extend(['aiohttp'])
-
-            backend_url = "http://localhost:8000"
-            timeout = aiohttp.ClientTimeout(total=5)
-
-            async def check_backend():
-                try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(f"{backend_url}/health", timeout=timeout) as response:
-                            if response.status == 200:
-                                return True
-                            return False
-                except Exception as e:
-                    print(f"   ⚠️ 后端服务检查失败: {e}")
-                    return False
+        # 检查后端服务状态(仅提示，不影响测试执行)
+        if self._backend_reachable():
+            print(f"   ✅ 后端服务可用: {_BACKEND_HEALTH_URL}")
+        else:
+            print("   💡 确保后端服务在测试前启动")
 
-            return asyncio.run(check_backend())
+        return True
 
-        except Exception as e:
-            print(f"   ⚠️ 网络检查异常: {e}")
-            print(f"   💡 确保后端服务在测试前启动")
-            return True
+    @staticmethod
+    def _backend_reachable() -> bool:
+        """探测后端服务健康检查接口"""
+        import aiohttp
 
-        return True
+        async def check_backend():
+            timeout = aiohttp.ClientTimeout(total=_BACKEND_PROBE_TIMEOUT)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(_BACKEND_HEALTH_URL) as response:
+                    return response.status == 200
+
+        try:
+            return asyncio.run(check_backend())
+        except (aiohttp.ClientError, TimeoutError) as e:
+            print(f"   ⚠️ 后端服务检查失败: {e}")
+            return False
 
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="运行后端缓存功能测试")
     parser.add_argument(
         "--category",
-        choices=list(TestRunner(project_root=".").test_categories.keys()),
+        choices=[category.key for category in TEST_CATEGORIES],
         help="选择测试类别 (unit, integration, performance, e2e, all)",
         default="all"
     )
@@ -803,6 +1201,18 @@ def main():
         help="测试超时时间（秒）",
         default=None
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="并行进程数（默认 CPU 核数减 2，1 表示串行；未安装 pytest-xdist 时按测试文件分片）",
+        default=None
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="增量运行: 只重跑上次失败的测试（CI 中应保持关闭以完整运行）",
+        default=False
+    )
     parser.add_argument(
         "--no-env-check",
         action="store_true",
@@ -812,11 +1222,13 @@ def main():
 
     args = parser.parse_args()
 
-    # 获取项目根目录
-    project_root = Path(__file__).parent.parent
+    # 获取项目根目录(scripts 位于 backend 目录下)
+    project_root = Path(__file__).resolve().parent.parent.parent
 
     # 创建测试运行器
-    runner = BackendTestRunner(project_root)
+    runner = BackendTestRunner(
+        project_root, workers=args.workers, incremental=args.incremental
+    )
 
     # 环境检查
     if not args.no_env_check:
@@ -828,47 +1240,48 @@ def main():
 
     # 执行测试
     if args.category == "all":
-        # 运行所有测试类别
-        results = []
-        for category in runner.test_categories.keys():
-            result = runner.run_test_category(category)
-            results.append(result)
+        # 并发运行所有测试类别
+        results = asyncio.run(runner.run_all_async())
     else:
         # 运行指定类别
-        result = runner.run_test_category(args.category)
-        results.append(result)
+        results = [runner.run_test_category(args.category)]
 
-    # 生成报告
-    success_rate = sum(r.get('success_rate', 0) for r in results) / len(results) if len(results) > 0 else 0
+    # 汇总一次，供各格式报告共用
+    report_data = runner.build_report_bundle(results)
+    success_rate = report_data.totals['pass_rate']
     all_passed = all(r['success'] for r in results)
 
-    print(f"\n🎉 测试执行完成!")
-
-    if success_rate >= 80:
-        print("🎉 后端缓存功能测试通过！")
-        print(f"📈 总体通过率: {success_rate:.1f}%")
-    elif success_rate >= 60:
-        print("⚠️ 后端缓存功能测试基本通过")
-        print(f"📈 总体通过率: {success_rate:.1f}%")
-    else:
-        print("❌ 后端缓存功能测试未通过")
-        print(f"💡 请检查失败测试并修复问题")
-
-    # 生成报告
+    # 报告在后台线程中生成写入，同时先输出测试摘要
     output_format = args.output_format
-    timestamp = int(time.time())
-
-    if output_format in ["html", "both"]:
-        html_path = runner.generate_html_report(results)
-        print(f"📄 HTML报告: {html_path}")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        html_future = json_future = None
+        if output_format in ["html", "both"]:
+            html_future = executor.submit(runner.generate_html_report, report_data)
+        if output_format in ["json", "both"]:
+            json_future = executor.submit(runner.generate_json_report, report_data)
+
+        runner.print_summary(results)
+        print(f"\n🎉 测试执行完成!")
+
+        if success_rate >= 80:
+            print("🎉 后端缓存功能测试通过！")
+            print(f"📈 总体通过率: {success_rate:.1f}%")
+        elif success_rate >= 60:
+            print("⚠️ 后端缓存功能测试基本通过")
+            print(f"📈 总体通过率: {success_rate:.1f}%")
+        else:
+            print("❌ 后端缓存功能测试未通过")
+            print(f"💡 请检查失败测试并修复问题")
 
-    if output_format in ["json", "both"]:
-        json_path = runner.generate_json_report(results)
-        print(f"📄 JSON报告: {json_path}")
+        # 生成报告
+        if html_future is not None:
+            print(f"📄 HTML报告: {html_future.result()}")
+        if json_future is not None:
+            print(f"📄 JSON报告: {json_future.result()}")
 
     # 退出码
     sys.exit(0 if all_passed else 1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
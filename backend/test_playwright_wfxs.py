@@ -4,101 +4,171 @@
 """
 
 import asyncio
+import os
+import shutil
+import tempfile
+
+import aiohttp
+from lxml import html as lxml_html
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
 
+TEST_URLS = [
+    "https://m.wfxs.tw/xiaoshuo/7840069/82012408/",
+]
 
-async def test_wfxs_access():
-    """测试访问 wfxs.tw 站点"""
+BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+]
 
-    test_url = "https://m.wfxs.tw/xiaoshuo/7840069/82012408/"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
-    print(f"正在测试访问: {test_url}")
-    print("=" * 60)
+# 持久化用户目录,浏览器的 HTTP 磁盘缓存在多次访问之间复用
+# 设置 WFXS_PROFILE_DIR 可在多次运行之间保留缓存(同一目录不能被并发运行共用);
+# 未设置时每次运行使用独立的临时目录,结束后删除
+PROFILE_DIR = os.environ.get("WFXS_PROFILE_DIR")
 
-    try:
-        async with async_playwright() as p:
+# 浏览器只启动一次,所有测试 URL 共用同一个上下文
+_playwright = None
+_context = None
+_context_lock = asyncio.Lock()
+_temp_profile_dir = None
+
+
+async def _get_context():
+    """获取共享的浏览器上下文(首次调用时启动浏览器)"""
+    global _playwright, _context, _temp_profile_dir
+    async with _context_lock:
+        if _context is None:
+            _playwright = await async_playwright().start()
             print("✓ 启动 Playwright")
 
-            # 启动浏览器
-            browser = await p.chromium.launch(
+            profile_dir = PROFILE_DIR
+            if profile_dir is None:
+                _temp_profile_dir = tempfile.mkdtemp(prefix="pw-wfxs-profile-")
+                profile_dir = _temp_profile_dir
+            _context = await _playwright.chromium.launch_persistent_context(
+                profile_dir,
                 headless=True,
-                args=[
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-blink-features=AutomationControlled",
-                ]
-            )
-            print("✓ 浏览器启动成功")
-
-            # 创建上下文
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                args=BROWSER_ARGS,
+                user_agent=USER_AGENT,
                 viewport={"width": 1920, "height": 1080},
                 locale="zh-TW",
             )
             print("✓ 浏览器上下文创建成功")
+    return _context
+
+
+async def _close_context():
+    """关闭共享的浏览器上下文"""
+    global _playwright, _context, _temp_profile_dir
+    if _context is not None:
+        await _context.close()
+        _context = None
+    if _playwright is not None:
+        await _playwright.stop()
+        _playwright = None
+    if _temp_profile_dir is not None:
+        shutil.rmtree(_temp_profile_dir, ignore_errors=True)
+        _temp_profile_dir = None
+
+
+async def fetch_static(url):
+    """先用普通 HTTP 请求获取页面,页面已包含 <article> 时无需启动浏览器"""
+    headers = {"User-Agent": USER_AGENT, "Accept-Language": "zh-TW"}
+    try:
+        async with aiohttp.ClientSession(headers=headers) as session:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                if resp.status != 200:
+                    print(f"⚠ 直接请求 HTTP 状态码: {resp.status}")
+                    return None
+                html = await resp.text()
+    except (aiohttp.ClientError, TimeoutError) as e:
+        print(f"⚠ 直接请求失败: {e}")
+        return None
 
-            # 创建页面
-            page = await context.new_page()
-            page.set_default_timeout(15000)
-            print("✓ 页面创建成功")
-
-            # 访问目标URL
-            print(f"\n正在访问: {test_url}")
-            response = await page.goto(test_url, timeout=15000)
-
-            if response.ok:
-                print(f"✓ HTTP 状态码: {response.status}")
-                print(f"✓ 页面加载成功")
-
-                # 获取页面内容
-                content = await page.content()
-                print(f"✓ 内容长度: {len(content)} 字符")
-
-                # 使用 BeautifulSoup 解析
-                soup = BeautifulSoup(content, 'lxml')
-
-                # 提取标题
-                title_elem = soup.select_one('article h1') or soup.select_one('h1')
-                title = title_elem.get_text(strip=True) if title_elem else '未找到标题'
-                print(f"\n章节标题: {title}")
-
-                # 提取正文内容
-                article = soup.select_one('article')
-                if article:
-                    paragraphs = article.select('p')
-                    content_parts = []
-
-                    for i, p in enumerate(paragraphs[:10]):  # 只显示前10段
-                        text = p.get_text(strip=True)
-                        if text:
-                            content_parts.append(text)
-                            if i == 0:
-                                print(f"\n正文预览 (前10段):")
-                                print(f"  {text}")
-
-                    print(f"\n✓ 成功提取 {len(paragraphs)} 个段落")
-                    print(f"✓ 总内容长度: {sum(len(p.get_text(strip=True)) for p in paragraphs)} 字符")
-
-                    # 检查是否有分页
-                    next_page_link = soup.find('a', string=lambda text: text and '下一頁' in text)
-                    if next_page_link:
-                        print(f"\n⚠ 发现分页链接: {next_page_link.get('href', 'N/A')}")
-                    else:
-                        print(f"\n✓ 无分页")
-
-                else:
-                    print("❌ 未找到 article 标签")
-
-                await browser.close()
-                print("\n" + "=" * 60)
-                print("✓ 测试成功！Playwright 可以正常访问 wfxs.tw")
+    # 没有 <article> 说明正文由前端脚本渲染,需要浏览器
+    return html if "<article" in html else None
 
-            else:
-                print(f"❌ HTTP 错误: {response.status}")
-                await browser.close()
+
+async def fetch_with_browser(url):
+    """使用共享的浏览器上下文渲染页面"""
+    context = await _get_context()
+
+    # 创建页面
+    page = await context.new_page()
+    page.set_default_timeout(15000)
+    print("✓ 页面创建成功")
+
+    try:
+        # 访问目标URL
+        print(f"\n正在访问: {url}")
+        response = await page.goto(url, timeout=15000)
+
+        if not response.ok:
+            print(f"❌ HTTP 错误: {response.status}")
+            return None
+
+        print(f"✓ HTTP 状态码: {response.status}")
+        print(f"✓ 页面加载成功")
+        return await page.content()
+    finally:
+        await page.close()
+
+
+async def test_wfxs_access(test_url=TEST_URLS[0]):
+    """测试访问 wfxs.tw 站点"""
+
+    print(f"正在测试访问: {test_url}")
+    print("=" * 60)
+
+    try:
+        # 获取页面内容:优先直接请求,拿不到正文再用 Playwright
+        content = await fetch_static(test_url)
+        if content is not None:
+            print("✓ 直接请求已获取正文,跳过浏览器")
+        else:
+            content = await fetch_with_browser(test_url)
+            if content is None:
                 return False
+        print(f"✓ 内容长度: {len(content)} 字符")
+
+        # 使用 lxml 解析一次,后续都用 XPath 在同一棵树上查询
+        root = lxml_html.fromstring(content)
+
+        # 提取标题
+        title_elems = root.xpath('//article//h1') or root.xpath('//h1')
+        title = title_elems[0].text_content().strip() if title_elems else '未找到标题'
+        print(f"\n章节标题: {title}")
+
+        # 提取正文内容
+        articles = root.xpath('//article')
+        if articles:
+            paragraphs = articles[0].xpath('.//p')
+
+            # 每段文本只提取一次,预览和总长度都基于同一份结果
+            texts = [t for t in (p.text_content().strip() for p in paragraphs) if t]
+            if texts:
+                print(f"\n正文预览 (前10段):")
+                for text in texts[:10]:
+                    print(f"  {text}")
+
+            print(f"\n✓ 成功提取 {len(paragraphs)} 个段落")
+            print(f"✓ 总内容长度: {sum(map(len, texts))} 字符")
+
+            # 检查是否有分页
+            next_page_links = root.xpath('//a[contains(., "下一頁")]')
+            if next_page_links:
+                print(f"\n⚠ 发现分页链接: {next_page_links[0].get('href', 'N/A')}")
+            else:
+                print(f"\n✓ 无分页")
+
+        else:
+            print("❌ 未找到 article 标签")
+
+        print("\n" + "=" * 60)
+        print("✓ 测试成功！可以正常访问 wfxs.tw")
 
     except Exception as e:
         print(f"\n❌ 测试失败: {e}")
@@ -109,5 +179,20 @@ async def test_wfxs_access():
     return True
 
 
+async def main():
+    """依次访问所有测试 URL,结束后关闭浏览器"""
+    try:
+        results = [await test_wfxs_access(url) for url in TEST_URLS]
+    finally:
+        await _close_context()
+    return all(results)
+
+
 if __name__ == "__main__":
-    asyncio.run(test_wfxs_access())
+    # 有 uvloop 时使用它的事件循环(uvicorn[standard] 已经依赖 uvloop)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -6,34 +6,59 @@
 """
 
 import asyncio
-import json
 import time
 
 import aiohttp
+import orjson
 import pytest
+import pytest_asyncio
 
 from tests.factories import APITestDataFactory
 
+# 有效认证头部，整个测试模块共用
+_VALID_HEADERS = {"X-API-TOKEN": APITestDataFactory.create_valid_auth_token()}
 
+
+@pytest.mark.asyncio(loop_scope="class")
 class TestCacheE2E:
     """缓存功能端到端测试"""
 
-    @pytest.fixture
+    @pytest_asyncio.fixture(scope="class", loop_scope="class")
     async def api_client(self):
-        """创建API客户端"""
-        return aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
-
-    @pytest.fixture
+        """创建API客户端(整个测试类共用一个会话和连接池)"""
+        connector = aiohttp.TCPConnector(
+            limit=100, limit_per_host=32, keepalive_timeout=60
+        )
+        # 请求体和响应统一用 orjson 编解码
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30),
+            json_serialize=lambda obj: orjson.dumps(obj).decode(),
+        ) as session:
+            yield session
+
+    @pytest.fixture(scope="class")
     def valid_headers(self):
         """有效认证头部"""
-        return {"X-API-TOKEN": APITestDataFactory.create_valid_auth_token()}
+        return _VALID_HEADERS
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def base_url(self):
         """基础URL"""
         return "http://localhost:8000"
 
-    @pytest.mark.asyncio
+    async def _wait_for_terminal(self, api_client, base_url, task_id):
+        """订阅任务的WebSocket进度,返回第一条completed/failed状态消息"""
+        ws_url = f"{base_url.replace('http', 'ws', 1)}/ws/cache/{task_id}"
+        async with api_client.ws_connect(ws_url) as ws:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                data = orjson.loads(msg.data)
+                if data["status"] in ("completed", "failed"):
+                    return data
+        pytest.fail(f"任务 {task_id} 结束前WebSocket连接已关闭")
+
     async def test_complete_caching_workflow_e2e(
         self, api_client, valid_headers, base_url
     ):
@@ -48,28 +73,16 @@ async def test_complete_caching_workflow_e2e(
             f"{base_url}/api/cache/create", json=create_data, headers=valid_headers
         ) as response:
             assert response.status == 200
-            create_result = await response.json()
+            create_result = await response.json(loads=orjson.loads)
             assert "task_id" in create_result
             task_id = create_result["task_id"]
             assert create_result["status"] == "pending"
 
-        # Step 2: 等待任务状态变化（轮询）
-        max_polls = 30  # 最多等待30次，每次1秒
-        current_status = "pending"
-
-        for _poll_count in range(max_polls):
-            async with api_client.get(
-                f"{base_url}/api/cache/status/{task_id}", headers=valid_headers
-            ) as status_response:
-                assert status_response.status == 200
-                status_result = await status_response.json()
-                current_status = status_result["status"]
-
-                if current_status in ["completed", "failed"]:
-                    break
-
-            if current_status == "pending":
-                await asyncio.sleep(1)  # 等待状态变化
+        # Step 2: 通过WebSocket等待任务结束（最多30秒）
+        final_update = await asyncio.wait_for(
+            self._wait_for_terminal(api_client, base_url, task_id), timeout=30
+        )
+        current_status = final_update["status"]
 
         # Step 3: 验证任务最终状态
         if current_status == "completed":
@@ -79,7 +92,7 @@ async def test_complete_caching_workflow_e2e(
                 headers=valid_headers,
             ) as download_response:
                 assert download_response.status == 200
-                download_result = await download_response.json()
+                download_result = await download_response.json(loads=orjson.loads)
 
                 # 验证下载结果
                 assert "novel" in download_result
@@ -94,7 +107,6 @@ async def test_complete_caching_workflow_e2e(
         else:
             pytest.fail(f"任务最终状态为 {current_status}，不是 'completed'")
 
-    @pytest.mark.asyncio
     async def test_concurrent_caching_tasks(self, api_client, valid_headers, base_url):
         """测试并发缓存任务"""
         # Given - 多个小说URL
@@ -111,7 +123,7 @@ async def create_task(novel_url):
                 f"{base_url}/api/cache/create", json=create_data, headers=valid_headers
             ) as response:
                 assert response.status == 200
-                result = await response.json()
+                result = await response.json(loads=orjson.loads)
                 return result["task_id"]
 
         # 并发执行创建任务
@@ -126,7 +138,6 @@ async def create_task(novel_url):
         # 验证任务ID是唯一的
         assert len(set(task_ids)) == len(task_ids)
 
-    @pytest.mark.asyncio
     async def test_cache_task_lifecycle_e2e(self, api_client, valid_headers, base_url):
         """测试缓存任务的完整生命周期"""
         # Given
@@ -139,12 +150,13 @@ async def test_cache_task_lifecycle_e2e(self, api_client, valid_headers, base_ur
             f"{base_url}/api/cache/create", json=create_data, headers=valid_headers
         ) as response:
             assert response.status == 200
-            create_result = await response.json()
+            create_result = await response.json(loads=orjson.loads)
             task_id = create_result["task_id"]
 
-        # Step 2: 监控状态变化
+        # Step 2: 监控状态变化（先立即查询一次，之后间隔从0.05秒倍增到0.5秒）
         status_history = []
         max_duration = 10  # 最多监控10秒
+        delay = 0.05
 
         start_time = time.time()
         while time.time() - start_time < max_duration:
@@ -152,20 +164,20 @@ async def test_cache_task_lifecycle_e2e(self, api_client, valid_headers, base_ur
                 f"{base_url}/api/cache/status/{task_id}", headers=valid_headers
             ) as status_response:
                 assert status_response.status == 200
-                status_result = await status_response.json()
+                status_result = await status_response.json(loads=orjson.loads)
                 status_history.append(status_result["status"])
 
                 if status_result["status"] == "completed":
                     break
 
-            await asyncio.sleep(0.5)  # 每0.5秒检查一次
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
 
         # Then - 验证状态变化符合预期
         assert len(status_history) >= 2
         assert status_history[0] == "pending"  # 应该从pending开始
         assert status_history[-1] == "completed"  # 应该以completed结束
 
-    @pytest.mark.asyncio
     async def test_cache_task_cancellation_e2e(
         self, api_client, valid_headers, base_url
     ):
@@ -180,7 +192,7 @@ async def test_cache_task_cancellation_e2e(
             f"{base_url}/api/cache/create", json=create_data, headers=valid_headers
         ) as response:
             assert response.status == 200
-            create_result = await response.json()
+            create_result = await response.json(loads=orjson.loads)
             task_id = create_result["task_id"]
 
         # Step 2: 立即取消任务
@@ -191,7 +203,7 @@ async def test_cache_task_cancellation_e2e(
             assert cancel_response.status in [200, 404]
 
             if cancel_response.status == 200:
-                cancel_result = await cancel_response.json()
+                cancel_result = await cancel_response.json(loads=orjson.loads)
                 assert cancel_result["task_id"] == task_id
 
         # Step 3: 验证任务状态
@@ -199,7 +211,7 @@ async def test_cache_task_cancellation_e2e(
             f"{base_url}/api/cache/status/{task_id}", headers=valid_headers
         ) as status_response:
             assert status_response.status == 200
-            status_result = await status_response.json()
+            status_result = await status_response.json(loads=orjson.loads)
 
             # 任务状态应该是 pending, running, cancelled, 或 completed
             assert status_result["status"] in [
@@ -209,62 +221,63 @@ async def test_cache_task_cancellation_e2e(
                 "completed",
             ]
 
-    @pytest.mark.asyncio
     async def test_cache_task_pagination_e2e(self, api_client, valid_headers, base_url):
         """测试缓存任务分页功能"""
-        # Given - 创建多个任务来测试分页
-        task_ids = []
-        for i in range(15):  # 创建15个任务
-            create_data = {"novel_url": f"https://example.com/novel/pagination-{i}"}
 
+        # Given - 并发创建15个任务来测试分页
+        create_url = f"{base_url}/api/cache/create"
+        tasks_url = f"{base_url}/api/cache/tasks"
+        payloads = [
+            {"novel_url": f"https://example.com/novel/pagination-{i}"}
+            for i in range(15)
+        ]
+
+        async def create(create_data):
             async with api_client.post(
-                f"{base_url}/api/cache/create", json=create_data, headers=valid_headers
+                create_url, json=create_data, headers=valid_headers
             ) as response:
                 assert response.status == 200
-                result = await response.json()
-                task_ids.append(result["task_id"])
+                result = await response.json(loads=orjson.loads)
+                return result["task_id"]
 
-        # 等待任务创建完成
-        await asyncio.sleep(1)
+        task_ids = await asyncio.gather(*(create(p) for p in payloads))
+        assert len(set(task_ids)) == 15
 
         # Step 1: 测试第一页（默认limit=20, offset=0）
-        async with api_client.get(
-            f"{base_url}/api/cache/tasks", headers=valid_headers
-        ) as response:
+        async with api_client.get(tasks_url, headers=valid_headers) as response:
             assert response.status == 200
-            result = await response.json()
+            result = await response.json(loads=orjson.loads)
             assert "tasks" in result
             assert "total" in result
             assert len(result["tasks"]) == 15  # 应该返回所有任务
 
         # Step 2: 测试分页（limit=5, offset=0）
         async with api_client.get(
-            f"{base_url}/api/cache/tasks?limit=5&offset=0", headers=valid_headers
+            f"{tasks_url}?limit=5&offset=0", headers=valid_headers
         ) as response:
             assert response.status == 200
-            result = await response.json()
+            result = await response.json(loads=orjson.loads)
             assert len(result["tasks"]) == 5
             assert result["total"] == 15
 
         # Step 3: 测试第二页（limit=5, offset=5）
         async with api_client.get(
-            f"{base_url}/api/cache/tasks?limit=5&offset=5", headers=valid_headers
+            f"{tasks_url}?limit=5&offset=5", headers=valid_headers
         ) as response:
             assert response.status == 200
-            result = await response.json()
+            result = await response.json(loads=orjson.loads)
             assert len(result["tasks"]) == 5
 
         # Step 4: 测试状态过滤
         async with api_client.get(
-            f"{base_url}/api/cache/tasks?status=pending&limit=10", headers=valid_headers
+            f"{tasks_url}?status=pending&limit=10", headers=valid_headers
         ) as response:
             assert response.status == 200
-            result = await response.json()
+            result = await response.json(loads=orjson.loads)
             # 所有任务状态可能是pending（因为刚创建）
             for task in result["tasks"]:
                 assert task["status"] in ["pending", "running"]
 
-    @pytest.mark.asyncio
     async def test_cache_download_formats_e2e(
         self, api_client, valid_headers, base_url
     ):
@@ -279,7 +292,7 @@ async def test_cache_download_formats_e2e(
             f"{base_url}/api/cache/create", json=create_data, headers=valid_headers
         ) as create_response:
             assert create_response.status == 200
-            create_result = await create_response.json()
+            create_result = await create_response.json(loads=orjson.loads)
             task_id = create_result["task_id"]
 
         # 模拟任务完成（在实际测试中，这可能需要手动完成或等待）
@@ -291,7 +304,7 @@ async def test_cache_download_formats_e2e(
         ) as json_response:
             # 这个可能返回404如果任务未完成，这是正常的
             if json_response.status == 200:
-                json_result = await json_response.json()
+                json_result = await json_response.json(loads=orjson.loads)
                 assert "novel" in json_result
                 assert "chapters" in json_result
                 assert isinstance(json_result["chapters"], list)
@@ -325,7 +338,6 @@ async def test_cache_download_formats_e2e(
         ) as invalid_response:
             assert invalid_response.status == 400
 
-    @pytest.mark.asyncio
     async def test_error_scenarios_e2e(self, api_client, valid_headers, base_url):
         """测试各种错误场景"""
         # Given
@@ -354,7 +366,7 @@ async def test_error_scenarios_e2e(self, api_client, valid_headers, base_url):
             "not-a-url",  # 非URL格式
         ]
 
-        for invalid_url in invalid_urls:
+        async def check_invalid_url(invalid_url):
             async with api_client.post(
                 f"{base_url}/api/cache/create",
                 json={"novel_url": invalid_url},
@@ -363,37 +375,45 @@ async def test_error_scenarios_e2e(self, api_client, valid_headers, base_url):
                 # 可能返回400或422，取决于验证逻辑
                 assert response.status in [400, 422]
 
-        # Test 4: 不存在的任务ID
+        # Test 4: 不存在的任务ID（查询和取消都应返回404）
         non_existent_ids = [0, -1, 999999]
 
-        for task_id in non_existent_ids:
-            async with api_client.get(
-                f"{base_url}/api/cache/status/{task_id}", headers=valid_headers
+        async def check_missing(method, path):
+            async with api_client.request(
+                method, f"{base_url}{path}", headers=valid_headers
             ) as response:
                 assert response.status == 404
 
-            async with api_client.post(
-                f"{base_url}/api/cache/cancel/{task_id}", headers=valid_headers
-            ) as cancel_response:
-                assert cancel_response.status == 404
+        # Test 3 和 Test 4 的请求互不依赖，并发执行
+        await asyncio.gather(
+            *(check_invalid_url(url) for url in invalid_urls),
+            *(check_missing("GET", f"/api/cache/status/{i}") for i in non_existent_ids),
+            *(
+                check_missing("POST", f"/api/cache/cancel/{i}")
+                for i in non_existent_ids
+            ),
+        )
 
         # Test 5: 无效的查询参数
-        async with api_client.get(
-            f"{base_url}/api/cache/tasks?limit=1000",  # 超出限制
-            headers=valid_headers,
-        ) as response:
-            # 应该被限制到100
-            assert response.status == 200
-            result = await response.json()
-            assert len(result["tasks"]) <= 100
+        async def check_limit_capped():
+            async with api_client.get(
+                f"{base_url}/api/cache/tasks?limit=1000",  # 超出限制
+                headers=valid_headers,
+            ) as response:
+                # 应该被限制到100
+                assert response.status == 200
+                result = await response.json(loads=orjson.loads)
+                assert len(result["tasks"]) <= 100
 
-        async with api_client.get(
-            f"{base_url}/api/cache/tasks?limit=-1",  # 负数limit
-            headers=valid_headers,
-        ) as response:
-            assert response.status == 422  # Validation error
+        async def check_negative_limit():
+            async with api_client.get(
+                f"{base_url}/api/cache/tasks?limit=-1",  # 负数limit
+                headers=valid_headers,
+            ) as response:
+                assert response.status == 422  # Validation error
+
+        await asyncio.gather(check_limit_capped(), check_negative_limit())
 
-    @pytest.mark.asyncio
     async def test_websocket_progress_updates(
         self, api_client, valid_headers, base_url
     ):
@@ -408,7 +428,7 @@ async def test_websocket_progress_updates(
             f"{base_url}/api/cache/create", json=create_data, headers=valid_headers
         ) as response:
             assert response.status == 200
-            create_result = await response.json()
+            create_result = await response.json(loads=orjson.loads)
             task_id = create_result["task_id"]
 
         # Step 2: 连接WebSocket
@@ -418,31 +438,29 @@ async def test_websocket_progress_updates(
 
         try:
             async with api_client.ws_connect(ws_url) as ws:
-                # 等待初始状态更新
-                async for msg in ws:
-                    if msg.type == aiohttp.WSMsgType.TEXT:
-                        data = json.loads(msg.data)
-                        progress_updates.append(data)
-
-                        # 验证消息格式
-                        assert "task_id" in data
-                        assert "status" in data
-                        assert "total_chapters" in data
-                        assert "cached_chapters" in data
-                        assert "progress" in data
-                        assert data["task_id"] == task_id
-
-                        # 如果任务完成或失败，断开连接
-                        if data["status"] in ["completed", "failed"]:
-                            break
-
-                        # 最多等待10个消息
-                        if len(progress_updates) >= 10:
-                            break
-                    elif (
-                        msg.type == aiohttp.WSMsgType.ERROR
-                        or msg.type == aiohttp.WSMsgType.CLOSED
-                    ):
+                # 最多接收10个消息，每个消息最多等待2秒
+                for _ in range(10):
+                    try:
+                        msg = await asyncio.wait_for(ws.receive(), timeout=2.0)
+                    except TimeoutError:
+                        break  # 没有新的进度更新
+
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        break
+
+                    data = orjson.loads(msg.data)
+                    progress_updates.append(data)
+
+                    # 验证消息格式
+                    assert "task_id" in data
+                    assert "status" in data
+                    assert "total_chapters" in data
+                    assert "cached_chapters" in data
+                    assert "progress" in data
+                    assert data["task_id"] == task_id
+
+                    # 如果任务完成或失败，断开连接
+                    if data["status"] in ["completed", "failed"]:
                         break
 
         except Exception as e:
@@ -463,7 +481,6 @@ async def test_websocket_progress_updates(
                 if progress_updates[i]["status"] == progress_updates[i - 1]["status"]:
                     assert curr_progress >= prev_progress
 
-    @pytest.mark.asyncio
     async def test_api_response_time_e2e(self, api_client, valid_headers, base_url):
         """测试API响应时间"""
         # Given
@@ -476,7 +493,7 @@ async def test_api_response_time_e2e(self, api_client, valid_headers, base_url):
             f"{base_url}/api/cache/create", json=create_data, headers=valid_headers
         ) as response:
             assert response.status == 200
-            create_result = await response.json()
+            create_result = await response.json(loads=orjson.loads)
             task_id = create_result["task_id"]
 
         creation_time = time.time() - start_time
@@ -490,7 +507,7 @@ async def test_api_response_time_e2e(self, api_client, valid_headers, base_url):
                 f"{base_url}/api/cache/status/{task_id}", headers=valid_headers
             ) as response:
                 assert response.status == 200
-                await response.json()
+                await response.json(loads=orjson.loads)
 
             query_time = time.time() - start_time
             assert query_time < 0.5, f"状态查询响应时间过长: {query_time:.2f}秒"
@@ -502,32 +519,30 @@ async def test_api_response_time_e2e(self, api_client, valid_headers, base_url):
             f"{base_url}/api/cache/tasks", headers=valid_headers
         ) as response:
             assert response.status == 200
-            await response.json()
+            await response.json(loads=orjson.loads)
 
         list_time = time.time() - start_time
         assert list_time < 1.0, f"任务列表响应时间过长: {list_time:.2f}秒"
 
-    @pytest.mark.asyncio
     async def test_api_rate_limiting_e2e(self, api_client, valid_headers, base_url):
         """测试API频率限制"""
         # Given
-        create_data = {"novel_url": "https://example.com/novel/rate-limit-test"}
+        create_url = f"{base_url}/api/cache/create"
+        novel_url = "https://example.com/novel/rate-limit-test"
+        payloads = [{"novel_url": f"{novel_url}-{i}"} for i in range(20)]
 
-        # When - 快速连续创建多个任务
-        responses = []
-        for i in range(20):  # 快速创建20个任务
+        # When - 同时发出20个创建请求，统计各状态码分布
+        async def create(create_data):
             async with api_client.post(
-                f"{base_url}/api/cache/create",
-                json={**create_data, "novel_url": f"{create_data['novel_url']}-{i}"},
-                headers=valid_headers,
+                create_url, json=create_data, headers=valid_headers
             ) as response:
-                responses.append(
-                    (
-                        response.status,
-                        await response.text() if response.status != 200 else "",
-                    )
+                return (
+                    response.status,
+                    await response.text() if response.status != 200 else "",
                 )
 
+        responses = await asyncio.gather(*(create(p) for p in payloads))
+
         # Then - 分析响应
         success_count = sum(1 for status, _ in responses if status == 200)
         rate_limited_count = sum(1 for status, _ in responses if status == 429)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for ComfyUIClient task completion - local WebSocket server, no ComfyUI.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+import orjson
+import pytest
+import websockets
+
+from app.services.comfyui_client import (
+    ComfyUIClient,
+    MediaFileResult,
+    MediaFileType,
+)
+from app.services.comfyui_events import close_listeners
+
+COMPLETED_TASK = {
+    "status": {"status_str": "success"},
+    "outputs": {"9": {"images": [{"filename": "out.png"}]}},
+}
+
+
+def _make_client(base_url: str) -> ComfyUIClient:
+    """Build a client without loading a workflow file."""
+    client = ComfyUIClient.__new__(ComfyUIClient)
+    client.base_url = base_url
+    client._submitted_tasks = {"t1"}
+    client.workflow_json = {}
+    return client
+
+
+class TestWaitForCompletion:
+    """Test wait_for_completion waits on WebSocket events before reading history."""
+
+    @pytest.mark.asyncio
+    async def test_returns_after_executing_event(self):
+        """Previews and other prompts are ignored until our prompt finishes."""
+
+        async def handler(ws):
+            await ws.send(b"\x00\x00\x00\x01preview")
+            for prompt_id, node in (("t1", "3"), ("other", None), ("t1", None)):
+                data = {"node": node, "prompt_id": prompt_id}
+                await ws.send(json.dumps({"type": "executing", "data": data}))
+            await ws.wait_closed()
+
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = _make_client(f"http://127.0.0.1:{port}")
+            client.check_task_status = AsyncMock(side_effect=[{}, COMPLETED_TASK])
+
+            files = await asyncio.wait_for(client.wait_for_completion("t1"), 3)
+
+        assert [f.filename for f in files] == ["out.png"]
+        assert files[0].file_type == MediaFileType.IMAGE
+        assert client.check_task_status.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_waits_share_one_connection(self):
+        """Waiting on two prompts opens a single WebSocket and wakes each one."""
+        connections = []
+
+        async def handler(ws):
+            connections.append(ws)
+            await asyncio.sleep(0.05)
+            for prompt_id in ("t2", "t1"):
+                data = {"prompt_id": prompt_id}
+                await ws.send(json.dumps({"type": "execution_success", "data": data}))
+            await ws.wait_closed()
+
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = _make_client(f"http://127.0.0.1:{port}")
+            client._submitted_tasks = {"t1", "t2"}
+            # 事件到达前查询历史为空,之后返回已完成
+            done = set()
+
+            async def check_task_status(task_id):
+                return COMPLETED_TASK if task_id in done else {}
+
+            async def wait(task_id):
+                await client._wait_via_websocket(task_id)
+                done.add(task_id)
+
+            client.check_task_status = check_task_status
+
+            await asyncio.wait_for(asyncio.gather(wait("t1"), wait("t2")), 3)
+
+        assert len(connections) == 1
+        assert done == {"t1", "t2"}
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_disconnect(self):
+        """A dropped connection is re-opened and the history re-checked."""
+        connections = []
+
+        async def handler(ws):
+            connections.append(ws)
+            if len(connections) == 1:
+                await ws.close()
+                return
+            data = {"prompt_id": "t1"}
+            await ws.send(json.dumps({"type": "execution_success", "data": data}))
+            await ws.wait_closed()
+
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = _make_client(f"http://127.0.0.1:{port}")
+            client.check_task_status = AsyncMock(side_effect=[{}, {}, COMPLETED_TASK])
+
+            files = await asyncio.wait_for(client.wait_for_completion("t1"), 3)
+
+        assert [f.filename for f in files] == ["out.png"]
+        assert len(connections) == 2
+        assert client.check_task_status.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_ignores_malformed_frames(self):
+        """Non-JSON frames and events with non-dict data do not end the receiver."""
+
+        async def handler(ws):
+            await ws.send("not json")
+            await ws.send(json.dumps(["executing"]))
+            await ws.send(json.dumps({"type": "executing", "data": ["t1"]}))
+            data = {"prompt_id": "t1"}
+            await ws.send(json.dumps({"type": "execution_success", "data": data}))
+            await ws.wait_closed()
+
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = _make_client(f"http://127.0.0.1:{port}")
+            client.check_task_status = AsyncMock(side_effect=[{}, COMPLETED_TASK])
+
+            files = await asyncio.wait_for(client.wait_for_completion("t1"), 3)
+
+        assert [f.filename for f in files] == ["out.png"]
+        assert client.check_task_status.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_close_listeners_closes_connection(self):
+        """Shutting the listeners down closes the shared WebSocket."""
+        closed = asyncio.Event()
+
+        async def handler(ws):
+            data = {"prompt_id": "t1"}
+            await ws.send(json.dumps({"type": "execution_success", "data": data}))
+            await ws.wait_closed()
+            closed.set()
+
+        async with websockets.serve(handler, "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = _make_client(f"http://127.0.0.1:{port}")
+            client.check_task_status = AsyncMock(side_effect=[{}, COMPLETED_TASK])
+            await asyncio.wait_for(client.wait_for_completion("t1"), 3)
+
+            await close_listeners()
+
+            await asyncio.wait_for(closed.wait(), 3)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_polling(self):
+        """An unreachable WebSocket endpoint falls back to history polling."""
+        client = _make_client("http://127.0.0.1:1")
+        client.check_task_status = AsyncMock(return_value=COMPLETED_TASK)
+
+        files = await client.wait_for_completion("t1")
+
+        assert [f.filename for f in files] == ["out.png"]
+
+    @pytest.mark.asyncio
+    async def test_polling_starts_with_short_delays(self):
+        """A prompt that finishes quickly is picked up well under a second."""
+        client = _make_client("http://127.0.0.1:1")
+        client._submitted_tasks = set()
+        client.check_task_status = AsyncMock(side_effect=[{}, {}, COMPLETED_TASK])
+
+        files = await asyncio.wait_for(client.wait_for_completion("t1"), 1)
+
+        assert [f.filename for f in files] == ["out.png"]
+        assert client.check_task_status.await_count == 3
+
+
+class TestPromptBody:
+    """Test the /prompt request body built from the prepared workflow."""
+
+    def test_placeholders_replaced(self):
+        """Prompt and seed placeholders are filled and client_id is attached."""
+        client = _make_client("http://127.0.0.1:1")
+        client.workflow_json = {
+            "3": {"inputs": {"text": "提示词在这里替换", "seed": "在这替换随机数"}}
+        }
+
+        workflow_json_str = client._prepare_workflow("少女")
+        body = orjson.loads(client._prompt_body(workflow_json_str, "test-client"))
+
+        inputs = body["prompt"]["3"]["inputs"]
+        assert inputs["text"] == "少女"
+        assert isinstance(inputs["seed"], int)
+        assert body["client_id"] == "test-client"
+
+
+class TestGenerateImagesBatch:
+    """Test batch generation submits every prompt before any completes."""
+
+    @pytest.mark.asyncio
+    async def test_keeps_prompt_order(self):
+        """Results follow prompt order even when later prompts finish first."""
+        client = _make_client("http://127.0.0.1:1")
+        submitted = []
+
+        async def generate_image(prompt):
+            submitted.append(prompt)
+            return None if prompt == "bad" else f"task-{prompt}"
+
+        async def wait_for_completion(task_id):
+            # 先提交的任务后完成
+            await asyncio.sleep(0.01 if task_id == "task-a" else 0)
+            return [MediaFileResult(f"{task_id}.png", MediaFileType.IMAGE)]
+
+        client.generate_image = generate_image
+        client.wait_for_completion = wait_for_completion
+
+        filenames = await client.generate_images_batch(["a", "bad", "c"])
+
+        assert submitted == ["a", "bad", "c"]
+        assert filenames == ["task-a.png", "task-c.png"]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for ComfyUIClientTitleBased node matching - temp workflow file, no ComfyUI.
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.comfyui_client_title_based import ComfyUIClientTitleBased
+
+WORKFLOW = {
+    "3": {
+        "class_type": "CLIPTextEncode",
+        "inputs": {"text": "old"},
+        "_meta": {"title": "Positive Prompt"},
+    },
+    "6": {
+        "class_type": "CLIPTextEncode",
+        "inputs": {"text": "lowres"},
+        "_meta": {"title": "Negative Prompt"},
+    },
+    "7": {"class_type": "KSampler", "inputs": {}, "_meta": {"title": "采样器"}},
+    "9": {"class_type": "SaveImage", "inputs": {}},
+    "config": {"version": 1},
+}
+
+
+class TestFindNodesByTitle:
+    """Test find_nodes_by_title matches titles case-insensitively."""
+
+    def test_matches_title_substring(self, tmp_path):
+        """Targets match any node whose lowercased title contains them."""
+        path = tmp_path / "workflow.json"
+        path.write_text(json.dumps(WORKFLOW), encoding="utf-8")
+        client = ComfyUIClientTitleBased("http://127.0.0.1:1", str(path))
+
+        nodes = client.find_nodes_by_title(["PROMPT", "缺失"])
+
+        assert list(nodes) == ["3", "6"]
+        assert nodes["3"]["title"] == "Positive Prompt"
+        assert nodes["3"]["inputs"] == {"text": "old"}
+
+    def test_prompt_skips_negative_nodes(self, tmp_path):
+        """The user prompt replaces positive prompt nodes only."""
+        path = tmp_path / "workflow.json"
+        path.write_text(json.dumps(WORKFLOW), encoding="utf-8")
+        client = ComfyUIClientTitleBased("http://127.0.0.1:1", str(path))
+
+        workflow = client.prepare_workflow_by_title("少女")
+
+        assert workflow["3"]["inputs"]["text"] == "少女"
+        assert workflow["6"]["inputs"]["text"] == "lowres"
+        assert client.analyze_workflow()["node_details"]["6"]["is_target"] is False
+
+    def test_reload_refreshes_titles(self, tmp_path):
+        """Reloading the workflow rebuilds the title list."""
+        path = tmp_path / "workflow.json"
+        path.write_text(json.dumps(WORKFLOW), encoding="utf-8")
+        client = ComfyUIClientTitleBased("http://127.0.0.1:1", str(path))
+
+        other = tmp_path / "other.json"
+        other.write_text(
+            json.dumps({"5": {"class_type": "X", "_meta": {"title": "采样器"}}}),
+            encoding="utf-8",
+        )
+        client.workflow_path = str(other)
+        client._load_workflow()
+
+        assert list(client.find_nodes_by_title(["采样"])) == ["5"]
+
+
+class TestWaitForCompletion:
+    """Test wait_for_completion reads finished tasks from history."""
+
+    @pytest.mark.asyncio
+    async def test_success_status_returns_images(self, tmp_path):
+        """ComfyUI reports finished prompts as "success"."""
+        path = tmp_path / "workflow.json"
+        path.write_text(json.dumps(WORKFLOW), encoding="utf-8")
+        client = ComfyUIClientTitleBased("http://127.0.0.1:1", str(path))
+        client.check_task_status = AsyncMock(
+            return_value={
+                "status": {"status_str": "success"},
+                "outputs": {
+                    "9": {"images": [{"filename": "a.png"}, {"subfolder": ""}]},
+                    "10": {"text": ["done"]},
+                },
+            }
+        )
+
+        assert await client.wait_for_completion("t1", timeout=1) == ["a.png"]
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for RequestsClient encoding detection - no network.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from app.services import http_client
+from app.services.http_client import RequestConfig, RequestsClient
+
+
+def make_response(
+    body: bytes,
+    encoding: str | None = None,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+) -> requests.Response:
+    """Build a requests.Response without sending a request."""
+    response = requests.Response()
+    response._content = body
+    response.encoding = encoding
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+class TestDetectEncoding:
+    """Test _detect_encoding prefers headers, then the meta charset declaration."""
+
+    def test_header_encoding_wins(self):
+        """A non-UTF-8 charset from the HTTP header is used as-is."""
+        response = make_response(b'<meta charset="utf-8">', encoding="GB2312")
+        assert RequestsClient()._detect_encoding(response) == "gbk"
+
+    def test_sniffs_meta_charset(self):
+        """Without a header charset, the <meta> declaration is used."""
+        response = make_response(
+            b'<meta http-equiv="Content-Type" content="text/html; charset=GBK">'
+        )
+        assert RequestsClient()._detect_encoding(response) == "gbk"
+
+    def test_defaults_to_utf8(self):
+        """Missing or unknown declarations fall back to UTF-8."""
+        assert RequestsClient()._detect_encoding(make_response(b"<html>")) == "utf-8"
+        response = make_response(b"<meta charset=bogus-charset>")
+        assert RequestsClient()._detect_encoding(response) == "utf-8"
+
+
+class TestResponseCache:
+    """Test RequestsClient GET caching: LRU bound and conditional revalidation."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_skips_network(self):
+        """A cached response within its TTL is returned without a request."""
+        client = RequestsClient()
+        client.session.get = MagicMock(return_value=make_response(b"<p>1</p>"))
+
+        await client.get("https://example.com/a")
+        cached = await client.get("https://example.com/a")
+
+        assert client.session.get.call_count == 1
+        assert cached.from_cache
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_revalidates_with_etag(self):
+        """An expired entry is revalidated; a 304 reuses the cached body."""
+        client = RequestsClient()
+        client.session.get = MagicMock(
+            side_effect=[
+                make_response(b"<p>1</p>", headers={"ETag": '"v1"'}),
+                make_response(b"", status_code=304),
+            ]
+        )
+
+        with patch.object(http_client, "_RESPONSE_CACHE_TTL", 0):
+            await client.get("https://example.com/a")
+            revalidated = await client.get("https://example.com/a")
+
+        second_headers = client.session.get.call_args.kwargs["headers"]
+        assert second_headers["If-None-Match"] == '"v1"'
+        assert revalidated.content == "<p>1</p>"
+        assert revalidated.from_cache
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self):
+        """The least recently used URL is evicted once the cache is full."""
+        client = RequestsClient()
+        client.session.get = MagicMock(return_value=make_response(b"<p>1</p>"))
+
+        with patch.object(http_client, "_RESPONSE_CACHE_SIZE", 2):
+            for path in ("a", "b", "a", "c"):
+                await client.get(f"https://example.com/{path}")
+
+        assert list(client._cache) == ["https://example.com/a", "https://example.com/c"]
+
+
+class TestRetries:
+    """Test RequestsClient retries transient server errors itself."""
+
+    @pytest.mark.asyncio
+    async def test_retries_server_errors(self):
+        """A 503 is retried by the client loop, up to config.max_retries."""
+        client = RequestsClient()
+        client.session.get = MagicMock(
+            side_effect=[
+                make_response(b"", status_code=503),
+                make_response(b"<p>ok</p>"),
+            ]
+        )
+
+        response = await client.get(
+            "https://example.com/a", RequestConfig(max_retries=2, retry_delay=0)
+        )
+
+        assert client.session.get.call_count == 2
+        assert response.content == "<p>ok</p>"
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        """A 404 fails immediately."""
+        client = RequestsClient()
+        client.session.get = MagicMock(return_value=make_response(b"", status_code=404))
+
+        with pytest.raises(Exception, match="HTTP 404"):
+            await client.get("https://example.com/a", RequestConfig(retry_delay=0))
+
+        assert client.session.get.call_count == 1
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for ImageStore - local content-addressed image storage.
+"""
+
+import hashlib
+import os
+
+from app.services.image_store import ImageStore
+
+
+def _blobs(root):
+    return [p for p in (root / "blobs").rglob("*") if p.is_file()]
+
+
+class TestImageStore:
+    """Test ImageStore persistence and dedup."""
+
+    def test_path_missing_returns_none(self, tmp_path):
+        """Unknown filenames are a cache miss."""
+        store = ImageStore(tmp_path)
+        assert store.path("missing.png") is None
+
+    def test_put_stream_then_path(self, tmp_path):
+        """Streamed chunks are stored whole and found by filename."""
+        store = ImageStore(tmp_path)
+        key = store.put_stream("a.png", iter([b"png-", b"bytes"]))
+
+        assert key == hashlib.sha256(b"png-bytes").hexdigest()
+        assert store.path("a.png").read_bytes() == b"png-bytes"
+
+    def test_identical_content_stored_once(self, tmp_path):
+        """Two filenames with the same bytes share one blob."""
+        store = ImageStore(tmp_path)
+        store.put_stream("a.png", iter([b"same"]))
+        store.put_stream("b.png", iter([b"sa", b"me"]))
+
+        assert len(_blobs(tmp_path)) == 1
+        assert store.path("b.png").read_bytes() == b"same"
+
+    def test_directories_created_on_first_write(self, tmp_path):
+        """Constructing a store touches nothing on disk until something is saved."""
+        store = ImageStore(tmp_path / "store")
+        assert not (tmp_path / "store").exists()
+        assert store.path("a.png") is None
+
+        store.put_stream("a.png", iter([b"png"]))
+
+        assert store.path("a.png").read_bytes() == b"png"
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Going over the size cap drops the image that was used longest ago."""
+        store = ImageStore(tmp_path, max_bytes=12)
+        store.put_stream("a.png", iter([b"aaaaa"]))
+        store.put_stream("b.png", iter([b"bbbbb"]))
+        # a 比 b 更早写入,但随后被读取过
+        os.utime(tmp_path / "names" / "a.png", (1000, 1000))
+        os.utime(tmp_path / "names" / "b.png", (2000, 2000))
+        assert store.path("a.png") is not None
+
+        store.put_stream("c.png", iter([b"ccccc"]))
+
+        assert store.path("b.png") is None
+        assert store.path("a.png").read_bytes() == b"aaaaa"
+        assert store.path("c.png").read_bytes() == b"ccccc"
+        assert len(_blobs(tmp_path)) == 2
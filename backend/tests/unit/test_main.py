@@ -4,11 +4,13 @@
 Unit tests for main FastAPI application.
 """
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
+from app.services.image_store import ImageStore
+
 
 class TestHealthCheck:
     """Test health check endpoint."""
@@ -201,3 +203,74 @@ def test_cors_headers(self, client: TestClient) -> None:
         # 注意：在测试环境中CORS头可能不会被添加，所以这个测试是软性的
         # 只要请求成功即可
         assert response.status_code == 200
+
+
+class TestImageProxy:
+    """Test the ComfyUI image proxy endpoint."""
+
+    def test_serves_stored_file_without_fetching(
+        self, client: TestClient, tmp_path
+    ) -> None:
+        """A stored image is sent from disk without contacting ComfyUI."""
+        store = ImageStore(tmp_path)
+        store.put_stream("out.png", iter([b"png-bytes"]))
+        session = MagicMock()
+
+        with (
+            patch("app.main.get_comfyui_session", return_value=session),
+            patch("app.main.image_store", store),
+        ):
+            response = client.get("/text2img/image/out.png")
+
+        assert response.status_code == 200
+        assert response.content == b"png-bytes"
+        session.get.assert_not_called()
+
+    def test_download_streams_into_store(self, client: TestClient, tmp_path) -> None:
+        """A miss is streamed into the store and served from the stored file."""
+        upstream = MagicMock(status_code=200)
+        upstream.__enter__.return_value = upstream
+        upstream.iter_content.return_value = iter([b"png-", b"bytes"])
+        session = MagicMock()
+        session.get.return_value = upstream
+        store = ImageStore(tmp_path)
+
+        with (
+            patch("app.main.get_comfyui_session", return_value=session),
+            patch("app.main.image_store", store),
+        ):
+            response = client.get("/text2img/image/out.png")
+
+        assert response.status_code == 200
+        assert response.content == b"png-bytes"
+        assert store.path("out.png").read_bytes() == b"png-bytes"
+        session.get.assert_called_once()
+        assert session.get.call_args.kwargs["timeout"] is not None
+
+    def test_store_failure_serves_refetched_bytes(self, client: TestClient) -> None:
+        """A failed local write falls back to returning the image from memory."""
+        upstream = MagicMock(status_code=200)
+        upstream.__enter__.return_value = upstream
+        upstream.iter_content.return_value = iter([b"png-", b"bytes"])
+        refetched = MagicMock(status_code=200, content=b"png-bytes")
+        session = MagicMock()
+        session.get.side_effect = [upstream, refetched]
+
+        def put_stream(filename, chunks):
+            next(chunks)
+            raise OSError("disk full")
+
+        store = MagicMock()
+        store.path.return_value = None
+        store.put_stream.side_effect = put_stream
+
+        with (
+            patch("app.main.get_comfyui_session", return_value=session),
+            patch("app.main.image_store", store),
+        ):
+            response = client.get("/text2img/image/out.png")
+
+        assert response.status_code == 200
+        assert response.content == b"png-bytes"
+        assert session.get.call_count == 2
+        assert "stream" not in session.get.call_args.kwargs
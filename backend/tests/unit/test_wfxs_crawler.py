@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for WfxsCrawler page parsing - pure functions and a fake browser, no network.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.wfxs_crawler import WfxsCrawler, _parse_chapter_page
+
+BASE_URL = "https://m.wfxs.tw"
+
+CHAPTER_PAGE_HTML = """
+<html><body>
+  <ul>
+    <li><a href="/booklist/1/1.html">1~30章</a></li>
+    <li><a href="/booklist/1/2.html">31~60章</a></li>
+  </ul>
+  <ul>
+    <li><a href="/xiaoshuo/1/1.html"> 第1章 開始</a></li>
+    <li><a href="/xiaoshuo/1/2.html">第2章 <b>風起</b></a></li>
+    <li><a href="">第3章 无链接</a></li>
+    <li><span>广告</span></li>
+    <li><a href="https://m.wfxs.tw/xiaoshuo/1/4.html">第4章 絕對路徑</a></li>
+  </ul>
+</body></html>
+"""
+
+
+class TestParseChapterPage:
+    """Test _parse_chapter_page picks the chapter list and normalizes links."""
+
+    def test_parses_chapter_list(self):
+        """Chapter links are extracted from the best ul, in order."""
+        chapters = _parse_chapter_page(CHAPTER_PAGE_HTML, BASE_URL)
+
+        assert chapters == [
+            {"title": "第1章 開始", "url": f"{BASE_URL}/xiaoshuo/1/1.html"},
+            {"title": "第2章風起", "url": f"{BASE_URL}/xiaoshuo/1/2.html"},
+            {"title": "第4章 絕對路徑", "url": f"{BASE_URL}/xiaoshuo/1/4.html"},
+        ]
+
+    def test_skips_range_navigation(self):
+        """Pagination ranges like '1~30章' are never returned as chapters."""
+        html = '<ul><li><a href="/booklist/1/1.html">第1~30章</a></li></ul>'
+        assert _parse_chapter_page(html, BASE_URL) == []
+
+    def test_page_without_chapters(self):
+        """A page with no chapter list returns an empty list."""
+        assert (
+            _parse_chapter_page("<html><body><p>空</p></body></html>", BASE_URL) == []
+        )
+
+
+def _fake_playwright(html: str) -> MagicMock:
+    """Build an async_playwright() stand-in whose page returns the given HTML."""
+    page = MagicMock()
+    page.goto = AsyncMock(return_value=MagicMock(ok=True))
+    page.content = AsyncMock(return_value=html)
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=page)
+    browser = MagicMock()
+    browser.new_context = AsyncMock(return_value=context)
+    browser.close = AsyncMock()
+    p = MagicMock()
+    p.chromium.launch = AsyncMock(return_value=browser)
+
+    manager = MagicMock()
+    manager.__aenter__ = AsyncMock(return_value=p)
+    manager.__aexit__ = AsyncMock(return_value=False)
+    return MagicMock(return_value=manager)
+
+
+class TestGetChaptersFromPage:
+    """Test WfxsCrawler._get_chapters_from_page parses in the shared pool."""
+
+    @pytest.mark.asyncio
+    async def test_parses_in_pool_and_simplifies_titles(self):
+        """The fetched page is parsed by _parse_chapter_page in the parse pool."""
+        crawler = WfxsCrawler()
+
+        with (
+            ThreadPoolExecutor(max_workers=1) as pool,
+            patch(
+                "playwright.async_api.async_playwright",
+                _fake_playwright(CHAPTER_PAGE_HTML),
+            ),
+            patch(
+                "app.services.wfxs_crawler.get_parse_pool", return_value=pool
+            ) as get_pool,
+        ):
+            chapters = await crawler._get_chapters_from_page(
+                f"{BASE_URL}/booklist/1.html"
+            )
+
+        get_pool.assert_called_once()
+        assert chapters == [
+            {"title": "第1章 开始", "url": f"{BASE_URL}/xiaoshuo/1/1.html"},
+            {"title": "第2章风起", "url": f"{BASE_URL}/xiaoshuo/1/2.html"},
+            {"title": "第4章 绝对路径", "url": f"{BASE_URL}/xiaoshuo/1/4.html"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_uses_shared_title_rule_and_stops_at_full_list(self):
+        """Range links are filtered and the first full chapter list wins."""
+        first = "".join(
+            f'<li><a href="/xiaoshuo/1/{i}.html">第{i}章</a></li>' for i in range(1, 21)
+        )
+        later = "".join(
+            f'<li><a href="/xiaoshuo/2/{i}.html">第{i}章</a></li>' for i in range(1, 31)
+        )
+        html = (
+            f'<ul><li><a href="/booklist/1/1.html">第1~30章</a></li>{first}</ul>'
+            f"<ul>{later}</ul>"
+        )
+        crawler = WfxsCrawler()
+
+        with (
+            ThreadPoolExecutor(max_workers=1) as pool,
+            patch("playwright.async_api.async_playwright", _fake_playwright(html)),
+            patch("app.services.wfxs_crawler.get_parse_pool", return_value=pool),
+        ):
+            chapters = await crawler._get_chapters_from_page(
+                f"{BASE_URL}/booklist/1.html"
+            )
+
+        assert len(chapters) == 20
+        assert chapters[0] == {"title": "第1章", "url": f"{BASE_URL}/xiaoshuo/1/1.html"}
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for workflow JSON loading - cached by path and mtime.
+"""
+
+import json
+import os
+
+from app.workflow_config.workflow_config import load_workflow_json, load_workflow_text
+
+
+class TestLoadWorkflow:
+    """Test workflow files are cached until they change on disk."""
+
+    def test_reloads_after_file_changes(self, tmp_path):
+        """A new mtime invalidates the cached text."""
+        path = tmp_path / "wf.json"
+        path.write_text(json.dumps({"1": {"class_type": "A"}}), encoding="utf-8")
+        first = load_workflow_text(path)
+
+        assert load_workflow_text(path) is first
+
+        path.write_text(json.dumps({"1": {"class_type": "B"}}), encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert load_workflow_json(path)["1"]["class_type"] == "B"
+
+    def test_json_copies_are_independent(self, tmp_path):
+        """Each caller gets its own dict to mutate."""
+        path = tmp_path / "wf.json"
+        path.write_text(json.dumps({"1": {"inputs": {}}}), encoding="utf-8")
+
+        first = load_workflow_json(path)
+        first["1"]["inputs"]["text"] = "changed"
+
+        assert load_workflow_json(path) == {"1": {"inputs": {}}}
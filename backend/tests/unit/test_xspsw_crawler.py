@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for XspswCrawler chapter parsing - pure functions, no network.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services import xspsw_crawler_refactored
+from app.services.xspsw_crawler_refactored import (
+    XspswCrawlerRefactored,
+    _parse_chapter_html,
+)
+
+PARAGRAPH = "这是一段足够长的正文内容，用来通过长度检查。"
+
+CHAPTER_HTML = f"""
+<html><head><title>站点标题</title></head><body>
+  <h1>第1章 开始</h1>
+  <div id="content">
+    <script>var ad = 1;</script>
+    <p>{PARAGRAPH}</p>
+    <p>{PARAGRAPH}   {PARAGRAPH}</p>
+
+
+    <p>{PARAGRAPH}</p>
+    <p>{PARAGRAPH}</p>
+  </div>
+</body></html>
+"""
+
+
+class TestParseChapterHtml:
+    """Test _parse_chapter_html extracts title and cleaned body text."""
+
+    def test_parses_title_and_content(self):
+        """Title comes from h1; scripts are dropped and whitespace collapsed."""
+        chapter = _parse_chapter_html(CHAPTER_HTML)
+
+        assert chapter["title"] == "第1章 开始"
+        assert "var ad" not in chapter["content"]
+        assert f"{PARAGRAPH} {PARAGRAPH}" in chapter["content"]
+        assert chapter["content"] == chapter["content"].strip()
+
+    def test_page_without_content(self):
+        """A page without title or body falls back to defaults."""
+        chapter = _parse_chapter_html("<html><body><p>空</p></body></html>")
+
+        assert chapter == {"title": "章节内容", "content": ""}
+
+
+class TestPopularNovelsCache:
+    """Test the popular-novel fallback is cached across crawler instances."""
+
+    @pytest.mark.asyncio
+    async def test_fetches_homepage_once(self):
+        """Repeated fallbacks within the TTL reuse the first homepage crawl."""
+        popular = [
+            {"title": "热门小说", "url": "https://m.xspsw.com/xianshishuwu_1.html"}
+        ]
+        fetch = AsyncMock(return_value=popular)
+
+        with (
+            patch.dict(xspsw_crawler_refactored._popular_cache, clear=True),
+            patch.object(XspswCrawlerRefactored, "_fetch_popular_novels", fetch),
+        ):
+            first = await XspswCrawlerRefactored()._get_popular_novels()
+            first[0]["title"] = "被调用方修改"
+            second = await XspswCrawlerRefactored()._get_popular_novels()
+
+        assert fetch.await_count == 1
+        assert second == popular
+
+
+class TestParseSearchResults:
+    """Test _parse_xspsw_search_results on pages lxml rejects as str input."""
+
+    def test_page_with_xml_declaration(self):
+        """An XML encoding declaration falls back to BeautifulSoup instead of []."""
+        html = """<?xml version="1.0" encoding="utf-8"?>
+        <html><body><ul>
+          <li><a href="/xianshishuwu_12.html"><img alt="测试小说"></a>作者：张三 都市 连载</li>
+        </ul></body></html>
+        """
+        novels = XspswCrawlerRefactored()._parse_xspsw_search_results(html)
+
+        assert [novel["title"] for novel in novels] == ["测试小说"]
+        assert novels[0]["url"].endswith("/xianshishuwu_12.html")
+
+
+class TestCalculateMaxPage:
+    """Test _calculate_max_page reads the chapter total and pagination links."""
+
+    def test_uses_largest_of_total_and_links(self):
+        """Pages come from '共 N 章' and from the highest /0_N.html link."""
+        html = """
+        <html><body>
+          <p>本书 共 345 章</p>
+          <a href="/xianshishuwu/1/0_2.html">2</a>
+          <a href="https://m.xspsw.com/xianshishuwu/1/0_7.html">7</a>
+          <a href="/xianshishuwu/1/8.html">第8章</a>
+        </body></html>
+        """
+        assert XspswCrawlerRefactored()._calculate_max_page(html) == 7
+
+    def test_page_with_xml_declaration(self):
+        """A page lxml rejects as str is still paginated, not cut to one page."""
+        html = """<?xml version="1.0" encoding="utf-8"?>
+        <html><body><p>本书 共 345 章</p></body></html>
+        """
+        assert XspswCrawlerRefactored()._calculate_max_page(html) == 4
+
+    def test_single_page(self):
+        """A page without totals or pagination has one page."""
+        assert XspswCrawlerRefactored()._calculate_max_page("<p>目录</p>") == 1